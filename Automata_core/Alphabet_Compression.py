@@ -0,0 +1,170 @@
+import logging
+from array import array
+from typing import Callable, Dict, Hashable, Iterable, List, Sequence, Tuple, Union
+
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+
+logger = logging.getLogger(__name__)
+
+OTHER = 0   # classe dei simboli fuori alfabeto (e di quelli che si comportano allo stesso modo)
+
+
+def symbol_classes(
+        symbols: Iterable[str],
+        signature: Callable[[str], Hashable]
+) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Funzione symbol_classes:
+    Obiettivo: partizionare i simboli in classi di equivalenza: due simboli stanno nella
+    stessa classe se hanno la stessa firma, cioè lo stesso comportamento in ogni stato
+    (colonna della tabella di un DFA, successori per stato di un NFA, ...).
+
+    Restituisce (classe di ogni simbolo, rappresentante di ogni classe); le classi sono
+    numerate da 1 nell'ordine di prima occorrenza (la classe 0 è riservata a OTHER).
+    """
+    index: Dict[Hashable, int] = {}
+    classes: Dict[str, int] = {}
+    representatives: List[str] = []
+    for symbol in symbols:
+        key = signature(symbol)
+        cls = index.get(key)
+        if cls is None:
+            cls = index[key] = len(representatives) + 1
+            representatives.append(symbol)
+        classes[symbol] = cls
+    return classes, representatives
+
+
+def widen(dfa: CompiledDFA, alphabet: Sequence[str], classes: Dict[str, int]) -> CompiledDFA:
+    """
+    Riporta all'alfabeto completo un CompiledDFA costruito sui soli rappresentanti delle
+    classi (colonna c = classe c): ogni simbolo riceve la colonna della propria classe.
+    """
+    width = len(alphabet) + 1
+    n = dfa.n_states
+    table = array('i', bytes(4 * n * width))
+    source = [0] + [classes[symbol] for symbol in alphabet]
+    for state in range(n):
+        base, row = state * dfa.width, state * width
+        for col, cls in enumerate(source):
+            table[row + col] = dfa.table[base + cls]
+    return CompiledDFA(alphabet, table, dfa.start, bytearray(dfa.accepting), dfa.dead, dfa.labels)
+
+
+class ByteClassDFA:
+    """
+    Classe ByteClassDFA:
+    - Scopo: la stessa tabella di un CompiledDFA, ma con una colonna per classe di simboli
+      equivalenti invece che per simbolo (o per ognuno dei 256 byte).
+    - Motivazione: per automi a caratteri (regex, password, log) quasi tutti i simboli si
+      comportano allo stesso modo, es. [a-z0-9]+ ha 2 classi su 95 caratteri: la tabella si
+      riduce di un ordine di grandezza e resta nella cache della CPU.
+
+    Rappresentazione:
+    - class_map: 256 byte, classe del carattere (o byte, letto come latin-1) con codice < 256;
+    - fallback: classe dei simboli con codice >= 256 o di più caratteri (Unicode);
+    - table[stato + classe] -> stato successivo, stati premoltiplicati per n_classes;
+    - la classe 0 (OTHER) raccoglie i simboli fuori alfabeto e quelli che portano sempre
+      dove porta un simbolo sconosciuto.
+    Con al più 256 classi l'input in byte viene convertito in classi con bytes.translate (in C).
+    """
+
+    def __init__(self, dfa: CompiledDFA):
+        n, width, source = dfa.n_states, dfa.width, dfa.table
+        # Firma di una colonna: gli stati successori di tutti gli stati, letti con un solo slice.
+        # La colonna 0 (simboli sconosciuti) definisce OTHER: i simboli che si comportano
+        # allo stesso modo non hanno bisogno di una classe propria.
+        index = {source[0::width].tobytes(): OTHER}
+        columns = [0]
+        classes: Dict[str, int] = {}
+        for symbol in dfa.alphabet:
+            col = dfa.columns[symbol]
+            signature = source[col::width].tobytes()
+            cls = index.get(signature)
+            if cls is None:
+                cls = index[signature] = len(columns)
+                columns.append(col)
+            classes[symbol] = cls
+        k = len(columns)
+
+        self.alphabet = dfa.alphabet
+        self.classes = classes
+        self.n_classes = k
+        self.n_states = n
+        self.table = array('H' if n * k <= 0xFFFF else 'I', [0]) * (n * k)
+        for state in range(n):
+            base, row = state * width, state * k
+            for cls, col in enumerate(columns):
+                self.table[row + cls] = source[base + col] * k
+        self.start = dfa.start * k
+        self.dead = dfa.dead * k
+        self.accepting = bytearray(dfa.accepting)
+        self.fallback: Dict[str, int] = {}
+        class_map = [OTHER] * 256
+        for symbol, cls in classes.items():
+            if len(symbol) == 1 and ord(symbol) < 256:
+                class_map[ord(symbol)] = cls
+            elif cls != OTHER:
+                self.fallback[symbol] = cls
+        # bytes quando le classi stanno in un byte (serve a translate), altrimenti array di uint16
+        self.class_map: Union[bytes, array] = bytes(class_map) if k <= 256 else array('H', class_map)
+        logger.info("ByteClassDFA: %d simboli in %d classi, %d stati, %d -> %d byte di tabella",
+                    len(dfa.alphabet), k, n, len(source) * source.itemsize, self.nbytes())
+
+    def classify(self, symbol: str) -> int:
+        """Classe del simbolo (OTHER se fuori alfabeto)."""
+        if len(symbol) == 1 and ord(symbol) < 256:
+            return self.class_map[ord(symbol)]
+        return self.fallback.get(symbol, OTHER)
+
+    def nbytes(self) -> int:
+        """Memoria della tabella e della mappa delle classi."""
+        return len(self.table) * self.table.itemsize + len(self.class_map) * getattr(self.class_map, "itemsize", 1)
+
+    def is_accepting(self, state: int) -> bool:
+        """Verifica lo stato (premoltiplicato, come restituito da step)."""
+        return bool(self.accepting[state // self.n_classes])
+
+    def step(self, state: int, symbol: str) -> int:
+        return self.table[state + self.classify(symbol)]
+
+    def run(self, text: Iterable[str]) -> bool:
+        """Esegue il DFA su una stringa (o sequenza di simboli) e restituisce True se accettata."""
+        table, class_map, fallback, dead = self.table, self.class_map, self.fallback, self.dead
+        state = self.start
+        for symbol in text:
+            code = ord(symbol) if len(symbol) == 1 else 256
+            state = table[state + (class_map[code] if code < 256 else fallback.get(symbol, OTHER))]
+            if state == dead:
+                return False
+        return bool(self.accepting[state // self.n_classes])
+
+    def translate(self, data: bytes) -> bytes:
+        """Converte un input in byte (latin-1) nella sequenza delle classi, in C."""
+        if isinstance(self.class_map, bytes):
+            return data.translate(self.class_map)
+        raise ValueError("Più di 256 classi: usare run() sull'input decodificato")
+
+    def run_bytes(self, data: bytes) -> bool:
+        """
+        Esegue il DFA su un input in byte, un carattere per byte (latin-1, come Log_Scanner);
+        per testo UTF-8 con caratteri non ASCII nell'alfabeto usare run(data.decode()).
+        """
+        if not isinstance(self.class_map, bytes):
+            return self.run(data.decode("latin-1"))
+        table, dead = self.table, self.dead
+        state = self.start
+        for cls in data.translate(self.class_map):
+            state = table[state + cls]
+            if state == dead:
+                return False
+        return bool(self.accepting[state // self.n_classes])
+
+    def __repr__(self) -> str:
+        return (f"ByteClassDFA(states={self.n_states}, symbols={len(self.alphabet)}, "
+                f"classes={self.n_classes}, bytes={self.nbytes()})")
+
+
+def compress(dfa: CompiledDFA) -> ByteClassDFA:
+    """Comprime l'alfabeto di un CompiledDFA in classi di equivalenza."""
+    return ByteClassDFA(dfa)
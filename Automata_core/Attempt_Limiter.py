@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Layout di uno shard (struttura di array, tutti allineati):
+#   hashes  : uint64  hash della chiave (0 = slot libero)
+#   locked  : float64 istante di fine del blocco (0 = non bloccato)
+#   windows : int64   indice della finestra corrente dello slot
+#   current : uint16  tentativi falliti nella finestra corrente
+#   previous: uint16  tentativi falliti nella finestra precedente
+# Gli slot dell'intera tabella stanno in un solo buffer (bytearray o SharedMemory).
+SLOT_BYTES = 8 + 8 + 8 + 2 + 2
+MAX_COUNT = 0xFFFF
+
+
+def key_hash(key: str) -> int:
+    """Hash a 64 bit stabile tra processi (necessario con il backend in memoria condivisa); mai 0."""
+    value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def user_key(username: str) -> str:
+    """Chiave del contatore per username."""
+    return "user:" + username
+
+
+def client_key(client_id: str) -> str:
+    """Chiave del contatore per client (es. indirizzo IP)."""
+    return "client:" + client_id
+
+
+class AttemptLimiter:
+    """
+    Classe AttemptLimiter:
+    - Scopo: contare i tentativi di login falliti per chiave (username, client) su una
+      finestra scorrevole e bloccare temporaneamente le chiavi che superano la soglia.
+    - Motivazione: run() limita i tentativi solo all'interno di una sessione; il contatore
+      condiviso vede i tentativi di tutte le sessioni (e, con `shared_name`, di più processi).
+
+    Finestra scorrevole approssimata con due contatori (finestra corrente e precedente):
+    stima = precedente * (frazione residua della finestra precedente) + corrente.
+
+    Memoria: `capacity` slot da SLOT_BYTES byte, allocati una sola volta e divisi in `shards`
+    sezioni, ognuna con il proprio lock. Una chiave sonda al massimo `max_probe` slot del
+    proprio shard, quindi ogni operazione è O(1). Quando non ci sono slot liberi si riusa uno
+    slot scaduto (nessun tentativo nelle ultime due finestre e blocco terminato), altrimenti
+    lo slot non bloccato con la stima più bassa: un picco di milioni di chiavi distinte non
+    fa crescere la memoria e non libera le chiavi già bloccate finché esistono altre vittime.
+    """
+
+    def __init__(
+            self,
+            max_attempts: int = 5,
+            window: float = 300.0,
+            lockout: float = 900.0,
+            capacity: int = 1 << 16,
+            shards: int = 16,
+            max_probe: int = 8,
+            shared_name: Optional[str] = None,
+            create: bool = True,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param max_attempts: tentativi falliti nella finestra oltre i quali la chiave viene bloccata
+        :param window: durata della finestra scorrevole (secondi)
+        :param lockout: durata del blocco (secondi)
+        :param capacity: numero totale di slot (limite di memoria: capacity * SLOT_BYTES byte)
+        :param shards: numero di sezioni con lock indipendente
+        :param max_probe: slot sondati per chiave all'interno dello shard
+        :param shared_name: nome del blocco multiprocessing.shared_memory (None = memoria locale)
+        :param create: con `shared_name`, crea il blocco (True) o si collega a uno esistente (False)
+        :param clock: orologio monotono; con più processi deve essere condiviso (time.monotonic lo è)
+        """
+        self.max_attempts = max_attempts
+        self.window = window
+        self.lockout = lockout
+        self.shards = shards
+        self.shard_size = max(max_probe, -(-capacity // shards))
+        self.capacity = self.shard_size * shards
+        self.max_probe = min(max_probe, self.shard_size)
+        self.shared_name = shared_name
+        self.clock = clock
+        self._shm = None
+
+        size = self.capacity * SLOT_BYTES
+        if shared_name is None:
+            buffer = memoryview(bytearray(size))
+            self._locks = [threading.Lock() for _ in range(shards)]
+        else:
+            import multiprocessing
+
+            buffer = self._attach_shared(shared_name, size, create)
+            # I lock passano ai worker insieme all'istanza (argomento di Process / initializer);
+            # un processo che si collega solo per nome deve riceverli con share_locks().
+            self._locks = [multiprocessing.Lock() for _ in range(shards)] if create else None
+        self._map(buffer)
+        logger.info("AttemptLimiter: %d slot in %d shard (%d byte, %s)", self.capacity, shards, size,
+                    "condiviso '%s'" % shared_name if shared_name else "locale")
+
+    def _attach_shared(self, name: str, size: int, create: bool) -> memoryview:
+        from multiprocessing import resource_tracker, shared_memory
+
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        if not create:
+            # Solo il processo che crea il blocco ne gestisce la rimozione (unlink)
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        return self._shm.buf
+
+    def _map(self, buffer: memoryview) -> None:
+        n = self.capacity
+        self._buffer = buffer
+        self.hashes = buffer[0:8 * n].cast("Q")
+        self.locked = buffer[8 * n:16 * n].cast("d")
+        self.windows = buffer[16 * n:24 * n].cast("q")
+        self.current = buffer[24 * n:26 * n].cast("H")
+        self.previous = buffer[26 * n:28 * n].cast("H")
+
+    def share_locks(self, locks: List) -> None:
+        """
+        Imposta i lock (uno per shard) di un'istanza collegata con create=False,
+        ad es. limiter_creatore._locks ereditati dal processo che ha creato il blocco.
+        """
+        if len(locks) != self.shards:
+            raise ValueError(f"Servono {self.shards} lock, ricevuti {len(locks)}")
+        self._locks = list(locks)
+
+    def __getstate__(self) -> dict:
+        """Per i processi figli: con il backend condiviso si passa solo il nome del blocco e i lock."""
+        if self.shared_name is None:
+            raise TypeError("Solo un AttemptLimiter con shared_name può essere condiviso tra processi")
+        state = {k: v for k, v in self.__dict__.items()
+                 if k not in ("_shm", "_buffer", "hashes", "locked", "windows", "current", "previous")}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._map(self._attach_shared(self.shared_name, 0, create=False))
+
+    # ─── Accesso agli slot ────────────────────────────────────────────────────────────────────────
+
+    def _estimate(self, slot: int, now: float) -> float:
+        """Tentativi stimati nella finestra scorrevole che termina in `now`."""
+        index = int(now // self.window)
+        last = self.windows[slot]
+        if last == index:
+            weight = 1.0 - (now % self.window) / self.window
+            return self.previous[slot] * weight + self.current[slot]
+        if last == index - 1:
+            weight = 1.0 - (now % self.window) / self.window
+            return self.current[slot] * weight
+        return 0.0
+
+    def _find(self, h: int, base: int) -> int:
+        """Slot della chiave nello shard che inizia in `base`, oppure -1."""
+        start = (h // self.shards) % self.shard_size
+        hashes = self.hashes
+        for i in range(self.max_probe):
+            slot = base + (start + i) % self.shard_size
+            if hashes[slot] == h:
+                return slot
+        return -1
+
+    def _claim(self, h: int, base: int, now: float) -> int:
+        """Trova o alloca lo slot della chiave, sfrattando se necessario lo slot meno rilevante."""
+        start = (h // self.shards) % self.shard_size
+        hashes, locked, windows = self.hashes, self.locked, self.windows
+        index = int(now // self.window)
+        victim, victim_score = -1, None
+        for i in range(self.max_probe):
+            slot = base + (start + i) % self.shard_size
+            stored = hashes[slot]
+            if stored == h:
+                return slot
+            if stored == 0 or (windows[slot] < index - 1 and locked[slot] <= now):
+                score = (-1, 0.0)
+            else:
+                score = (int(locked[slot] > now), self._estimate(slot, now))
+            if victim_score is None or score < victim_score:
+                victim, victim_score = slot, score
+
+        if victim_score[0] >= 0 and hashes[victim]:
+            logger.debug("AttemptLimiter: sfratto dello slot %d (stima %.1f)", victim, victim_score[1])
+        hashes[victim] = h
+        locked[victim] = 0.0
+        windows[victim] = index
+        self.current[victim] = 0
+        self.previous[victim] = 0
+        return victim
+
+    def _roll(self, slot: int, now: float) -> None:
+        """Porta lo slot sulla finestra corrente spostando il contatore in `previous`."""
+        index = int(now // self.window)
+        last = self.windows[slot]
+        if last != index:
+            self.previous[slot] = self.current[slot] if last == index - 1 else 0
+            self.current[slot] = 0
+            self.windows[slot] = index
+
+    def _shard(self, h: int) -> int:
+        return h % self.shards
+
+    # ─── API ──────────────────────────────────────────────────────────────────────────────────────
+
+    def retry_after(self, key: str) -> float:
+        """Secondi mancanti alla fine del blocco della chiave (0.0 se non bloccata)."""
+        h = key_hash(key)
+        shard = self._shard(h)
+        now = self.clock()
+        with self._locks[shard]:
+            slot = self._find(h, shard * self.shard_size)
+            if slot < 0:
+                return 0.0
+            return max(0.0, self.locked[slot] - now)
+
+    def is_locked(self, key: str) -> bool:
+        """True se la chiave è attualmente bloccata."""
+        return self.retry_after(key) > 0.0
+
+    def attempts(self, key: str) -> float:
+        """Tentativi falliti stimati nella finestra scorrevole."""
+        h = key_hash(key)
+        shard = self._shard(h)
+        with self._locks[shard]:
+            slot = self._find(h, shard * self.shard_size)
+            return 0.0 if slot < 0 else self._estimate(slot, self.clock())
+
+    def record_failure(self, key: str) -> bool:
+        """
+        Registra un tentativo fallito per la chiave.
+        :return: True se la chiave risulta bloccata dopo questo tentativo
+        """
+        h = key_hash(key)
+        shard = self._shard(h)
+        now = self.clock()
+        with self._locks[shard]:
+            slot = self._claim(h, shard * self.shard_size, now)
+            self._roll(slot, now)
+            if self.current[slot] < MAX_COUNT:
+                self.current[slot] += 1
+            if self.locked[slot] > now:
+                return True
+            if self._estimate(slot, now) >= self.max_attempts:
+                self.locked[slot] = now + self.lockout
+                logger.warning("AttemptLimiter: chiave '%s' bloccata per %.0f s", key, self.lockout)
+                return True
+            return False
+
+    def record_success(self, key: str) -> None:
+        """Azzera il contatore della chiave dopo un accesso riuscito (libera lo slot)."""
+        h = key_hash(key)
+        shard = self._shard(h)
+        with self._locks[shard]:
+            slot = self._find(h, shard * self.shard_size)
+            if slot >= 0 and self.locked[slot] <= self.clock():
+                self.hashes[slot] = 0
+
+    def close(self) -> None:
+        """Rilascia le viste sul buffer; con il backend condiviso chiude il blocco (senza rimuoverlo)."""
+        for name in ("hashes", "locked", "windows", "current", "previous", "_buffer"):
+            getattr(self, name).release()
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self) -> None:
+        """Rimuove il blocco di memoria condivisa (da chiamare una sola volta, nel processo che lo ha creato)."""
+        if self._shm is not None:
+            self._shm.unlink()
+
+    def __repr__(self) -> str:
+        return (f"AttemptLimiter(max_attempts={self.max_attempts}, window={self.window}, "
+                f"lockout={self.lockout}, capacity={self.capacity}, shards={self.shards})")
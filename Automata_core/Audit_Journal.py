@@ -0,0 +1,373 @@
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from Automata_core.Attempt_Limiter import key_hash
+
+logger = logging.getLogger(__name__)
+
+# Formato di un segmento: MAGIC seguito da record contigui.
+# Record: intestazione fissa + username in UTF-8 (al massimo 255 byte)
+#   ts_ns   : int64  istante dell'evento (ns dall'epoch)
+#   user    : uint64 hash dell'username (key_hash, stabile tra processi)
+#   engine, event, outcome : uint8 codici (indici nelle tuple qui sotto)
+#   name_len: uint8  lunghezza dell'username
+#   crc     : uint32 CRC32 dei campi precedenti e dell'username (rileva record troncati o corrotti)
+MAGIC = b"AUDJNL01"
+RECORD = struct.Struct("<qQBBBBI")
+_PREFIX = struct.Struct("<qQBBBB")
+SEGMENT_PATTERN = "audit-{:08d}.log"
+
+ENGINES = ("dfa-sync", "dfa-async", "nfa-sync", "server", "nfa-async")   # nuovi codici solo in coda
+EVENTS = ("validate", "lockout")       # confronto delle credenziali / rifiuto per blocco
+OUTCOMES = ("failure", "success")
+_ENGINE_CODES = {name: code for code, name in enumerate(ENGINES)}
+_EVENT_CODES = {name: code for code, name in enumerate(EVENTS)}
+
+_STOP = object()
+
+
+class AuditRecord(NamedTuple):
+    timestamp: float      # secondi dall'epoch
+    user: str
+    engine: str
+    event: str
+    outcome: str
+
+
+def _segment_number(name: str) -> Optional[int]:
+    if name.startswith("audit-") and name.endswith(".log"):
+        try:
+            return int(name[6:-4])
+        except ValueError:
+            return None
+    return None
+
+
+def list_segments(directory: str) -> List[str]:
+    """Percorsi dei segmenti della directory, in ordine di scrittura."""
+    numbered = [(n, name) for name in os.listdir(directory) if (n := _segment_number(name)) is not None]
+    return [os.path.join(directory, name) for _, name in sorted(numbered)]
+
+
+class AuditJournal:
+    """
+    Classe AuditJournal:
+    - Scopo: registrare in modo durevole gli esiti delle autenticazioni in un journal binario
+      append-only, senza I/O sul disco nel percorso del login.
+    - Motivazione: un logging.info sincrono scrive (e un fsync attenderebbe il disco) a ogni
+      evento; qui record() mette solo una tupla in una coda limitata.
+
+    Un thread di scrittura svuota la coda a blocchi: tutti i record accumulati durante il
+    fsync precedente vengono scritti con un'unica write e resi durevoli con un unico fsync
+    (group commit). Il segmento corrente viene chiuso e se ne apre uno nuovo quando supera
+    segment_bytes byte o segment_seconds secondi. Se la coda è piena il record viene scartato
+    e contato in `dropped` (con block=True record() attende invece che si liberi spazio).
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            segment_bytes: int = 64 << 20,
+            segment_seconds: Optional[float] = None,
+            max_queue: int = 65536,
+            max_batch: int = 4096,
+            sync: bool = True,
+            block: bool = False,
+            clock: Callable[[], int] = time.time_ns
+    ):
+        """
+        :param directory: directory dei segmenti (creata se non esiste)
+        :param segment_bytes: dimensione oltre la quale il segmento viene ruotato
+        :param segment_seconds: età massima di un segmento (None = nessun limite di tempo)
+        :param max_queue: record in attesa di scrittura oltre i quali record() scarta (o attende)
+        :param max_batch: record scritti al massimo per ogni commit
+        :param sync: esegue fsync a ogni commit (False: solo write, durevolezza affidata al SO)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_batch = max_batch
+        self.sync = sync
+        self.block = block
+        self.clock = clock
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.commits = 0
+        os.makedirs(directory, exist_ok=True)
+        segments = list_segments(directory)
+        # Ogni apertura inizia un nuovo segmento: la coda troncata di un segmento precedente
+        # (crash durante una write) resta così l'ultima cosa del suo file.
+        self._segment = (_segment_number(os.path.basename(segments[-1])) + 1) if segments else 0
+        self._fd = -1
+        self._size = 0
+        self._opened = 0.0
+        self._open_segment()
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="audit-journal", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        """Percorso del segmento in scrittura."""
+        return os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment))
+
+    def _open_segment(self) -> None:
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        os.write(self._fd, MAGIC)
+        self._size = len(MAGIC)
+        self._opened = time.monotonic()
+        if self.sync:
+            os.fsync(self._fd)
+            # rende durevole anche la voce della directory del nuovo file
+            dir_fd = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        logger.info("AuditJournal: nuovo segmento %s", self.path)
+
+    def _rotate(self) -> None:
+        os.close(self._fd)
+        self._segment += 1
+        self._open_segment()
+
+    # ─── Percorso del login ───────────────────────────────────────────────────────────────────────
+
+    def record(self, user: str, engine: str, event: str, success: bool) -> bool:
+        """
+        Accoda un evento (engine in ENGINES, event in EVENTS); non esegue I/O.
+        :return: False se il record è stato scartato (coda piena o journal chiuso), contato in `dropped`
+        """
+        if self._closed:
+            # nessun thread di scrittura: il record resterebbe in coda per sempre
+            self.dropped += 1
+            return False
+        item = (self.clock(), user, _ENGINE_CODES[engine], _EVENT_CODES[event], 1 if success else 0)
+        try:
+            self.queue.put(item, block=self.block)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning("AuditJournal: coda piena, %d record scartati", self.dropped)
+            return False
+        return True
+
+    # ─── Thread di scrittura ──────────────────────────────────────────────────────────────────────
+
+    def _writer(self) -> None:
+        pack_prefix, pack_crc = _PREFIX.pack, struct.Struct("<I").pack
+        get, get_nowait = self.queue.get, self.queue.get_nowait
+        while True:
+            batch = [get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(get_nowait())
+            except queue.Empty:
+                pass
+
+            chunks = []
+            waiters = []
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    ts_ns, user, engine, event, outcome = item
+                    name = user.encode("utf-8", "replace")[:255]
+                    prefix = pack_prefix(ts_ns, key_hash(user), engine, event, outcome, len(name))
+                    chunks.append(prefix + pack_crc(zlib.crc32(name, zlib.crc32(prefix))) + name)
+
+            if chunks:
+                try:
+                    data = b"".join(chunks)
+                    os.write(self._fd, data)
+                    if self.sync:
+                        os.fsync(self._fd)
+                    self._size += len(data)
+                    self.written += len(chunks)
+                    self.commits += 1
+                    if self._size >= self.segment_bytes or (
+                            self.segment_seconds is not None
+                            and time.monotonic() - self._opened >= self.segment_seconds):
+                        self._rotate()
+                except OSError:
+                    logger.exception("AuditJournal: scrittura di %d record fallita", len(chunks))
+                    self.dropped += len(chunks)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attende che i record accodati finora siano scritti (e sincronizzati con sync=True)."""
+        if self._closed:
+            # close() ha già scritto tutta la coda
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Scrive i record in coda, ferma il thread e chiude il segmento."""
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(_STOP)
+        self._thread.join()
+        os.close(self._fd)
+        logger.info("AuditJournal chiuso: %d record in %d commit, %d scartati",
+                    self.written, self.commits, self.dropped)
+
+    def __enter__(self) -> "AuditJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _SegmentIndex:
+    """Indice di un segmento: offset e istante di ogni record, record per hash dell'username."""
+    __slots__ = ("offsets", "times", "users", "scanned", "ordered")
+
+    def __init__(self):
+        self.offsets = array('Q')
+        self.times = array('q')
+        self.users: Dict[int, array] = {}
+        self.scanned = len(MAGIC)
+        self.ordered = True          # istanti non decrescenti: ricerca binaria per intervallo
+
+
+class AuditReader:
+    """
+    Classe AuditReader:
+    Obiettivo: interrogare il journal per username e intervallo di tempo senza rileggerlo tutto.
+
+    Alla prima lettura ogni segmento viene scandito una volta e indicizzato (offset e istante
+    di ogni record, lista dei record per hash dell'username); alle letture successive si
+    indicizzano solo i byte aggiunti, quindi il reader può seguire un journal ancora in scrittura.
+    I segmenti fuori dall'intervallo richiesto vengono saltati senza aprirli.
+    La scansione si ferma al primo record incompleto o con CRC errato (coda di una write interrotta).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._indexes: Dict[str, _SegmentIndex] = {}
+
+    def _refresh(self, path: str) -> _SegmentIndex:
+        index = self._indexes.get(path)
+        if index is None:
+            index = self._indexes[path] = _SegmentIndex()
+        with open(path, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path}: non è un segmento del journal di audit")
+            fh.seek(index.scanned)
+            data = fh.read()
+        pos, end, base = 0, len(data), index.scanned
+        unpack = RECORD.unpack_from
+        size = RECORD.size
+        times, offsets, users = index.times, index.offsets, index.users
+        while pos + size <= end:
+            ts_ns, user, engine, event, outcome, name_len, crc = unpack(data, pos)
+            if pos + size + name_len > end:
+                break
+            if zlib.crc32(data[pos + size:pos + size + name_len],
+                          zlib.crc32(data[pos:pos + _PREFIX.size])) != crc:
+                logger.warning("%s: record non valido all'offset %d, scansione interrotta", path, base + pos)
+                break
+            if times and ts_ns < times[-1]:
+                index.ordered = False
+            users.setdefault(user, array('I')).append(len(offsets))
+            offsets.append(base + pos)
+            times.append(ts_ns)
+            pos += size + name_len
+        index.scanned = base + pos
+        return index
+
+    @staticmethod
+    def _decode(data, offset: int) -> AuditRecord:
+        ts_ns, _, engine, event, outcome, name_len, _ = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        return AuditRecord(ts_ns / 1e9, bytes(data[start:start + name_len]).decode("utf-8", "replace"),
+                           ENGINES[engine], EVENTS[event], OUTCOMES[outcome])
+
+    def query(self, user: Optional[str] = None, start: Optional[float] = None,
+              end: Optional[float] = None) -> Iterator[AuditRecord]:
+        """
+        Record dell'username `user` (tutti se None) con istante in [start, end) (secondi
+        dall'epoch, estremi opzionali), nell'ordine in cui sono stati scritti.
+        """
+        lo = -(1 << 63) if start is None else int(start * 1e9)
+        hi = (1 << 63) - 1 if end is None else int(end * 1e9)
+        target = key_hash(user) if user is not None else None
+        for path in list_segments(self.directory):
+            index = self._refresh(path)
+            times = index.times
+            if not times or (index.ordered and (times[-1] < lo or times[0] >= hi)):
+                continue
+            if target is not None:
+                positions = index.users.get(target)
+                if not positions:
+                    continue
+                if index.ordered:
+                    positions = positions[bisect_left(positions, bisect_left(times, lo)):
+                                          bisect_left(positions, bisect_left(times, hi))]
+            elif index.ordered:
+                positions = range(bisect_left(times, lo), bisect_left(times, hi))
+            else:
+                positions = range(len(times))
+            if not positions:
+                continue
+            with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for i in positions:
+                    if not lo <= times[i] < hi:
+                        continue
+                    record = self._decode(data, index.offsets[i])
+                    if user is None or record.user == user:   # esclude collisioni dell'hash
+                        yield record
+
+    def __iter__(self) -> Iterator[AuditRecord]:
+        return self.query()
+
+    def count(self) -> int:
+        """Numero di record validi nel journal."""
+        return sum(len(self._refresh(path).offsets) for path in list_segments(self.directory))
+
+
+def _parse_time(text: Optional[str]) -> Optional[float]:
+    """Istante da riga di comando: secondi dall'epoch oppure data ISO 8601."""
+    if text is None:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text).timestamp()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+    parser = argparse.ArgumentParser(description="Interroga il journal di audit delle autenticazioni")
+    parser.add_argument("directory")
+    parser.add_argument("--user", help="solo i record di questo username")
+    parser.add_argument("--since", help="istante iniziale (epoch o ISO 8601, es. 2024-05-01T10:00)")
+    parser.add_argument("--until", help="istante finale escluso (epoch o ISO 8601)")
+    args = parser.parse_args()
+
+    reader = AuditReader(args.directory)
+    for rec in reader.query(args.user, _parse_time(args.since), _parse_time(args.until)):
+        stamp = datetime.fromtimestamp(rec.timestamp).isoformat(timespec="milliseconds")
+        print(f"{stamp} {rec.engine:<9} {rec.event:<8} {rec.outcome:<7} {rec.user}")
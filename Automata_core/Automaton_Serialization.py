@@ -0,0 +1,115 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List
+
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+
+logger = logging.getLogger(__name__)
+
+# Formato binario versionato di un CompiledDFA (little-endian):
+#   header        : magic, versione, n_stati, larghezza, start, dead,
+#                   offset/lunghezza alfabeto, offset tabella, offset mappa di accettazione
+#   alfabeto      : per ogni simbolo [lunghezza u16][UTF-8]
+#   tabella       : n_stati × larghezza int32, allineata a 8 byte (table[stato * width + colonna])
+#   accettazione  : un byte per stato (1 = accettante), indicizzabile direttamente
+# Il caricamento legge solo header e alfabeto: tabella e accettazione restano viste sul mmap,
+# quindi l'avvio è a tempo costante e i processi figli condividono le stesse pagine.
+MAGIC = b"DFABIN01"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIIIIIIQQ")
+SYMBOL_LEN = struct.Struct("<H")
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def save_dfa(dfa: CompiledDFA, path: str) -> None:
+    """
+    Funzione save_dfa:
+    Obiettivo: scrivere il DFA nel formato binario (scrittura atomica tramite file temporaneo).
+    """
+    alphabet = b"".join(SYMBOL_LEN.pack(len(encoded)) + encoded
+                        for encoded in (symbol.encode() for symbol in dfa.alphabet))
+    alphabet_offset = HEADER.size
+    table_offset = _align(alphabet_offset + len(alphabet))
+    table = array('i', dfa.table)
+    if sys.byteorder != "little":
+        table.byteswap()
+    accept_offset = table_offset + len(table) * table.itemsize
+
+    header = HEADER.pack(MAGIC, VERSION, 0, dfa.n_states, dfa.width, dfa.start, dfa.dead,
+                         alphabet_offset, len(alphabet), table_offset, accept_offset)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(header)
+        fh.write(alphabet)
+        fh.write(b"\0" * (table_offset - alphabet_offset - len(alphabet)))
+        fh.write(table.tobytes())
+        fh.write(bytes(dfa.accepting))
+    os.replace(tmp_path, path)
+    logger.info("save_dfa: %s (%d stati, %d simboli)", path, dfa.n_states, len(dfa.alphabet))
+
+
+def save_automaton(automaton, path: str) -> CompiledDFA:
+    """
+    Salva qualsiasi motore del repository: un CompiledDFA oppure un oggetto con compile()
+    (NFA di NFA_sys / NFA_asys, LoginDFA, AsyncDFALogin). Restituisce il DFA salvato.
+    """
+    dfa = automaton if isinstance(automaton, CompiledDFA) else automaton.compile()
+    save_dfa(dfa, path)
+    return dfa
+
+
+def load_dfa(path: str) -> CompiledDFA:
+    """
+    Funzione load_dfa:
+    Obiettivo: caricare un DFA salvato con save_dfa tramite mmap, senza analizzare gli archi.
+    La tabella è un memoryview int32 sul file; il mmap resta aperto finché il DFA è in uso.
+    """
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    size = len(mm)
+    if size < HEADER.size:
+        mm.close()
+        raise ValueError(f"File automa troppo corto ({size} byte): {path}")
+    (magic, version, _, n_states, width, start, dead,
+     alphabet_offset, alphabet_size, table_offset, accept_offset) = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        mm.close()
+        raise ValueError(f"File automa non valido o di versione non supportata: {path}")
+    # Le sezioni indicate dall'header devono stare nel file (un file troncato non deve
+    # produrre una tabella corta o un errore di struct durante la lettura)
+    if (alphabet_offset + alphabet_size > size
+            or table_offset + n_states * width * 4 > size
+            or accept_offset + n_states > size):
+        mm.close()
+        raise ValueError(f"{path}: dimensione {size} incoerente con l'header")
+
+    alphabet: List[str] = []
+    pos, alphabet_end = alphabet_offset, alphabet_offset + alphabet_size
+    while pos < alphabet_end:
+        (length,) = SYMBOL_LEN.unpack_from(mm, pos)
+        pos += SYMBOL_LEN.size
+        alphabet.append(mm[pos:pos + length].decode())
+        pos += length
+    if len(alphabet) + 1 != width:
+        mm.close()
+        raise ValueError(f"Alfabeto incoerente con la larghezza della tabella: {path}")
+
+    view = memoryview(mm)
+    table_bytes = view[table_offset:table_offset + n_states * width * 4]
+    if sys.byteorder == "little":
+        table = table_bytes.cast("i")
+    else:
+        table = array('i', table_bytes.tobytes())
+        table.byteswap()
+    accepting = view[accept_offset:accept_offset + n_states]
+
+    dfa = CompiledDFA(alphabet, table, start, accepting, dead)
+    dfa._mmap = mm
+    return dfa
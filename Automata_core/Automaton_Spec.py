@@ -0,0 +1,153 @@
+import json
+import logging
+from array import array
+from typing import Any, Collection, Dict, Mapping, Optional, Tuple
+
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA, compile_table
+
+logger = logging.getLogger(__name__)
+
+
+class AutomatonSpec:
+    """
+    Classe AutomatonSpec:
+    - Scopo: descrivere un flusso a eventi (stati, eventi, transizioni, stati di accettazione
+      e di errore) come dati, da un dict o da un file JSON, invece che con codice di branching.
+    - Il flusso viene compilato con compile() in una TableAutomaton condivisa dai motori.
+
+    Formato (dict o JSON):
+
+        {
+          "start": "START",
+          "accept": ["AUTH_SUCCESS"],
+          "error": null,
+          "transitions": {
+            "START": {"input_username": "USERNAME_ENTERED"},
+            ...
+          }
+        }
+
+    Con "error" le coppie (stato, evento) non definite portano nello stato di errore;
+    senza, portano nello stato pozzo della tabella (evento rifiutato).
+    """
+
+    def __init__(
+            self,
+            start: str,
+            transitions: Mapping[Tuple[str, str], str],
+            accept: Collection[str] = (),
+            error: Optional[str] = None
+    ):
+        self.start = start
+        self.transitions: Dict[Tuple[str, str], str] = dict(transitions)
+        self.accept = frozenset(accept)
+        self.error = error
+        self.events = tuple(sorted({event for _, event in self.transitions}))
+        states = {self.start} | set(self.accept)
+        for (source, _), target in self.transitions.items():
+            states.update((source, target))
+        if error is not None:
+            states.add(error)
+        self.states = tuple(sorted(states))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "AutomatonSpec":
+        """Costruisce la specifica dal formato dict/JSON; ValueError se il formato non è valido."""
+        try:
+            start = data["start"]
+            table = data["transitions"]
+        except KeyError as exc:
+            raise ValueError(f"Specifica non valida: manca la chiave {exc}") from None
+        if not isinstance(table, Mapping):
+            raise ValueError("Specifica non valida: 'transitions' deve essere un oggetto stato -> {evento: stato}")
+        transitions = {}
+        for source, row in table.items():
+            if not isinstance(row, Mapping):
+                raise ValueError(f"Specifica non valida: transizioni dello stato '{source}' non sono un oggetto")
+            for event, target in row.items():
+                if not isinstance(target, str):
+                    raise ValueError(f"Specifica non valida: destinazione di ('{source}', '{event}') non è uno stato")
+                transitions[(source, event)] = target
+        unknown = set(data) - {"start", "accept", "error", "transitions"}
+        if unknown:
+            raise ValueError(f"Specifica non valida: chiavi sconosciute {sorted(unknown)}")
+        return cls(start, transitions, data.get("accept", ()), data.get("error"))
+
+    @classmethod
+    def load(cls, path: str) -> "AutomatonSpec":
+        """Legge la specifica da un file JSON."""
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_dict(json.load(fh))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Formato dict/JSON della specifica (inverso di from_dict)."""
+        table: Dict[str, Dict[str, str]] = {}
+        for (source, event), target in self.transitions.items():
+            table.setdefault(source, {})[event] = target
+        return {"start": self.start, "accept": sorted(self.accept), "error": self.error, "transitions": table}
+
+    def compile(self) -> "TableAutomaton":
+        return TableAutomaton(self)
+
+    def __repr__(self) -> str:
+        return (f"AutomatonSpec(states={len(self.states)}, events={len(self.events)}, "
+                f"transitions={len(self.transitions)}, start={self.start!r})")
+
+
+class TableAutomaton:
+    """
+    Classe TableAutomaton:
+    - Scopo: eseguire una AutomatonSpec con stati ed eventi interi.
+    - Motivazione: i motori risolvono i nomi una sola volta (state_id / event_id, fuori dal
+      percorso caldo); ogni transizione è poi un solo accesso alla tabella piatta, senza
+      hash di tuple di stringhe né confronti tra membri di Enum.
+
+    La tabella è quella di un CompiledDFA prodotto da compile_table (stessa numerazione
+    BFS degli stati, colonna 0 per gli eventi fuori alfabeto): `dfa` si può quindi usare
+    anche per run_batch o per la serializzazione su disco.
+    """
+
+    def __init__(self, spec: AutomatonSpec):
+        self.spec = spec
+        # stato di errore e stati di accettazione hanno sempre un id, anche se non raggiungibili
+        keep = ([spec.error] if spec.error is not None else []) + sorted(spec.accept)
+        self.dfa: CompiledDFA = compile_table(spec.transitions, spec.start, spec.accept,
+                                              spec.events, default=spec.error, keep=keep)
+        self.table: array = self.dfa.table
+        self.width = self.dfa.width
+        self.start = self.dfa.start
+        self.dead = self.dfa.dead
+        self.names = tuple("<dead>" if label is None else label for label in self.dfa.labels)
+        self.state_ids: Dict[str, int] = {name: i for i, name in enumerate(self.dfa.labels) if name is not None}
+        self.event_ids: Dict[str, int] = dict(self.dfa.columns)
+        self.event_names = ("<unknown>",) + self.dfa.alphabet          # colonna -> nome dell'evento
+        self.error = self.state_ids[spec.error] if spec.error is not None else self.dead
+        logger.info("TableAutomaton: %d stati, %d eventi", len(self.names), len(self.event_ids))
+
+    def state_id(self, name: str) -> int:
+        """
+        Id intero dello stato (KeyError se lo stato non è raggiungibile dallo stato iniziale;
+        stato di errore e stati di accettazione hanno sempre un id).
+        """
+        return self.state_ids[name]
+
+    def event_id(self, name: str) -> int:
+        """Colonna dell'evento (0 se l'evento non compare nella specifica)."""
+        return self.event_ids.get(name, 0)
+
+    def resolve(self, *events: str) -> Tuple[int, ...]:
+        """Colonne di più eventi; ValueError se uno non compare nella specifica (da usare all'avvio)."""
+        missing = [event for event in events if event not in self.event_ids]
+        if missing:
+            raise ValueError(f"Eventi non definiti nella specifica: {missing}")
+        return tuple(self.event_ids[event] for event in events)
+
+    def step(self, state: int, event: int) -> int:
+        """Una transizione: un solo accesso alla tabella."""
+        return self.table[state * self.width + event]
+
+    def is_accepting(self, state: int) -> bool:
+        return bool(self.dfa.accepting[state])
+
+    def __repr__(self) -> str:
+        return f"TableAutomaton(states={list(self.names)}, events={list(self.event_ids)})"
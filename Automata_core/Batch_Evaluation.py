@@ -0,0 +1,87 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+
+
+def batch_table(dfa: CompiledDFA) -> np.ndarray:
+    """
+    Funzione batch_table:
+    Obiettivo: convertire la tabella piatta del DFA in una matrice NumPy (stati × colonne)
+    con una colonna aggiuntiva di padding che lascia invariato lo stato.
+
+    La matrice viene calcolata una sola volta e memorizzata sul DFA.
+    """
+    cached = getattr(dfa, "_batch_table", None)
+    if cached is None:
+        table = np.frombuffer(dfa.table, dtype=np.int32).reshape(dfa.n_states, dfa.width)
+        padding = np.arange(dfa.n_states, dtype=np.int32)[:, None]
+        cached = np.ascontiguousarray(np.concatenate([table, padding], axis=1))
+        dfa._batch_table = cached
+    return cached
+
+
+def encode_sequences(dfa: CompiledDFA, sequences: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Funzione encode_sequences:
+    Obiettivo: codificare le sequenze di simboli in una matrice intera con padding.
+
+    Restituisce:
+    - matrix: int32 di forma (n_sequenze, lunghezza_massima); ogni cella è la colonna
+      del simbolo nel DFA (0 se fuori alfabeto) oppure `dfa.width` (padding).
+    - lengths: int64 con la lunghezza di ciascuna sequenza.
+
+    Se tutte le sequenze sono stringhe e l'alfabeto è fatto di singoli caratteri
+    (es. tracce 'up', 'xy' di login_process) la codifica è interamente vettoriale:
+    le stringhe vengono concatenate, convertite in codepoint e mappate con una tabella.
+    """
+    lengths = np.fromiter((len(seq) for seq in sequences), dtype=np.int64, count=len(sequences))
+    max_len = int(lengths.max()) if len(sequences) else 0
+    matrix = np.full((len(sequences), max_len), dfa.width, dtype=np.int32)
+    filled = np.arange(max_len)[None, :] < lengths[:, None]
+
+    single_chars = all(len(sym) == 1 for sym in dfa.alphabet)
+    if single_chars and all(isinstance(seq, str) for seq in sequences):
+        codepoints = np.frombuffer("".join(sequences).encode("utf-32-le"), dtype=np.uint32)
+        lookup_size = max([ord(sym) for sym in dfa.alphabet], default=0) + 1
+        lookup = np.zeros(lookup_size, dtype=np.int32)
+        for sym, col in dfa.columns.items():
+            lookup[ord(sym)] = col
+        in_range = codepoints < lookup_size
+        codes = np.zeros(len(codepoints), dtype=np.int32)
+        codes[in_range] = lookup[codepoints[in_range]]
+    else:
+        columns = dfa.columns
+        codes = np.fromiter(
+            (columns.get(sym, 0) for seq in sequences for sym in seq),
+            dtype=np.int32,
+            count=int(lengths.sum())
+        )
+
+    # L'ordine row-major di `filled` coincide con l'ordine della concatenazione
+    matrix[filled] = codes
+    return matrix, lengths
+
+
+def run_encoded(dfa: CompiledDFA, matrix: np.ndarray) -> np.ndarray:
+    """
+    Funzione run_encoded:
+    Obiettivo: far avanzare tutte le sequenze insieme, una colonna della matrice alla volta,
+    con l'indicizzazione vettoriale state = table[state, colonna].
+    """
+    table = batch_table(dfa)
+    state = np.full(matrix.shape[0], dfa.start, dtype=np.int32)
+    for t in range(matrix.shape[1]):
+        state = table[state, matrix[:, t]]
+    return np.frombuffer(dfa.accepting, dtype=np.uint8)[state].astype(bool)
+
+
+def run_batch(dfa: CompiledDFA, sequences: Sequence[Sequence[str]]) -> np.ndarray:
+    """
+    Funzione run_batch:
+    Obiettivo: valutare molte sequenze di simboli con un solo DFA compilato,
+    restituendo un vettore booleano di accettazione (uno per sequenza).
+    """
+    matrix, _ = encode_sequences(dfa, sequences)
+    return run_encoded(dfa, matrix)
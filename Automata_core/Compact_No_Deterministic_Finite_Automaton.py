@@ -0,0 +1,279 @@
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA, minimize, subset_construction
+
+logger = logging.getLogger(__name__)
+
+EPSILON = 0  # Id di simbolo riservato alle ε-transizioni
+
+
+class CompactNFA:
+    """
+    Classe CompactNFA:
+    - Scopo: memorizzare NFA molto grandi (milioni di stati) senza un oggetto per stato.
+    - Motivazione: un NFA_asys.State con dict di liste e lista di ε-archi costa centinaia di byte;
+      qui uno stato costa 4 byte di offset più 8 byte per arco e un bit di accettazione.
+
+    Rappresentazione (CSR, stati interi 0..n_states-1):
+    - offsets[s]..offsets[s+1]: intervallo degli archi uscenti dallo stato s;
+    - symbols[i]: id del simbolo dell'arco i (0 = ε), archi di ogni stato ordinati per simbolo;
+    - targets[i]: stato di arrivo dell'arco i;
+    - accept: bitmap, bit s = 1 se lo stato s è di accettazione;
+    - alphabet[id]: simbolo corrispondente all'id (alphabet[0] è il segnaposto di ε).
+    """
+
+    def __init__(
+            self,
+            offsets: array,
+            symbols: array,
+            targets: array,
+            accept: bytearray,
+            alphabet: List[Optional[str]],
+            start: int
+    ):
+        self.offsets = offsets
+        self.symbols = symbols
+        self.targets = targets
+        self.accept = accept
+        self.alphabet = alphabet
+        self.symbol_ids: Dict[str, int] = {sym: i for i, sym in enumerate(alphabet) if i != EPSILON}
+        self.start = start
+
+    @property
+    def n_states(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.targets)
+
+    def nbytes(self) -> int:
+        """Memoria occupata dagli array della rappresentazione (esclusi i simboli dell'alfabeto)."""
+        return (len(self.offsets) * self.offsets.itemsize + len(self.symbols) * self.symbols.itemsize
+                + len(self.targets) * self.targets.itemsize + len(self.accept))
+
+    def is_accept(self, state: int) -> bool:
+        """Verifica il bit di accettazione dello stato."""
+        return bool(self.accept[state >> 3] >> (state & 7) & 1)
+
+    def edges(self, state: int) -> Iterator[Tuple[Optional[str], int]]:
+        """Archi uscenti (simbolo, destinazione); il simbolo è None per le ε-transizioni."""
+        for i in range(self.offsets[state], self.offsets[state + 1]):
+            yield self.alphabet[self.symbols[i]], self.targets[i]
+
+    def _targets(self, state: int, symbol_id: int) -> Iterable[int]:
+        """Destinazioni degli archi di `state` con simbolo `symbol_id` (ricerca binaria nell'intervallo)."""
+        lo, hi = self.offsets[state], self.offsets[state + 1]
+        first = bisect_left(self.symbols, symbol_id, lo, hi)
+        last = bisect_right(self.symbols, symbol_id, first, hi)
+        return self.targets[first:last]
+
+    def epsilon_closure(self, states: Iterable[int]) -> Set[int]:
+        """Insieme degli stati raggiungibili da `states` con sole ε-transizioni."""
+        offsets, symbols, targets = self.offsets, self.symbols, self.targets
+        closure = set(states)
+        pending = list(closure)
+        while pending:
+            state = pending.pop()
+            # Gli archi ε hanno id 0, quindi sono i primi dell'intervallo
+            i, hi = offsets[state], offsets[state + 1]
+            while i < hi and symbols[i] == EPSILON:
+                target = targets[i]
+                if target not in closure:
+                    closure.add(target)
+                    pending.append(target)
+                i += 1
+        return closure
+
+    def step(self, states: Iterable[int], symbol: str) -> Set[int]:
+        """Un passo della simulazione: successori per `symbol`, già ε-chiusi."""
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            return set()
+        nxt: Set[int] = set()
+        for state in states:
+            nxt.update(self._targets(state, symbol_id))
+        return self.epsilon_closure(nxt) if nxt else nxt
+
+    def run(self, symbols: Iterable[str]) -> bool:
+        """Esegue l'NFA sull'intera sequenza e restituisce True se accettata."""
+        current = self.epsilon_closure((self.start,))
+        for symbol in symbols:
+            current = self.step(current, symbol)
+            if not current:
+                return False
+        return any(self.is_accept(state) for state in current)
+
+    def to_dfa(self, minimized: bool = True) -> CompiledDFA:
+        """Determinizza l'NFA (subset construction su frozenset di stati interi)."""
+        def move(subset: FrozenSet[int], symbol: str) -> FrozenSet[int]:
+            return frozenset(self.step(subset, symbol))
+
+        dfa = subset_construction(
+            frozenset(self.epsilon_closure((self.start,))),
+            sorted(self.symbol_ids),
+            move,
+            lambda subset: any(self.is_accept(state) for state in subset)
+        )
+        return minimize(dfa) if minimized else dfa
+
+    def __repr__(self) -> str:
+        return (f"CompactNFA(states={self.n_states}, edges={self.n_edges}, "
+                f"symbols={len(self.alphabet) - 1}, start={self.start})")
+
+
+class StateRef:
+    """
+    Riferimento leggero a uno stato del builder, con la stessa interfaccia di
+    NFA_asys.State (add_transition / add_epsilon): il codice che costruisce grafi di
+    State può costruire un CompactNFA senza modifiche.
+    """
+    __slots__ = ("builder", "id")
+
+    def __init__(self, builder: "CompactNFABuilder", state_id: int):
+        self.builder = builder
+        self.id = state_id
+
+    def add_transition(self, symbol: str, state: "StateRef") -> None:
+        self.builder.add_transition(self.id, symbol, state.id)
+
+    def add_epsilon(self, state: "StateRef") -> None:
+        self.builder.add_epsilon(self.id, state.id)
+
+    @property
+    def is_accept(self) -> bool:
+        return self.id in self.builder.accept_states
+
+    @is_accept.setter
+    def is_accept(self, value: bool) -> None:
+        if value:
+            self.builder.accept_states.add(self.id)
+        else:
+            self.builder.accept_states.discard(self.id)
+
+
+class CompactNFABuilder:
+    """
+    Classe CompactNFABuilder:
+    Obiettivo: accumulare stati e archi in array compatti (12 byte per arco) e produrre
+    il CompactNFA con build(), che ordina gli archi e calcola gli offset CSR.
+    """
+
+    def __init__(self):
+        self.n_states = 0
+        self.accept_states: Set[int] = set()
+        self.alphabet: List[Optional[str]] = [None]      # id 0 = ε
+        self.symbol_ids: Dict[str, int] = {}
+        self._sources = array('I')
+        self._symbols = array('I')
+        self._targets = array('I')
+
+    def add_state(self, accept: bool = False) -> int:
+        """Aggiunge uno stato e ne restituisce l'id."""
+        state = self.n_states
+        self.n_states += 1
+        if accept:
+            self.accept_states.add(state)
+        return state
+
+    def new_state(self, accept: bool = False) -> StateRef:
+        """Come add_state, ma restituisce un StateRef con add_transition / add_epsilon."""
+        return StateRef(self, self.add_state(accept))
+
+    def _symbol_id(self, symbol: str) -> int:
+        symbol_id = self.symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self.symbol_ids[symbol] = len(self.alphabet)
+            self.alphabet.append(symbol)
+        return symbol_id
+
+    def add_transition(self, source: int, symbol: str, target: int) -> None:
+        """Aggiunge l'arco source --symbol--> target."""
+        self._sources.append(source)
+        self._symbols.append(self._symbol_id(symbol))
+        self._targets.append(target)
+
+    def add_epsilon(self, source: int, target: int) -> None:
+        """Aggiunge l'ε-transizione source --ε--> target."""
+        self._sources.append(source)
+        self._symbols.append(EPSILON)
+        self._targets.append(target)
+
+    def build(self, start: int = 0) -> CompactNFA:
+        """
+        Produce il CompactNFA: ordina gli archi per (stato, simbolo) e scrive gli array CSR.
+        Gli archi duplicati sono mantenuti (non cambiano il linguaggio riconosciuto).
+        """
+        n, m = self.n_states, len(self._sources)
+        sources, symbols, targets = self._sources, self._symbols, self._targets
+
+        # 1. Counting sort per stato di origine: memoria aggiuntiva solo per gli array di uscita
+        offsets = array('I', bytes(4 * (n + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for state in range(n):
+            offsets[state + 1] += offsets[state]
+        fill = offsets[:-1]
+        out_symbols = array('I', bytes(4 * m))
+        out_targets = array('I', bytes(4 * m))
+        for i in range(m):
+            pos = fill[sources[i]]
+            out_symbols[pos] = symbols[i]
+            out_targets[pos] = targets[i]
+            fill[sources[i]] = pos + 1
+
+        # 2. Ordinamento per simbolo all'interno di ogni stato (ε per primi), solo se necessario
+        for state in range(n):
+            lo, hi = offsets[state], offsets[state + 1]
+            if hi - lo > 1 and any(out_symbols[i] > out_symbols[i + 1] for i in range(lo, hi - 1)):
+                pairs = sorted(zip(out_symbols[lo:hi], out_targets[lo:hi]))
+                out_symbols[lo:hi] = array('I', (sym for sym, _ in pairs))
+                out_targets[lo:hi] = array('I', (tgt for _, tgt in pairs))
+
+        accept = bytearray((n + 7) // 8)
+        for state in self.accept_states:
+            accept[state >> 3] |= 1 << (state & 7)
+
+        nfa = CompactNFA(offsets, out_symbols, out_targets, accept, list(self.alphabet), start)
+        logger.info("CompactNFABuilder.build: %d stati, %d archi, %d byte", n, nfa.n_edges, nfa.nbytes())
+        return nfa
+
+
+def from_state_graph(start_state, accept_states: Iterable = ()) -> CompactNFA:
+    """
+    Funzione from_state_graph:
+    Obiettivo: convertire un grafo di NFA_asys.State (o di qualunque oggetto con
+    transitions / epsilon_transitions / is_accept) in un CompactNFA.
+    Gli stati raggiungibili sono numerati in ordine BFS a partire da start_state (id 0).
+    """
+    builder = CompactNFABuilder()
+    index = {}
+    accepts = set(map(id, accept_states))
+
+    def state_id(state) -> int:
+        sid = index.get(id(state))
+        if sid is None:
+            sid = index[id(state)] = builder.add_state(state.is_accept or id(state) in accepts)
+            queue.append(state)
+        return sid
+
+    queue = deque()
+    state_id(start_state)
+    while queue:
+        state = queue.popleft()
+        source = index[id(state)]
+        for target in state.epsilon_transitions:
+            builder.add_epsilon(source, state_id(target))
+        for symbol, targets in state.transitions.items():
+            for target in targets:
+                builder.add_transition(source, symbol, state_id(target))
+    return builder.build(start=0)
+
+
+def from_nfa(nfa) -> CompactNFA:
+    """Converte un NFA_asys.NFA (stato iniziale e stati di accettazione) in un CompactNFA."""
+    return from_state_graph(nfa.start_state, nfa.accept_states)
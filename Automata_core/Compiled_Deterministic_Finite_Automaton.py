@@ -0,0 +1,280 @@
+import logging
+from array import array
+from collections import deque
+from typing import Callable, Collection, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledDFA:
+    """
+    Classe CompiledDFA:
+    - Scopo: rappresentare un DFA compatto con stati interi e tabella di transizione piatta.
+    - Motivazione: pagare una sola volta il costo di compilazione (subset construction
+      e minimizzazione) e avere poi un solo accesso in tabella per ogni simbolo.
+
+    Layout della tabella:
+    - table[stato * width + colonna] -> stato successivo.
+    - La colonna 0 è riservata ai simboli fuori alfabeto e porta sempre nello stato `dead`.
+    - Le colonne 1..len(alphabet) corrispondono ai simboli di `alphabet`, nell'ordine dato.
+    - labels[stato], se presente, è il nome dello stato d'origine (vedi compile_table).
+    """
+
+    def __init__(
+            self,
+            alphabet: Sequence[str],
+            table: array,
+            start: int,
+            accepting: bytearray,
+            dead: int,
+            labels: Sequence[Hashable] = ()
+    ):
+        self.alphabet = tuple(alphabet)                                          # Simboli validi
+        self.columns = {sym: col for col, sym in enumerate(self.alphabet, 1)}    # simbolo -> colonna
+        self.width = len(self.alphabet) + 1                                      # Colonne per stato
+        self.table = table                                                       # Tabella piatta
+        self.start = start                                                       # Stato iniziale
+        self.accepting = accepting                                               # 1 se accettante
+        self.dead = dead                                                         # Stato pozzo
+        self.n_states = len(accepting)
+        self.labels = tuple(labels)                                              # Nomi degli stati
+
+    def column(self, symbol: str) -> int:
+        """Restituisce la colonna associata al simbolo (0 se fuori alfabeto)."""
+        return self.columns.get(symbol, 0)
+
+    def step(self, state: int, symbol: str) -> int:
+        """Elabora un singolo simbolo: un accesso al dizionario delle colonne e uno in tabella."""
+        return self.table[state * self.width + self.columns.get(symbol, 0)]
+
+    def is_accepting(self, state: int) -> bool:
+        """Verifica se `state` è uno stato di accettazione."""
+        return bool(self.accepting[state])
+
+    def run(self, symbols: Iterable[str]) -> bool:
+        """
+        Esegue il DFA sull'intera sequenza di simboli e restituisce True se accettata.
+        L'esecuzione si interrompe appena si entra nello stato pozzo.
+        """
+        table, width, columns, dead = self.table, self.width, self.columns, self.dead
+        state = self.start
+        for symbol in symbols:
+            state = table[state * width + columns.get(symbol, 0)]
+            if state == dead:
+                return False
+        return bool(self.accepting[state])
+
+    def run_batch(self, sequences: Sequence[Sequence[str]]):
+        """
+        Esegue il DFA su molte sequenze insieme con indicizzazione vettoriale NumPy
+        (vedi Automata_core.Batch_Evaluation). Restituisce un vettore booleano di esiti.
+        """
+        from Automata_core.Batch_Evaluation import run_batch
+        return run_batch(self, sequences)
+
+    def __getstate__(self) -> dict:
+        """
+        Stato per pickle: tabella e accettazione copiate in array/bytearray, così anche un DFA
+        caricato con mmap (Automaton_Serialization.load_dfa) può essere inviato ai processi figli.
+        """
+        state = dict(self.__dict__)
+        state["table"] = array('i', self.table)
+        state["accepting"] = bytearray(self.accepting)
+        state.pop("_mmap", None)
+        state.pop("_batch_table", None)
+        return state
+
+    def __repr__(self) -> str:
+        return (f"CompiledDFA(states={self.n_states}, alphabet={list(self.alphabet)}, "
+                f"start={self.start}, dead={self.dead})")
+
+
+def subset_construction(
+        start: Hashable,
+        alphabet: Sequence[str],
+        move: Callable[[Hashable, str], Hashable],
+        is_accepting: Callable[[Hashable], bool]
+) -> CompiledDFA:
+    """
+    Funzione subset_construction:
+    Obiettivo: determinizzare un automa esplorando gli insiemi di stati raggiungibili.
+
+    Parametri:
+    - start: insieme iniziale (già chiuso rispetto alle ε-transizioni, se presenti).
+    - alphabet: simboli da considerare, nell'ordine delle colonne.
+    - move: funzione (insieme, simbolo) -> insieme successivo (chiusura inclusa).
+    - is_accepting: True se l'insieme contiene almeno uno stato di accettazione.
+
+    Gli insiemi possono essere qualsiasi valore hashable (frozenset, bitmask int, ...);
+    l'insieme vuoto deve essere falsy e diventa lo stato pozzo.
+    """
+    width = len(alphabet) + 1
+    index: Dict[Hashable, int] = {}
+    subsets: List[Hashable] = []
+    rows: List[List[int]] = []
+
+    def intern(subset: Hashable) -> int:
+        if subset not in index:
+            index[subset] = len(subsets)
+            subsets.append(subset)
+        return index[subset]
+
+    empty = None
+    intern(start)
+    i = 0
+    while i < len(subsets):
+        subset = subsets[i]
+        if not subset:
+            empty = subset
+        row = [0] * width
+        for col, symbol in enumerate(alphabet, 1):
+            row[col] = intern(move(subset, symbol))
+        rows.append(row)
+        i += 1
+
+    # Stato pozzo: l'insieme vuoto, creato esplicitamente se mai raggiunto
+    if empty is None:
+        dead = len(subsets)
+        subsets.append(frozenset())
+        rows.append([dead] * width)
+    else:
+        dead = index[empty]
+
+    table = array('i')
+    for row in rows:
+        row[0] = dead
+        table.extend(row)
+    accepting = bytearray(1 if subset and is_accepting(subset) else 0 for subset in subsets)
+
+    logger.info("subset_construction: %d stati deterministici su %d simboli", len(subsets), len(alphabet))
+    return CompiledDFA(alphabet, table, index[start], accepting, dead)
+
+
+def minimize(dfa: CompiledDFA) -> CompiledDFA:
+    """
+    Funzione minimize:
+    Obiettivo: ridurre il DFA al numero minimo di stati con l'algoritmo di Hopcroft.
+
+    Passi:
+    1. Costruire le transizioni inverse per ogni colonna.
+    2. Partire dalla partizione {accettanti, non accettanti} e raffinarla
+       finché ogni blocco è stabile rispetto a tutti i simboli.
+    3. Rinumerare i blocchi in ordine BFS a partire dallo stato iniziale.
+    """
+    n, width, table = dfa.n_states, dfa.width, dfa.table
+
+    inverse: List[List[List[int]]] = [[[] for _ in range(n)] for _ in range(width)]
+    for state in range(n):
+        base = state * width
+        for col in range(width):
+            inverse[col][table[base + col]].append(state)
+
+    accepting = {s for s in range(n) if dfa.accepting[s]}
+    rejecting = set(range(n)) - accepting
+    blocks = [b for b in (accepting, rejecting) if b]
+    block_of = [0] * n
+    for b, members in enumerate(blocks):
+        for state in members:
+            block_of[state] = b
+
+    worklist = set(range(len(blocks)))
+    while worklist:
+        splitter = list(blocks[worklist.pop()])
+        for col in range(width):
+            predecessors: Dict[int, List[int]] = {}
+            for target in splitter:
+                for source in inverse[col][target]:
+                    predecessors.setdefault(block_of[source], []).append(source)
+            for b, members in predecessors.items():
+                block = blocks[b]
+                if len(members) == len(block):
+                    continue
+                new_block = set(members)
+                block -= new_block
+                nb = len(blocks)
+                blocks.append(new_block)
+                for state in new_block:
+                    block_of[state] = nb
+                if b in worklist or len(new_block) <= len(block):
+                    worklist.add(nb)
+                else:
+                    worklist.add(b)
+
+    # Rinumerazione BFS: lo stato iniziale diventa 0
+    order = {block_of[dfa.start]: 0}
+    queue = deque([block_of[dfa.start]])
+    representatives = [next(iter(b)) for b in blocks]
+    while queue:
+        b = queue.popleft()
+        base = representatives[b] * width
+        for col in range(width):
+            nb = block_of[table[base + col]]
+            if nb not in order:
+                order[nb] = len(order)
+                queue.append(nb)
+
+    new_table = array('i', [0]) * (len(order) * width)
+    new_accepting = bytearray(len(order))
+    for b, new_id in order.items():
+        base = representatives[b] * width
+        for col in range(width):
+            new_table[new_id * width + col] = order[block_of[table[base + col]]]
+        new_accepting[new_id] = dfa.accepting[representatives[b]]
+
+    logger.info("minimize: %d -> %d stati", n, len(order))
+    return CompiledDFA(dfa.alphabet, new_table, 0, new_accepting, order[block_of[dfa.dead]])
+
+
+def compile_table(
+        transitions: Mapping[Tuple[Hashable, str], Hashable],
+        start: Hashable,
+        accept_states: Collection[Hashable],
+        alphabet: Sequence[str] = (),
+        default: Optional[Hashable] = None,
+        keep: Sequence[Hashable] = ()
+) -> CompiledDFA:
+    """
+    Funzione compile_table:
+    Obiettivo: convertire una funzione di transizione deterministica
+    (stato, evento) -> stato in un CompiledDFA con stati interi.
+
+    Gli stati sono numerati in ordine BFS a partire da `start` e il nome di ogni stato
+    resta in `labels` (l'ultimo è lo stato pozzo, etichettato None). Le coppie
+    (stato, evento) non definite portano nello stato `default` se indicato, altrimenti
+    nello stato pozzo; i simboli fuori alfabeto portano sempre nello stato pozzo.
+    Gli stati in `keep` ricevono un id anche se non sono raggiungibili da `start`
+    (numerati dopo quelli raggiungibili, con le rispettive transizioni).
+    """
+    alphabet = tuple(alphabet) or tuple(sorted({symbol for _, symbol in transitions}))
+    width = len(alphabet) + 1
+    index: Dict[Hashable, int] = {start: 0}
+    order: List[Hashable] = [start]
+    rows: List[List[int]] = []
+    pending = list(keep)
+    i = 0
+    while i < len(order) or pending:
+        if i == len(order):
+            state = pending.pop(0)
+            if state not in index:
+                index[state] = len(order)
+                order.append(state)
+            continue
+        row = [-1] * width
+        for col, symbol in enumerate(alphabet, 1):
+            target = transitions.get((order[i], symbol), default)
+            if target is not None:
+                if target not in index:
+                    index[target] = len(order)
+                    order.append(target)
+                row[col] = index[target]
+        rows.append(row)
+        i += 1
+
+    dead = len(order)
+    table = array('i')
+    for row in rows:
+        table.extend(dead if target < 0 else target for target in row)
+    table.extend([dead] * width)
+    accepting = bytearray(1 if state in accept_states else 0 for state in order)
+    accepting.append(0)
+    return CompiledDFA(alphabet, table, 0, accepting, dead, order + [None])
@@ -0,0 +1,199 @@
+import csv
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Iterator, Mapping as MappingType, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Un archivio di credenziali è qualsiasi Mapping username -> password/hash:
+# un dict in memoria oppure un MmapCredentialStore su disco.
+CredentialStore = MappingType[str, str]
+
+# Formato del file indice (little-endian):
+#   header (64 byte): magic, versione, n_slot, n_voci, larghezza chiave, larghezza valore
+#   slot (n_slot × slot_size): [lunghezza chiave u16][lunghezza valore u16][chiave][valore]
+# Lo slot è vuoto quando la lunghezza della chiave è 0; le collisioni usano probing lineare.
+MAGIC = b"CREDIDX1"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQII")
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct("<HH")
+
+
+def _slot_hash(key: bytes) -> int:
+    """Hash stabile tra processi e versioni di Python (hash() di str è randomizzato)."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class MmapCredentialStore(Mapping):
+    """
+    Classe MmapCredentialStore:
+    - Scopo: leggere le credenziali da un indice hash a indirizzamento aperto mappato in memoria.
+    - Motivazione: con milioni di account un dict di str occupa gigabyte e va ricostruito
+      a ogni avvio; qui l'apertura è un mmap e ogni lookup legge solo gli slot sondati.
+
+    È un Mapping di sola lettura, quindi sostituisce il dict di credenziali in
+    LoginDFA, AsyncDFALogin e login_process senza modifiche al codice che lo usa.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_slots, n_entries, key_width, value_width = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"File indice credenziali non valido: {path}")
+        self.n_slots = n_slots
+        self.n_entries = n_entries
+        self.key_width = key_width
+        self.value_width = value_width
+        self.slot_size = SLOT_HEADER.size + key_width + value_width
+        self._mask = n_slots - 1
+        logger.info("MmapCredentialStore aperto: %s (%d voci, %d slot)", path, n_entries, n_slots)
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """Restituisce l'offset dello slot che contiene `key`, oppure None."""
+        if not key or len(key) > self.key_width:
+            return None
+        mm, slot_size, mask = self._mm, self.slot_size, self._mask
+        idx = _slot_hash(key) & mask
+        for _ in range(self.n_slots):
+            off = HEADER_SIZE + idx * slot_size
+            key_len, _ = SLOT_HEADER.unpack_from(mm, off)
+            if key_len == 0:
+                return None
+            start = off + SLOT_HEADER.size
+            if key_len == len(key) and mm[start:start + key_len] == key:
+                return off
+            idx = (idx + 1) & mask
+        return None
+
+    def _value_at(self, off: int) -> str:
+        _, value_len = SLOT_HEADER.unpack_from(self._mm, off)
+        start = off + SLOT_HEADER.size + self.key_width
+        return self._mm[start:start + value_len].decode()
+
+    def __getitem__(self, username: str) -> str:
+        off = self._find(username.encode())
+        if off is None:
+            raise KeyError(username)
+        return self._value_at(off)
+
+    def __contains__(self, username: object) -> bool:
+        return isinstance(username, str) and self._find(username.encode()) is not None
+
+    def __len__(self) -> int:
+        return self.n_entries
+
+    def __iter__(self) -> Iterator[str]:
+        mm, key_width = self._mm, self.key_width
+        for idx in range(self.n_slots):
+            off = HEADER_SIZE + idx * self.slot_size
+            key_len, _ = SLOT_HEADER.unpack_from(mm, off)
+            if key_len:
+                start = off + SLOT_HEADER.size
+                yield mm[start:start + key_len].decode()
+
+    def close(self) -> None:
+        """Chiude la mappatura del file."""
+        self._mm.close()
+
+    def __enter__(self) -> "MmapCredentialStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _read_csv(csv_path: str, skip_header: bool) -> Iterator[Tuple[bytes, bytes]]:
+    """Legge il CSV username,password_hash in streaming, una riga alla volta."""
+    with open(csv_path, newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if len(row) >= 2 and row[0]:
+                yield row[0].encode(), row[1].encode()
+
+
+def build_index(
+        csv_path: str,
+        index_path: str,
+        key_width: Optional[int] = None,
+        value_width: Optional[int] = None,
+        load_factor: float = 0.7,
+        skip_header: bool = False
+) -> MmapCredentialStore:
+    """
+    Funzione build_index:
+    Obiettivo: costruire l'indice su disco leggendo il CSV in streaming (due passate),
+    senza mai tenere l'intero insieme di credenziali in memoria.
+
+    Passi:
+    1. Prima passata: conteggio delle righe e larghezze massime di chiave e valore.
+    2. Allocazione del file: n_slot = potenza di 2 tale che voci / n_slot <= load_factor.
+    3. Seconda passata: scrittura di ogni voce nello slot indicato dall'hash
+       (probing lineare; in caso di username duplicato vince l'ultima riga).
+    """
+    if not 0 < load_factor < 1:
+        # con load_factor >= 1 la tabella può riempirsi e il probing lineare non terminerebbe
+        raise ValueError(f"load_factor deve essere compreso tra 0 e 1 (esclusi), non {load_factor}")
+    count, max_key, max_value = 0, 1, 1
+    for key, value in _read_csv(csv_path, skip_header):
+        count += 1
+        max_key = max(max_key, len(key))
+        max_value = max(max_value, len(value))
+    key_width = key_width or max_key
+    value_width = value_width or max_value
+    if max_key > key_width or max_value > value_width or max(key_width, value_width) > 0xFFFF:
+        raise ValueError(f"Larghezze insufficienti: chiave {max_key}/{key_width}, valore {max_value}/{value_width}")
+
+    n_slots = 1
+    while n_slots * load_factor < max(count, 1):
+        n_slots <<= 1
+    slot_size = SLOT_HEADER.size + key_width + value_width
+    size = HEADER_SIZE + n_slots * slot_size
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.truncate(size)
+    with open(tmp_path, "r+b") as fh, mmap.mmap(fh.fileno(), size) as mm:
+        mask, entries = n_slots - 1, 0
+        for key, value in _read_csv(csv_path, skip_header):
+            idx = _slot_hash(key) & mask
+            while True:
+                off = HEADER_SIZE + idx * slot_size
+                key_len, _ = SLOT_HEADER.unpack_from(mm, off)
+                start = off + SLOT_HEADER.size
+                if key_len == 0:
+                    entries += 1
+                    break
+                if key_len == len(key) and mm[start:start + key_len] == key:
+                    break
+                idx = (idx + 1) & mask
+            SLOT_HEADER.pack_into(mm, off, len(key), len(value))
+            mm[start:start + len(key)] = key
+            mm[start + key_width:start + key_width + value_width] = value.ljust(value_width, b"\0")
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, n_slots, entries, key_width, value_width)
+        mm.flush()
+    os.replace(tmp_path, index_path)
+    logger.info("build_index: %d voci scritte in %s (%d slot da %d byte)", entries, index_path, n_slots, slot_size)
+    return MmapCredentialStore(index_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Costruisce l'indice mmap delle credenziali da un CSV")
+    parser.add_argument("csv_path", help="CSV con righe username,password_hash")
+    parser.add_argument("index_path", help="file indice da creare")
+    parser.add_argument("--load-factor", type=float, default=0.7)
+    parser.add_argument("--skip-header", action="store_true")
+    args = parser.parse_args()
+    build_index(args.csv_path, args.index_path, load_factor=args.load_factor, skip_header=args.skip_header).close()
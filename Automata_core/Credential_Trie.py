@@ -0,0 +1,179 @@
+import logging
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class CredentialTrie:
+    """
+    Classe CredentialTrie:
+    - Scopo: riconoscere un username contro l'intero insieme di account con un solo
+      passaggio sull'input, restituendo l'id dell'account.
+    - Motivazione: un automa a catena per ogni stringa (build_nfa_for_string) costa
+      O(N·len) per N account; qui il costo è O(len) indipendentemente da N.
+
+    Rappresentazione (CSR, stati interi, stato 0 = radice):
+    - offsets[s]..offsets[s+1]: intervallo degli archi uscenti dallo stato s;
+    - labels: stringa con il simbolo di ogni arco (ordinati per stato e simbolo),
+      così la ricerca dell'arco è un str.find sull'intervallo;
+    - targets[i]: stato di arrivo dell'arco i;
+    - skips[i]: numero di parole che precedono in ordine lessicografico quelle raggiunte
+      dall'arco i (parola che termina nello stato + sottoalberi dei fratelli precedenti);
+    - final[s]: 1 se lo stato s è di accettazione.
+
+    La somma degli skips lungo il cammino è il rango lessicografico della parola (hash
+    perfetto minimale): per questo, dopo la minimizzazione, gli stati di accettazione possono
+    essere condivisi e l'id dell'account si ricava come account_ids[rango].
+    """
+
+    def __init__(
+            self,
+            offsets: array,
+            labels: str,
+            targets: array,
+            skips: array,
+            final: bytearray,
+            account_ids: Optional[array],
+            n_words: int
+    ):
+        self.offsets = offsets
+        self.labels = labels
+        self.targets = targets
+        self.skips = skips
+        self.final = final
+        self.account_ids = account_ids
+        self.n_words = n_words
+
+    @property
+    def n_states(self) -> int:
+        return len(self.final)
+
+    def rank(self, word: str) -> Optional[int]:
+        """Rango lessicografico di `word` nell'insieme, oppure None se non presente."""
+        offsets, labels, targets, skips = self.offsets, self.labels, self.targets, self.skips
+        state, rank = 0, 0
+        for ch in word:
+            i = labels.find(ch, offsets[state], offsets[state + 1])
+            if i < 0:
+                return None
+            rank += skips[i]
+            state = targets[i]
+        return rank if self.final[state] else None
+
+    def lookup(self, word: str) -> Optional[int]:
+        """Id dell'account associato a `word` (il rango, se non sono stati forniti id), oppure None."""
+        rank = self.rank(word)
+        if rank is None or self.account_ids is None:
+            return rank
+        return self.account_ids[rank]
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self.rank(word) is not None
+
+    def __len__(self) -> int:
+        return self.n_words
+
+    def __repr__(self) -> str:
+        return f"CredentialTrie(words={self.n_words}, states={self.n_states}, edges={len(self.labels)})"
+
+
+def build_credential_trie(
+        accounts: Union[Mapping, Iterable[str]],
+        minimized: bool = True
+) -> CredentialTrie:
+    """
+    Funzione build_credential_trie:
+    Obiettivo: fondere un insieme di username in un unico automa a prefissi condivisi.
+
+    Parametri:
+    - accounts: Mapping username -> id account (int), oppure un iterabile di username
+      (in questo caso l'id restituito da lookup è il rango lessicografico).
+    - minimized: se True fonde anche i suffissi comuni (DAWG), riducendo gli stati.
+
+    Passi:
+    1. Ordinare gli username e costruire il trie.
+    2. (Opzionale) Minimizzare dal basso: due stati con stessa accettazione e stessi
+       archi verso stati già canonici diventano uno solo.
+    3. Calcolare il numero di parole sotto ogni stato e gli skips degli archi.
+    4. Rinumerare gli stati in ordine BFS e scrivere gli array CSR.
+    """
+    if isinstance(accounts, Mapping):
+        items: List[Tuple[str, int]] = sorted(accounts.items())
+        account_ids: Optional[array] = array('q', (account_id for _, account_id in items))
+        words = [word for word, _ in items]
+    else:
+        words = sorted(set(accounts))
+        account_ids = None
+
+    # 1. Trie: children[s] = {simbolo: stato}
+    children: List[Dict[str, int]] = [{}]
+    final = [False]
+    for word in words:
+        state = 0
+        for ch in word:
+            nxt = children[state].get(ch)
+            if nxt is None:
+                nxt = len(children)
+                children.append({})
+                final.append(False)
+                children[state][ch] = nxt
+            state = nxt
+        final[state] = True
+
+    # Ordine post-order iterativo (figli prima dei genitori)
+    postorder: List[int] = []
+    stack = [(0, False)]
+    while stack:
+        state, expanded = stack.pop()
+        if expanded:
+            postorder.append(state)
+            continue
+        stack.append((state, True))
+        stack.extend((child, False) for child in children[state].values())
+
+    # 2. Minimizzazione bottom-up tramite registro delle firme
+    canonical = list(range(len(children)))
+    if minimized:
+        register: Dict[Tuple, int] = {}
+        for state in postorder:
+            edges = tuple(sorted((ch, canonical[child]) for ch, child in children[state].items()))
+            signature = (final[state], edges)
+            canonical[state] = register.setdefault(signature, state)
+
+    # 3. Parole sotto ogni stato canonico
+    count: Dict[int, int] = {}
+    for state in postorder:
+        if canonical[state] == state:
+            count[state] = int(final[state]) + sum(count[canonical[c]] for c in children[state].values())
+
+    # 4. Rinumerazione BFS e layout CSR
+    order = {0: 0}
+    queue = [0]
+    for state in queue:
+        for ch in sorted(children[state]):
+            target = canonical[children[state][ch]]
+            if target not in order:
+                order[target] = len(queue)
+                queue.append(target)
+
+    offsets = array('I', [0])
+    targets = array('I')
+    skips = array('I')
+    labels: List[str] = []
+    final_bits = bytearray(len(queue))
+    for new_id, state in enumerate(queue):
+        skip = int(final[state])
+        for ch in sorted(children[state]):
+            target = canonical[children[state][ch]]
+            labels.append(ch)
+            targets.append(order[target])
+            skips.append(skip)
+            skip += count[target]
+        offsets.append(len(targets))
+        final_bits[new_id] = final[state]
+
+    logger.info("build_credential_trie: %d parole, %d nodi trie -> %d stati, %d archi",
+                len(words), len(children), len(queue), len(targets))
+    return CredentialTrie(offsets, "".join(labels), targets, skips, final_bits, account_ids, len(words))
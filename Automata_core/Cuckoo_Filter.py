@@ -0,0 +1,286 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+from array import array
+from typing import Collection, Iterable, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Formato del file (little-endian):
+#   header (64 byte): magic, versione, bit per impronta, slot per bucket, n_bucket, n_voci,
+#                     bucket e impronta della vittima (impronta 0 = nessuna vittima)
+#   slot (n_bucket × BUCKET_SIZE impronte da 1, 2 o 4 byte): 0 = slot libero
+MAGIC = b"CUCKOO01"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQQQI")
+HEADER_SIZE = 64
+BUCKET_SIZE = 4
+MAX_LOAD = 0.95         # occupazione raggiungibile con bucket da 4 slot
+MAX_KICKS = 500
+_TYPECODES = {8: 'B', 16: 'H', 32: 'I'}
+_FP_MULT = 0x5BD1E995   # moltiplicatore di MurmurHash2, disperde l'impronta per il bucket alternativo
+
+
+class CuckooFilterFull(RuntimeError):
+    """Sollevata da add() quando il filtro non ha più spazio (va ricostruito con più capacità)."""
+
+
+def _key_hash(key: str) -> int:
+    """Hash a 64 bit stabile tra processi e versioni di Python, come in Credential_Store."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def fingerprint_bits(fpr: float) -> int:
+    """Bit per impronta (8, 16 o 32) per un tasso di falsi positivi <= fpr: 2·BUCKET_SIZE / 2^f."""
+    if not 0 < fpr < 1:
+        raise ValueError(f"Tasso di falsi positivi non valido: {fpr}")
+    needed = math.ceil(math.log2(2 * BUCKET_SIZE / fpr))
+    for bits in sorted(_TYPECODES):
+        if bits >= needed:
+            return bits
+    raise ValueError(f"Tasso di falsi positivi troppo basso: {fpr} (richiede {needed} bit per impronta)")
+
+
+class CuckooFilter:
+    """
+    Classe CuckooFilter:
+    - Scopo: rispondere "l'username potrebbe esistere?" in memoria, prima di interrogare
+      l'archivio delle credenziali (dict, MmapCredentialStore o un servizio remoto).
+    - Motivazione: durante un attacco di password spraying la maggior parte degli username
+      non esiste; il filtro li respinge in pochi microsecondi senza I/O sull'archivio.
+      Non ci sono falsi negativi: un username presente non viene mai respinto.
+
+    Funzionamento (cuckoo filter, Fan et al. 2014):
+    - ogni username è ridotto a un'impronta di 8/16/32 bit e ha due bucket candidati,
+      i1 = hash & mask e i2 = i1 ^ H(impronta), ciascuno di BUCKET_SIZE slot;
+    - una ricerca legge al più 2·BUCKET_SIZE slot; i falsi positivi sono circa 2·BUCKET_SIZE / 2^bit;
+    - add sposta le impronte tra i due bucket (al più MAX_KICKS spostamenti); se non trova
+      posto l'ultima impronta resta in una "vittima" e il filtro è pieno;
+    - remove elimina una copia dell'impronta: va usato solo per username aggiunti.
+
+    Le impronte stanno in un array piatto (in memoria) oppure, con open(), direttamente
+    nel file mappato con mmap, senza copiarlo.
+    """
+
+    def __init__(self, capacity: int, fpr: float = 0.001, seed: int = 0):
+        """
+        :param capacity: numero di username previsto (compresi quelli aggiunti in seguito)
+        :param fpr: tasso massimo di falsi positivi
+        """
+        n_buckets = 1
+        while n_buckets * BUCKET_SIZE * MAX_LOAD < max(capacity, 1):
+            n_buckets <<= 1
+        self._setup(fingerprint_bits(fpr), n_buckets, 0, 0, 0)
+        self._slots: Union[array, memoryview] = array(_TYPECODES[self.fp_bits], bytes(self.nbytes()))
+        self._mm: Optional[mmap.mmap] = None
+        self._writable = False   # True se _mm è mappato in scrittura (open(writable=True))
+        self._rng = random.Random(seed)
+
+    def _setup(self, fp_bits: int, n_buckets: int, count: int, victim_index: int, victim_fp: int) -> None:
+        if fp_bits not in _TYPECODES or n_buckets & (n_buckets - 1):
+            raise ValueError(f"Parametri non validi: {fp_bits} bit per impronta, {n_buckets} bucket")
+        self.fp_bits = fp_bits
+        self.n_buckets = n_buckets
+        self.count = count
+        self._mask = n_buckets - 1
+        self._fp_mask = (1 << fp_bits) - 1
+        self._victim_index = victim_index
+        self._victim_fp = victim_fp
+
+    # ─── Ricerca, inserimento e rimozione ─────────────────────────────────────────────────────────
+
+    def _locate(self, key: str) -> Tuple[int, int, int]:
+        """(bucket primario, bucket alternativo, impronta) dello username."""
+        h = _key_hash(key)
+        fp = (h >> 32) & self._fp_mask or 1       # 0 indica uno slot libero
+        i1 = h & self._mask
+        return i1, (i1 ^ (fp * _FP_MULT)) & self._mask, fp
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        i1, i2, fp = self._locate(key)
+        slots = self._slots
+        b1, b2 = i1 * BUCKET_SIZE, i2 * BUCKET_SIZE
+        return (fp in (slots[b1], slots[b1 + 1], slots[b1 + 2], slots[b1 + 3])
+                or fp in (slots[b2], slots[b2 + 1], slots[b2 + 2], slots[b2 + 3])
+                or (fp == self._victim_fp and self._victim_index in (i1, i2)))
+
+    def _put(self, index: int, fp: int) -> bool:
+        """Scrive l'impronta nel primo slot libero del bucket; False se il bucket è pieno."""
+        slots = self._slots
+        base = index * BUCKET_SIZE
+        for slot in range(base, base + BUCKET_SIZE):
+            if not slots[slot]:
+                slots[slot] = fp
+                return True
+        return False
+
+    def add(self, key: str) -> None:
+        """Aggiunge un username; CuckooFilterFull se il filtro non ha più spazio."""
+        if self._victim_fp:
+            raise CuckooFilterFull(f"Filtro pieno ({self.count} voci in {self.n_buckets} bucket)")
+        i1, i2, fp = self._locate(key)
+        self.count += 1
+        if self._put(i1, fp) or self._put(i2, fp):
+            return
+        slots, rng = self._slots, self._rng
+        index = rng.choice((i1, i2))
+        for _ in range(MAX_KICKS):
+            slot = index * BUCKET_SIZE + rng.randrange(BUCKET_SIZE)
+            fp, slots[slot] = slots[slot], fp
+            index = (index ^ (fp * _FP_MULT)) & self._mask
+            if self._put(index, fp):
+                return
+        # L'impronta rimasta senza posto resta cercabile come vittima: nessun falso negativo
+        self._victim_index, self._victim_fp = index, fp
+        logger.warning("CuckooFilter pieno: %d voci, occupazione %.1f%%", self.count, 100 * self.load_factor)
+
+    def remove(self, key: str) -> bool:
+        """Rimuove un username aggiunto in precedenza; False se la sua impronta non è presente."""
+        i1, i2, fp = self._locate(key)
+        if fp == self._victim_fp and self._victim_index in (i1, i2):
+            self._victim_fp = self._victim_index = 0
+            self.count -= 1
+            return True
+        slots = self._slots
+        for index in (i1, i2):
+            base = index * BUCKET_SIZE
+            for slot in range(base, base + BUCKET_SIZE):
+                if slots[slot] == fp:
+                    slots[slot] = 0
+                    self.count -= 1
+                    if self._victim_fp:
+                        # si è liberato uno slot: la vittima può rientrare nella tabella
+                        victim, index = self._victim_fp, self._victim_index
+                        alternate = (index ^ (victim * _FP_MULT)) & self._mask
+                        if self._put(index, victim) or self._put(alternate, victim):
+                            self._victim_fp = self._victim_index = 0
+                    return True
+        return False
+
+    # ─── Statistiche ──────────────────────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def load_factor(self) -> float:
+        return self.count / (self.n_buckets * BUCKET_SIZE)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Tasso di falsi positivi teorico a filtro pieno."""
+        return 2 * BUCKET_SIZE / (1 << self.fp_bits)
+
+    def nbytes(self) -> int:
+        """Memoria delle impronte."""
+        return self.n_buckets * BUCKET_SIZE * self.fp_bits // 8
+
+    # ─── Serializzazione ──────────────────────────────────────────────────────────────────────────
+
+    def _header(self) -> bytes:
+        header = HEADER.pack(MAGIC, VERSION, self.fp_bits, BUCKET_SIZE, self.n_buckets, self.count,
+                             self._victim_index, self._victim_fp)
+        return header.ljust(HEADER_SIZE, b"\0")
+
+    def save(self, path: str) -> None:
+        """Scrive il filtro su disco (file temporaneo + os.replace: il file non è mai parziale)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(self._header())
+            fh.write(self._slots if isinstance(self._slots, array) else bytes(self._slots))
+        os.replace(tmp_path, path)
+        logger.info("CuckooFilter: %d voci salvate in %s (%d byte)", self.count, path, HEADER_SIZE + self.nbytes())
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False, seed: int = 0) -> "CuckooFilter":
+        """
+        Apre un filtro salvato con save() mappandolo in memoria con mmap: l'apertura non
+        legge le impronte, le pagine vengono caricate (e condivise tra processi) su richiesta.
+        Con writable=True add/remove modificano il file; flush() aggiorna l'header.
+        """
+        with open(path, "r+b" if writable else "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, fp_bits, bucket_size, n_buckets, count, victim_index, victim_fp = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or bucket_size != BUCKET_SIZE:
+            mm.close()
+            raise ValueError(f"{path}: non è un CuckooFilter (magic={magic!r}, versione={version})")
+        self = cls.__new__(cls)
+        self._setup(fp_bits, n_buckets, count, victim_index, victim_fp)
+        if len(mm) != HEADER_SIZE + self.nbytes():
+            mm.close()
+            raise ValueError(f"{path}: dimensione {len(mm)} incoerente con l'header")
+        self._mm = mm
+        self._writable = writable
+        self._slots = memoryview(mm)[HEADER_SIZE:].cast(_TYPECODES[fp_bits])
+        self._rng = random.Random(seed)
+        return self
+
+    def flush(self) -> None:
+        """Aggiorna header e pagine di un filtro aperto con open(writable=True)."""
+        if self._mm is not None and not self._mm.closed:
+            self._mm[:HEADER_SIZE] = self._header()
+            self._mm.flush()
+
+    def close(self) -> None:
+        """Chiude la mappatura; un filtro aperto con writable=True viene prima salvato con flush()."""
+        if self._mm is not None and not self._mm.closed:
+            if self._writable:
+                self.flush()
+            self._slots.release()
+            self._mm.close()
+
+    def __enter__(self) -> "CuckooFilter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (f"CuckooFilter(count={self.count}, buckets={self.n_buckets}, fp_bits={self.fp_bits}, "
+                f"load={self.load_factor:.2f}, bytes={self.nbytes()})")
+
+
+def build_filter(usernames: Iterable[str], fpr: float = 0.001, capacity: Optional[int] = None) -> CuckooFilter:
+    """
+    Funzione build_filter:
+    Obiettivo: costruire il filtro da un insieme di username (es. le chiavi di un
+    CredentialStore). `capacity` lascia spazio per gli username aggiunti in seguito;
+    di default è il numero di username.
+    """
+    if capacity is None:
+        if not isinstance(usernames, Collection):
+            usernames = list(usernames)
+        capacity = len(usernames)
+    user_filter = CuckooFilter(capacity, fpr)
+    for username in usernames:
+        user_filter.add(username)
+    logger.info("build_filter: %r", user_filter)
+    return user_filter
+
+
+if __name__ == "__main__":
+    import argparse
+    import csv
+
+    from Automata_core.Credential_Store import MmapCredentialStore
+
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Costruisce il filtro degli username da un archivio di credenziali")
+    parser.add_argument("credentials", help="CSV username,... oppure indice creato con Credential_Store")
+    parser.add_argument("filter_path", help="file del filtro da creare")
+    parser.add_argument("--fpr", type=float, default=0.001, help="tasso massimo di falsi positivi")
+    parser.add_argument("--capacity", type=int, default=None, help="username previsti (default: quelli presenti)")
+    args = parser.parse_args()
+    if args.credentials.endswith(".csv"):
+        with open(args.credentials, newline="", encoding="utf-8") as fh:
+            names = [row[0] for row in csv.reader(fh) if row and row[0]]
+        build_filter(names, args.fpr, args.capacity).save(args.filter_path)
+    else:
+        with MmapCredentialStore(args.credentials) as store:
+            build_filter(store, args.fpr, args.capacity).save(args.filter_path)
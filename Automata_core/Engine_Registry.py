@@ -0,0 +1,323 @@
+import abc
+import csv
+import functools
+import getpass
+import hashlib
+import importlib
+import logging
+import sys
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Type
+
+from Automata_core.Metrics import run_counter
+
+if TYPE_CHECKING:
+    from Automata_core.Credential_Store import CredentialStore
+
+logger = logging.getLogger(__name__)
+
+Attempt = Tuple[str, str]
+
+# Credenziali dimostrative (in chiaro), le stesse per tutti i motori
+DEMO_USERS = {"alice": "wonderland", "bob": "builder"}
+
+
+class LoginEngine(abc.ABC):
+    """
+    Classe LoginEngine:
+    - Scopo: interfaccia comune dei motori di login (validate, validate_many, interactive),
+      per usarli come libreria senza conoscere il modulo che li implementa.
+    - Motivazione: ogni motore vive in un proprio pacchetto con dipendenze diverse
+      (asyncio, NumPy, ...); il modulo del motore viene importato solo quando il motore
+      viene creato, quindi chi usa un solo motore non paga l'import degli altri.
+
+    Le sottoclassi indicano il modulo in `module` (importato in `impl` alla creazione),
+    le modalità supportate in `modes` e se l'archivio contiene hash (`hashed_credentials`)
+    o password in chiaro; implementano validate(). I motori con la modalità 'server'
+    ereditano anche da ServerEngine.
+    """
+    name = ""
+    module = ""
+    description = ""
+    modes: Tuple[str, ...] = ("interactive", "batch")
+    hashed_credentials = False
+
+    def __init__(self, credentials: "CredentialStore", limiter=None, audit=None, user_filter=None):
+        """
+        :param credentials: archivio username -> password (o hash, se hashed_credentials)
+        :param limiter: AttemptLimiter condiviso, opzionale
+        :param audit: AuditJournal in cui registrare gli esiti, opzionale
+        :param user_filter: CuckooFilter degli username consultato prima dell'archivio, opzionale
+        """
+        self.credentials = credentials
+        self.limiter = limiter
+        self.audit = audit
+        self.user_filter = user_filter
+        self.impl = importlib.import_module(self.module)
+        logger.info("Motore '%s' caricato da %s", self.name, self.module)
+
+    @classmethod
+    def demo_credentials(cls) -> Dict[str, str]:
+        """Archivio di esempio nel formato atteso dal motore."""
+        return dict(DEMO_USERS)
+
+    @abc.abstractmethod
+    def validate(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        """Un tentativo di login completo, senza I/O: True se le credenziali sono corrette."""
+
+    def validate_many(self, attempts: Iterable[Attempt]) -> List[bool]:
+        """validate() su una sequenza di coppie (username, password)."""
+        return [self.validate(username, password) for username, password in attempts]
+
+    def is_locked_out(self, username: str, client_id: Optional[str] = None) -> bool:
+        """True se username o client sono bloccati dal limiter (sempre False senza limiter)."""
+        if self.limiter is None:
+            return False
+        from Automata_core.Attempt_Limiter import client_key, user_key
+        if client_id is not None and self.limiter.is_locked(client_key(client_id)):
+            return True
+        return self.limiter.is_locked(user_key(username))
+
+    def record_attempt(self, username: str, client_id: Optional[str], success: bool) -> None:
+        """
+        Registra l'esito di un tentativo nel journal di audit e nel limiter (per i motori il cui
+        modulo non li gestisce): un successo azzera solo il contatore dell'username.
+        """
+        if self.audit is not None:
+            self.audit.record(username, self.name, "validate", success)
+        if self.limiter is None:
+            return
+        from Automata_core.Attempt_Limiter import client_key, user_key
+        if success:
+            self.limiter.record_success(user_key(username))
+            return
+        self.limiter.record_failure(user_key(username))
+        if client_id is not None:
+            self.limiter.record_failure(client_key(client_id))
+
+    def reject_locked(self, username: str) -> bool:
+        """Esito di un tentativo respinto dal limiter: contato in run_counter e nel journal di audit."""
+        run_counter.inc(self.name, "locked")
+        if self.audit is not None:
+            self.audit.record(username, self.name, "lockout", False)
+        logger.warning("Motore '%s': utente '%s' bloccato per troppi tentativi", self.name, username)
+        return False
+
+    def interactive(self) -> bool:
+        """Login da terminale: chiede username e password e stampa l'esito."""
+        username = input("Username: ")
+        password = getpass.getpass("Password: ") if sys.stdin.isatty() else input("Password: ")
+        accepted = self.validate(username, password)
+        print("Accesso consentito!" if accepted else "Credenziali invalide.")
+        return accepted
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None,
+              metrics_port: Optional[int] = None, **options) -> None:
+        """Server di login di rete; ValueError se 'server' non è tra le modalità del motore."""
+        if "server" not in self.modes or not isinstance(self, ServerEngine):
+            raise ValueError(f"Il motore '{self.name}' non supporta la modalità server "
+                             f"(modalità: {', '.join(self.modes)})")
+        self._serve(host, port, path, metrics_port, **options)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name!r}, users={len(self.credentials)})"
+
+
+class DFASyncEngine(LoginEngine):
+    """dfa-sync: una sessione LoginDFA per tentativo."""
+    name = "dfa-sync"
+    module = "DFA_sys.Deterministic_Finite_Automaton_Sys"
+    description = "DFA sincrono (LoginDFA)"
+
+    def validate(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        dfa = self.impl.LoginDFA(self.credentials, limiter=self.limiter, client_id=client_id, audit=self.audit,
+                                 user_filter=self.user_filter)
+        dfa.input_username(username)
+        dfa.input_password(password)
+        return dfa.validate()
+
+
+class NFASyncEngine(LoginEngine):
+    """
+    nfa-sync: l'NFA di build_login_nfa sui simboli 'u'/'x' e 'p'/'y', come login_process;
+    limiter, audit e run_counter sono gestiti qui (anche in modalità interattiva).
+    """
+    name = "nfa-sync"
+    module = "NFA_sys.No_Deterministic_Finite_Automaton_Sys"
+    description = "NFA sincrono (build_login_nfa / login_process)"
+
+    def __init__(self, credentials: "CredentialStore", limiter=None, audit=None, user_filter=None):
+        super().__init__(credentials, limiter, audit, user_filter)
+        self.nfa = self.impl.build_login_nfa()
+
+    def validate(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        if self.is_locked_out(username, client_id):
+            return self.reject_locked(username)
+        credentials, nfa = self.credentials, self.nfa
+        nfa.reset()
+        if self.user_filter is not None and username not in self.user_filter:
+            nfa.step('x', 1)
+            nfa.step('y', 2)
+        else:
+            nfa.step('u' if username in credentials else 'x', 1)
+            nfa.step('p' if credentials.get(username) == password else 'y', 2)
+        result = nfa.accepts()
+        run_counter.inc(self.name, "accepted" if result else "rejected")
+        self.record_attempt(username, client_id, result)
+        return result
+
+
+class AsyncLoginEngine(LoginEngine):
+    """Base dei motori asincroni: validate() esegue validate_async() in un event loop."""
+
+    @abc.abstractmethod
+    async def validate_async(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        """Un tentativo di login completo nell'event loop corrente."""
+
+    def validate(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        import asyncio
+        return asyncio.run(self.validate_async(username, password, client_id))
+
+    def validate_many(self, attempts: Iterable[Attempt]) -> List[bool]:
+        """Tutti i tentativi in un solo event loop (niente avvio di un loop per tentativo)."""
+        import asyncio
+
+        async def run_all() -> List[bool]:
+            return [await self.validate_async(username, password) for username, password in attempts]
+        return asyncio.run(run_all())
+
+
+class ServerEngine(abc.ABC):
+    """Mixin dei motori con la modalità 'server': LoginEngine.serve() delega a _serve()."""
+
+    @abc.abstractmethod
+    def _serve(self, host: str, port: int, path: Optional[str], metrics_port: Optional[int], **options) -> None:
+        """Avvia il server di login fino all'interruzione."""
+
+
+class DFAAsyncEngine(AsyncLoginEngine, ServerEngine):
+    """dfa-async: i passi valid_user / valid_pass di AsyncDFALogin, con limiter e audit."""
+    name = "dfa-async"
+    module = "DFA_asys.Deterministic_Finite_Automaton_Asys"
+    description = "DFA asincrono (AsyncDFALogin, server TCP/Unix)"
+    modes = ("interactive", "batch", "server")
+    hashed_credentials = True
+
+    def __init__(self, credentials: "CredentialStore", limiter=None, audit=None, user_filter=None, hasher=None):
+        super().__init__(credentials, limiter, audit, user_filter)
+        self.login = self.impl.AsyncDFALogin(credentials, hasher=hasher, limiter=limiter, audit=audit,
+                                             user_filter=user_filter)
+
+    @classmethod
+    def demo_credentials(cls) -> Dict[str, str]:
+        return {user: hashlib.sha256(pwd.encode()).hexdigest() for user, pwd in DEMO_USERS.items()}
+
+    async def validate_async(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        login = self.login
+        if login.is_locked_out(username, client_id):
+            login.audit_event(username, "lockout", False)
+            run_counter.inc(self.name, "locked")
+            return False
+        if not await login.validate_user(username):
+            login.audit_event(username, "validate", False)
+            run_counter.inc(self.name, "rejected")
+            return False
+        try:
+            accepted = await login.validate_password(username, password)
+        except self.impl.VerificationQueueFull as exc:
+            # sovraccarico del pool di verifica: respinto senza contare un tentativo fallito
+            logger.warning("Motore '%s': verifica rifiutata per '%s': %s", self.name, username, exc)
+            run_counter.inc(self.name, "busy")
+            return False
+        login.record_attempt(username, client_id, accepted)
+        run_counter.inc(self.name, "accepted" if accepted else "rejected")
+        return accepted
+
+    def interactive(self) -> bool:
+        import asyncio
+        return asyncio.run(self.login.run())
+
+    def _serve(self, host: str, port: int, path: Optional[str], metrics_port: Optional[int], **options) -> None:
+        """Avvia AsyncLoginServer (options: max_sessions, idle_timeout, ...) fino all'interruzione."""
+        import asyncio
+        server_module = importlib.import_module("DFA_asys.Async_Login_Server")
+        server = server_module.AsyncLoginServer(self.login, **options)
+        asyncio.run(server_module.serve(server, host, port, path, metrics_port))
+
+
+class NFAAsyncEngine(AsyncLoginEngine):
+    """
+    nfa-async: la password è riconosciuta da un NFA asincrono per la stringa attesa, come in main.
+    Gli NFA sono costruiti una volta per password attesa e tenuti in una cache LRU di
+    nfa_cache_size voci. NFA.run conta le esecuzioni in run_counter; i tentativi respinti
+    prima dell'esecuzione (utente sconosciuto o bloccato) sono contati qui.
+    """
+    name = "nfa-async"
+    module = "NFA_asys.No_Deterministic_Finite_Automaton_Asys"
+    description = "NFA asincrono su bitmask (NFA.run)"
+
+    def __init__(self, credentials: "CredentialStore", limiter=None, audit=None, user_filter=None,
+                 nfa_cache_size: int = 4096):
+        super().__init__(credentials, limiter, audit, user_filter)
+        self.nfa_for = functools.lru_cache(maxsize=nfa_cache_size)(self.impl.build_nfa_for_string)
+
+    async def validate_async(self, username: str, password: str, client_id: Optional[str] = None) -> bool:
+        if self.is_locked_out(username, client_id):
+            return self.reject_locked(username)
+        rejected = self.user_filter is not None and username not in self.user_filter
+        expected = None if rejected else self.credentials.get(username)
+        if expected is None:
+            run_counter.inc(self.name, "rejected")
+            accepted = False
+        else:
+            accepted = await self.nfa_for(expected).run(password)
+        self.record_attempt(username, client_id, accepted)
+        return accepted
+
+
+# ─── Registro ─────────────────────────────────────────────────────────────────────────────────────
+
+ENGINES: Dict[str, Type[LoginEngine]] = {
+    engine.name: engine for engine in (DFASyncEngine, DFAAsyncEngine, NFASyncEngine, NFAAsyncEngine)
+}
+
+
+def available_engines() -> List[str]:
+    """Nomi dei motori registrati."""
+    return sorted(ENGINES)
+
+
+def get_engine(name: str, credentials: Optional["CredentialStore"] = None, **options) -> LoginEngine:
+    """
+    Crea il motore `name` ("dfa-sync", "dfa-async", "nfa-sync", "nfa-async"), importandone
+    solo allora il modulo. Senza credenziali usa l'archivio dimostrativo del motore;
+    options (limiter, audit, ...) sono passate al costruttore.
+    """
+    try:
+        engine = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Motore sconosciuto '{name}': disponibili {available_engines()}") from None
+    if credentials is None:
+        credentials = engine.demo_credentials()
+    return engine(credentials, **options)
+
+
+def register_engine(engine: Type[LoginEngine]) -> Type[LoginEngine]:
+    """Registra un motore aggiuntivo (utilizzabile come decoratore di classe)."""
+    ENGINES[engine.name] = engine
+    return engine
+
+
+def load_credentials(path: str, hash_passwords: bool = False) -> "CredentialStore":
+    """
+    Archivio da file: un CSV username,password viene caricato in un dict (con hash_passwords
+    le password sono convertite in SHA-256, il formato di AsyncDFALogin), qualsiasi altro
+    file è aperto come indice di Credential_Store.build_index (MmapCredentialStore).
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as fh:
+            rows = [row for row in csv.reader(fh) if len(row) >= 2 and row[0]]
+        if hash_passwords:
+            return {user: hashlib.sha256(pwd.encode()).hexdigest() for user, pwd, *_ in rows}
+        return {user: pwd for user, pwd, *_ in rows}
+    from Automata_core.Credential_Store import MmapCredentialStore
+    return MmapCredentialStore(path)
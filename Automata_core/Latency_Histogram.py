@@ -0,0 +1,99 @@
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, Tuple
+
+
+class LatencyHistogram:
+    """
+    Classe LatencyHistogram:
+    - Scopo: registrare milioni di latenze con memoria costante e percentili affidabili.
+    - Motivazione: salvare ogni campione in una lista cresce senza limiti; un istogramma a
+      bucket lineari perde precisione sulle code (p99, p999) dove stanno gli stalli.
+
+    Bucket logaritmici in stile HDR: i valori interi (es. microsecondi) sono divisi per
+    ordine di grandezza binario, e ogni ordine in 2**significant_bits sotto-bucket lineari.
+    L'errore relativo è quindi al massimo 2**-significant_bits (circa 3% con il default 5)
+    su tutta la scala, e il numero di bucket cresce solo con il logaritmo del valore massimo.
+    """
+
+    def __init__(self, significant_bits: int = 5):
+        self.significant_bits = significant_bits
+        self.sub_buckets = 1 << significant_bits
+        self.counts = array('Q')
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        """Bucket del valore: esponente * sotto-bucket + mantissa (i bucket sono contigui)."""
+        exponent = max(0, value.bit_length() - self.significant_bits - 1)
+        return exponent * self.sub_buckets + (value >> exponent)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """Intervallo [minimo, massimo] dei valori del bucket."""
+        exponent = max(0, (index >> self.significant_bits) - 1)
+        mantissa = index - exponent * self.sub_buckets
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Registra `count` occorrenze del valore (arrotondato all'intero, negativi a 0)."""
+        value = max(0, int(value))
+        index = self._index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend(array('Q', bytes(8 * (index + 1 - len(counts)))))
+        counts[index] += count
+        self.total += count
+        self.sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Somma un altro istogramma (con la stessa precisione) in questo."""
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Istogrammi con precisione diversa")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend(array('Q', bytes(8 * (len(other.counts) - len(self.counts)))))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> int:
+        """Valore al percentile `p` (0-100): estremo superiore del bucket, limitato al massimo osservato."""
+        if not self.total:
+            return 0
+        rank = max(1, math.ceil(self.total * p / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._bounds(index)[1], self.max)
+        return self.max
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """Bucket non vuoti come (estremo superiore, conteggio)."""
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self._bounds(index)[1], count
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.total if self.total else 0.0
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, float]:
+        """Riepilogo serializzabile: conteggio, min, media, percentili richiesti e massimo."""
+        report = {"count": self.total, "min": self.min or 0, "mean": self.mean}
+        for p in percentiles:
+            report[f"p{p:g}".replace(".", "")] = self.percentile(p)
+        report["max"] = self.max
+        return report
+
+    def __repr__(self) -> str:
+        return f"LatencyHistogram(count={self.total}, p50={self.percentile(50)}, max={self.max})"
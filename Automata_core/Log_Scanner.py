@@ -0,0 +1,182 @@
+import argparse
+import logging
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from Automata_core.Alphabet_Compression import ByteClassDFA, compress
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+
+logger = logging.getLogger(__name__)
+
+Match = Tuple[int, int]  # (offset inizio riga, offset fine riga o fine match)
+
+
+def as_dfa(automaton) -> CompiledDFA:
+    """Accetta un CompiledDFA oppure un NFA di NFA_sys / NFA_asys (compilato con compile())."""
+    if isinstance(automaton, CompiledDFA):
+        return automaton
+    return automaton.compile()
+
+
+# Byte convertiti in classi per volta: limita la copia tradotta anche per file mappati molto grandi
+BLOCK_SIZE = 1 << 20
+
+
+def byte_translator(classes: ByteClassDFA) -> Callable[[bytes], Sequence[int]]:
+    """
+    Funzione di conversione byte -> classi per lo scanner: bytes.translate (in C) quando le
+    classi stanno in un byte; con più di 256 classi translate non è applicabile e i byte
+    sono convertiti con la mappa a 16 bit, uno alla volta.
+    """
+    if isinstance(classes.class_map, bytes):
+        return classes.translate
+    class_map = classes.class_map
+    logger.info("Scanner: %d classi, conversione dei byte senza bytes.translate", classes.n_classes)
+    return lambda data: array('H', [class_map[byte] for byte in data])
+
+
+def scan_buffer(
+        dfa: CompiledDFA,
+        buffer,
+        start: int = 0,
+        end: Optional[int] = None,
+        mode: str = "line",
+        classes: Optional[ByteClassDFA] = None,
+        block_size: int = BLOCK_SIZE
+) -> Iterator[Match]:
+    """
+    Funzione scan_buffer:
+    Obiettivo: eseguire il DFA su ogni riga di `buffer` (bytes, bytearray o mmap) nell'intervallo
+    [start, end), ripartendo dallo stato iniziale a ogni '\\n'.
+
+    Modalità:
+    - "line": segnala le righe interamente accettate dal DFA (senza '\\r' finale);
+    - "prefix": segnala le righe con un prefisso accettato; la fine del match è il primo
+      offset in cui il DFA entra in uno stato di accettazione.
+
+    I byte sono letti come caratteri latin-1 (un carattere = un byte) e convertiti nelle
+    classi di equivalenza del DFA (vedi Alphabet_Compression): la tabella ha una colonna per
+    classe invece di 256 e resta nella cache della CPU.
+
+    Copie: l'intervallo è convertito a blocchi di righe intere di circa `block_size` byte;
+    per ogni blocco c'è un solo slice del buffer e una sola translate (in C), e le righe sono
+    lette dal risultato tramite memoryview, senza altre copie. Le transizioni restano un
+    accesso alla tabella per byte in Python; appena il DFA entra nello stato pozzo il resto
+    della riga viene saltato.
+    """
+    classes = classes if classes is not None else compress(dfa)
+    translate = byte_translator(classes)
+    end = len(buffer) if end is None else end
+    block_size = max(1, block_size)
+    table, dead = classes.table, classes.dead
+    accept_rows = {state * classes.n_classes for state in range(dfa.n_states) if dfa.accepting[state]}
+    initial = classes.start
+    prefix = mode == "prefix"
+
+    pos = start
+    while pos < end:
+        # blocco di righe intere: fino al primo '\n' dopo pos + block_size (o fino a end)
+        block_end = end
+        if pos + block_size < end:
+            nl = buffer.find(b"\n", pos + block_size - 1, end)
+            if nl >= 0:
+                block_end = nl + 1
+        codes = memoryview(translate(buffer[pos:block_end]))
+        base = pos
+        while pos < block_end:
+            nl = buffer.find(b"\n", pos, block_end)
+            if nl < 0:
+                nl = block_end
+            line_end = nl - 1 if nl > pos and buffer[nl - 1] == 0x0D else nl
+            state = initial
+            if prefix and state in accept_rows:
+                yield pos, pos
+            else:
+                i = pos
+                for cls in codes[pos - base:line_end - base]:
+                    state = table[state + cls]
+                    i += 1
+                    if state == dead:
+                        break
+                    if prefix and state in accept_rows:
+                        yield pos, i
+                        break
+                else:
+                    if not prefix and state in accept_rows:
+                        yield pos, line_end
+            pos = nl + 1
+
+
+def scan_file(path: str, automaton, mode: str = "line", start: int = 0, end: Optional[int] = None) -> Iterator[Match]:
+    """Mappa il file in memoria (sola lettura) e ne scandisce le righe con il DFA."""
+    dfa = as_dfa(automaton)
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from scan_buffer(dfa, mm, start, end, mode)
+
+
+def split_chunks(path: str, n_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Funzione split_chunks:
+    Obiettivo: dividere il file in `n_chunks` intervalli allineati a inizio riga,
+    così che ogni worker elabori righe intere.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, n_chunks):
+            approx = max(size * k // n_chunks, bounds[-1])
+            nl = mm.find(b"\n", approx)
+            if nl < 0:
+                break
+            if nl + 1 > bounds[-1]:
+                bounds.append(nl + 1)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def _scan_chunk(args: Tuple[str, CompiledDFA, str, int, int]) -> List[Match]:
+    path, dfa, mode, start, end = args
+    return list(scan_file(path, dfa, mode, start, end))
+
+
+def scan_file_parallel(path: str, automaton, mode: str = "line", workers: Optional[int] = None) -> List[Match]:
+    """
+    Funzione scan_file_parallel:
+    Obiettivo: scandire un file molto grande con un pool di processi; ogni worker mappa
+    lo stesso file (pagine condivise dalla cache del sistema) ed elabora un intervallo di righe.
+    """
+    dfa = as_dfa(automaton)
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(path, workers)
+    logger.info("scan_file_parallel: %s diviso in %d blocchi", path, len(chunks))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_scan_chunk, [(path, dfa, mode, a, b) for a, b in chunks])
+        return [match for chunk in results for match in chunk]
+
+
+if __name__ == "__main__":
+    from NFA_asys.No_Deterministic_Finite_Automaton_Asys import build_nfa_for_string
+
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Scansione di file di log con un automa compilato")
+    parser.add_argument("path", help="file di log da scandire")
+    parser.add_argument("literal", help="riga (o prefisso, con --prefix) da cercare")
+    parser.add_argument("--prefix", action="store_true", help="segnala le righe che iniziano con il letterale")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    nfa = build_nfa_for_string(args.literal)
+    scan_mode = "prefix" if args.prefix else "line"
+    if args.workers > 1:
+        found = scan_file_parallel(args.path, nfa, scan_mode, args.workers)
+    else:
+        found = scan_file(args.path, nfa, scan_mode)
+    for line_start, match_end in found:
+        print(f"{line_start}:{match_end}")
@@ -0,0 +1,276 @@
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    """Escape dei valori delle etichette nel formato testuale di Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Contatore monotono con etichette.
+    Ogni thread incrementa un proprio dizionario (nessun lock nel percorso caldo):
+    i valori dei thread vengono sommati solo quando le metriche sono lette.
+
+    Un contatore creato con enabled=False (es. le transizioni, incrementate a ogni passo
+    degli automi) va acceso con enable(); i punti di incremento lo controllano come il tracer:
+
+        if transition_counter.enabled:
+            transition_counter.inc(engine, state, event)
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), enabled: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.enabled = enabled
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, float]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Labels, float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[Labels, float] = {}
+            self._local.values = values
+            with self._lock:
+                self._shards.append(values)
+            return values
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Spegne il contatore: i punti di incremento tornano a costare un solo controllo."""
+        self.enabled = False
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        """
+        Incrementa la serie identificata dai valori delle etichette (nell'ordine di labelnames);
+        non controlla `enabled`, che spetta al chiamante.
+        """
+        values = self._shard()
+        values[labelvalues] = values.get(labelvalues, 0) + amount
+
+    def samples(self) -> Dict[Labels, float]:
+        """Valori correnti per serie, sommati su tutti i thread."""
+        with self._lock:
+            shards = [dict(shard) for shard in self._shards]
+        total: Dict[Labels, float] = {}
+        for shard in shards:
+            for labels, value in shard.items():
+                total[labels] = total.get(labels, 0) + value
+        return total
+
+    def value(self, *labelvalues: str) -> float:
+        return self.samples().get(labelvalues, 0)
+
+    def expose(self) -> Iterator[str]:
+        for labels, value in sorted(self.samples().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge:
+    """Valore istantaneo con etichette (es. sessioni attive); aggiornamenti protetti da lock."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def expose(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Istogramma a bucket fissi (secondi) con etichette, esportato con bucket cumulativi `le`,
+    `_sum` e `_count` come richiesto dal formato Prometheus.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per serie: [conteggi per bucket (+Inf in coda), somma]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *labelvalues: str) -> int:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return sum(series[0]) if series else 0
+
+    def expose(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Classe MetricsRegistry:
+    - Scopo: raccogliere le metriche dei motori e produrle nel formato testuale di Prometheus.
+    - counter / gauge / histogram restituiscono la metrica esistente con lo stesso nome,
+      così moduli diversi possono condividerla.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metrica '{name}' già registrata come {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                enabled: bool = True) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames, enabled)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Tutte le metriche nel formato di esposizione testuale di Prometheus (versione 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+# ─── Registro condiviso e metriche dei motori ────────────────────────────────────────────────────
+
+registry = MetricsRegistry()
+
+# Spento per default: è incrementato a ogni transizione; lo accende il server con l'endpoint /metrics
+transition_counter = registry.counter(
+    "automaton_transitions_total", "Transizioni eseguite per (stato di partenza, evento).",
+    ("engine", "state", "event"), enabled=False)
+run_counter = registry.counter(
+    "automaton_runs_total", "Esecuzioni complete di un automa per esito.", ("engine", "result"))
+hash_verify_seconds = registry.histogram(
+    "login_hash_verify_seconds", "Durata della verifica dell'hash della password.", ("hasher",))
+session_seconds = registry.histogram(
+    "login_session_duration_seconds", "Durata di una sessione di login.", ("engine",))
+active_sessions = registry.gauge(
+    "login_active_sessions", "Sessioni di login in corso.", ("engine",))
+
+
+# ─── Endpoint HTTP locale ─────────────────────────────────────────────────────────────────────────
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _handle_http(reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter",
+                       metrics: MetricsRegistry) -> None:
+    """Risponde a GET /metrics con il testo Prometheus; 404 per gli altri percorsi."""
+    import asyncio
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5.0)
+        while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b"\r\n", b"\n", b""):
+            pass   # intestazioni ignorate
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] in ("GET", "HEAD") and parts[1].split("?")[0] == "/metrics":
+            body = metrics.render().encode()
+            status = "200 OK"
+        else:
+            body = b"not found\n"
+            status = "404 Not Found"
+        head = (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode() + (body if parts[:1] != ["HEAD"] else b""))
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as exc:
+        logger.debug("Richiesta metriche interrotta: %s", exc)
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9464,
+                               metrics: Optional[MetricsRegistry] = None) -> "asyncio.AbstractServer":
+    """
+    Avvia un piccolo server HTTP asyncio che espone `metrics` (default: registro condiviso)
+    su http://host:port/metrics. Restituisce il server (chiuderlo con close()/wait_closed()).
+    """
+    import asyncio   # importato qui: i motori sincroni usano le metriche senza caricare asyncio
+    metrics = metrics or registry
+    server = await asyncio.start_server(lambda r, w: _handle_http(r, w, metrics), host=host, port=port)
+    logger.info("Metriche esposte su %s", [sock.getsockname() for sock in server.sockets])
+    return server
@@ -0,0 +1,104 @@
+import time
+from typing import Any, Callable, List, Optional, Sequence, TextIO, Tuple, Union
+
+TraceRecord = Tuple[int, int, int, int]
+# Risoluzione degli id nei nomi in dump(): una sequenza indicizzata per id (es. automaton.names)
+# oppure una funzione id -> nome (es. bitmask -> insieme di stati)
+Names = Union[Sequence[Any], Callable[[int], Any]]
+
+
+def _resolve(names: Optional[Names], value: int) -> Any:
+    """Nome dell'id `value` secondo `names`; l'id stesso se non risolvibile."""
+    if names is None:
+        return value
+    if callable(names):
+        return names(value)
+    return names[value] if 0 <= value < len(names) else value
+
+
+class Tracer:
+    """
+    Classe Tracer:
+    - Scopo: registrare le transizioni degli automi come tuple compatte
+      (step, id stato, id simbolo, timestamp in ns) in un ring buffer preallocato.
+    - Motivazione: sostituire i logging.info formattati a ogni passo; la formattazione
+      in testo avviene solo su richiesta, con dump().
+
+    Uso nei punti di traccia (costo a tracer spento: un attributo e un salto):
+
+        if tracer.enabled:
+            tracer.record(step, state_id, symbol_id)
+
+    Stati e simboli sono registrati come interi (id di stato o bitmask, colonna dell'evento
+    o del simbolo): i nomi si risolvono solo in dump().
+    """
+
+    def __init__(self, capacity: int = 65536, sample_every: int = 1, enabled: bool = False):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.sample_every = max(1, sample_every)
+        self._buffer: List[Optional[TraceRecord]] = [None] * capacity
+        self._pos = 0            # prossimo slot da scrivere
+        self._written = 0        # record scritti dall'ultimo clear()
+        self._countdown = self.sample_every
+
+    def enable(self, capacity: Optional[int] = None, sample_every: Optional[int] = None) -> None:
+        """Accende il tracer; cambiare la capacità rialloca (e svuota) il buffer."""
+        if capacity is not None and capacity != self.capacity:
+            self.capacity = capacity
+            self._buffer = [None] * capacity
+            self.clear()
+        if sample_every is not None:
+            self.sample_every = max(1, sample_every)
+            self._countdown = self.sample_every
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Spegne il tracer: i punti di traccia tornano a costare un solo controllo."""
+        self.enabled = False
+
+    def clear(self) -> None:
+        """Svuota il ring buffer."""
+        self._pos = 0
+        self._written = 0
+        self._countdown = self.sample_every
+
+    def record(self, step: int, state: int, symbol: int) -> None:
+        """Registra una transizione (con campionamento: una ogni sample_every chiamate)."""
+        self._countdown -= 1
+        if self._countdown:
+            return
+        self._countdown = self.sample_every
+        pos = self._pos
+        self._buffer[pos] = (step, state, symbol, time.perf_counter_ns())
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+        self._written += 1
+
+    def records(self) -> List[TraceRecord]:
+        """Restituisce i record presenti nel buffer, dal più vecchio al più recente."""
+        if self._written < self.capacity:
+            return list(self._buffer[:self._pos])
+        return self._buffer[self._pos:] + self._buffer[:self._pos]
+
+    def dump(self, stream: Optional[TextIO] = None, states: Optional[Names] = None,
+             symbols: Optional[Names] = None) -> str:
+        """
+        Converte in testo i record del buffer (solo qui si paga la formattazione).
+        `states` e `symbols` traducono gli id nei nomi (es. automaton.names e
+        automaton.event_names); senza, vengono stampati gli id.
+        Se `stream` è indicato il testo viene anche scritto sullo stream.
+        """
+        records = self.records()
+        origin = records[0][3] if records else 0
+        lines = [f"{(ts - origin) / 1000:12.3f}us step={step} stato={_resolve(states, state)!r} "
+                 f"simbolo={_resolve(symbols, symbol)!r}"
+                 for step, state, symbol, ts in records]
+        text = "\n".join(lines)
+        if stream is not None:
+            stream.write(text + "\n")
+        return text
+
+
+# Tracer condiviso dai quattro motori (spento di default)
+tracer = Tracer()
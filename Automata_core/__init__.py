@@ -0,0 +1,26 @@
+"""
+Automata_core: componenti condivisi dei motori di login e API di libreria.
+
+    from Automata_core import get_engine
+    engine = get_engine("dfa-async", credentials)
+    engine.validate("alice", "wonderland")
+
+L'import del pacchetto non carica alcun motore né configura il logging: get_engine
+importa solo il modulo del motore richiesto (vedi Engine_Registry).
+"""
+import logging
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+_REGISTRY_EXPORTS = ("ENGINES", "LoginEngine", "ServerEngine", "available_engines", "get_engine", "load_credentials",
+                     "register_engine")
+
+__all__ = list(_REGISTRY_EXPORTS)
+
+
+def __getattr__(name: str):
+    # Import pigro del registro: i moduli che importano solo Automata_core.X non lo caricano
+    if name in _REGISTRY_EXPORTS:
+        from Automata_core import Engine_Registry
+        return getattr(Engine_Registry, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,98 @@
+"""
+Punto di ingresso unico dei motori di login:
+
+    python -m Automata_core --list
+    python -m Automata_core dfa-sync                                  # login interattivo
+    python -m Automata_core nfa-async --mode batch < tentativi.csv    # righe username,password
+    python -m Automata_core dfa-async --mode server --port 8765
+"""
+import argparse
+import csv
+import logging
+import sys
+import time
+
+from Automata_core.Engine_Registry import ENGINES, available_engines, get_engine, load_credentials
+
+
+def run_batch(engine, source) -> int:
+    """Valuta le righe username,password di `source` e stampa un esito per riga; restituisce i login riusciti."""
+    attempts = [(row[0], row[1]) for row in csv.reader(source) if len(row) >= 2]
+    start = time.perf_counter()
+    outcomes = engine.validate_many(attempts)
+    elapsed = time.perf_counter() - start
+    for (username, _), accepted in zip(attempts, outcomes):
+        print(f"{username}\t{'OK' if accepted else 'FAIL'}")
+    print(f"{len(attempts)} tentativi, {sum(outcomes)} riusciti, {elapsed:.3f} s", file=sys.stderr)
+    return sum(outcomes)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m Automata_core",
+                                     description="Esegue un motore di login in modalità interattiva, batch o server")
+    parser.add_argument("engine", nargs="?", help=f"motore da eseguire: {', '.join(available_engines())}")
+    parser.add_argument("--list", action="store_true", help="elenca i motori e le modalità supportate")
+    parser.add_argument("--mode", choices=("interactive", "batch", "server"), default="interactive")
+    parser.add_argument("--credentials",
+                        help="CSV username,password oppure indice di Credential_Store (default: utenti dimostrativi)")
+    parser.add_argument("--input", help="file dei tentativi in modalità batch (default: standard input)")
+    parser.add_argument("--max-failures", type=int, default=None,
+                        help="abilita il blocco dopo N tentativi falliti in --window secondi")
+    parser.add_argument("--window", type=float, default=300.0)
+    parser.add_argument("--lockout", type=float, default=900.0, help="durata del blocco in secondi")
+    parser.add_argument("--audit-dir", default=None, help="directory del journal di audit")
+    parser.add_argument("--user-filter", default=None, help="filtro degli username creato con Automata_core.Cuckoo_Filter")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="percorso del socket Unix (modalità server)")
+    parser.add_argument("--metrics-port", type=int, default=None)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format='[%(asctime)s] %(levelname)s - %(message)s')
+
+    if args.list or not args.engine:
+        for name in available_engines():
+            engine_cls = ENGINES[name]
+            print(f"{name:10} {engine_cls.description} [{', '.join(engine_cls.modes)}]")
+        return 0
+    if args.engine not in ENGINES:
+        parser.error(f"motore sconosciuto '{args.engine}' (disponibili: {', '.join(available_engines())})")
+    if args.mode not in ENGINES[args.engine].modes:
+        parser.error(f"il motore '{args.engine}' non supporta la modalità {args.mode}")
+
+    options = {}
+    if args.max_failures is not None:
+        from Automata_core.Attempt_Limiter import AttemptLimiter
+        options["limiter"] = AttemptLimiter(max_attempts=args.max_failures, window=args.window, lockout=args.lockout)
+    audit = None
+    if args.audit_dir:
+        from Automata_core.Audit_Journal import AuditJournal
+        audit = options["audit"] = AuditJournal(args.audit_dir)
+    if args.user_filter:
+        from Automata_core.Cuckoo_Filter import CuckooFilter
+        options["user_filter"] = CuckooFilter.open(args.user_filter)
+    credentials = (load_credentials(args.credentials, hash_passwords=ENGINES[args.engine].hashed_credentials)
+                   if args.credentials else None)
+
+    try:
+        engine = get_engine(args.engine, credentials, **options)
+        if args.mode == "batch":
+            if args.input:
+                with open(args.input, newline="", encoding="utf-8") as fh:
+                    run_batch(engine, fh)
+            else:
+                run_batch(engine, sys.stdin)
+        elif args.mode == "server":
+            engine.serve(args.host, args.port, args.unix, args.metrics_port)
+        else:
+            return 0 if engine.interactive() else 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if audit is not None:
+            audit.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import hashlib
+import itertools
+import logging
+import time
+from typing import Optional
+
+from Automata_core.Attempt_Limiter import AttemptLimiter
+from Automata_core.Audit_Journal import AuditJournal
+from Automata_core.Cuckoo_Filter import CuckooFilter
+from Automata_core.Metrics import active_sessions, run_counter, session_seconds, start_metrics_server, transition_counter
+from Automata_core.Tracing import tracer
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+from DFA_asys.Password_Hashing import VerificationQueueFull
+
+
+# Classe che contiene lo stato di una singola connessione
+class LoginSession:
+    """
+    Stato di una sessione di login legata a una connessione:
+    stato corrente del DFA, contatore di step, username e tentativi password.
+    Tenerlo per connessione (e non sull'istanza di AsyncDFALogin) permette
+    di servire molti utenti in parallelo con la stessa tabella di transizione.
+    """
+    __slots__ = ("session_id", "state", "step", "username", "attempts", "client")
+
+    def __init__(self, session_id: int, initial_state: int, client: Optional[str] = None):
+        self.session_id = session_id
+        self.client = client
+        self.state = initial_state
+        self.step = 0
+        self.username = ""
+        self.attempts = 0
+
+
+# Classe che espone AsyncDFALogin su un server asyncio (TCP o socket Unix)
+class AsyncLoginServer:
+    """
+    Server di login multi-sessione basato su asyncio.start_server.
+
+    Protocollo a righe (UTF-8):
+      server → "Username: "            client → "<username>\\n"
+      server → "Password: "            client → "<password>\\n"   (fino a max_pass_attempts volte)
+      server → "OK ...\\n" | "RETRY ...\\n" | "ERR ...\\n"
+
+    Controlli di carico:
+      - max_sessions: sessioni contemporanee; oltre il limite la connessione riceve "ERR busy".
+      - con un VerificationPool saturo (VerificationQueueFull) la sessione riceve "ERR busy"
+        e viene chiusa senza contare un tentativo fallito.
+      - idle_timeout: secondi massimi di attesa per ogni riga del client.
+      - max_line: dimensione massima del buffer di lettura per connessione.
+      - ogni scrittura attende writer.drain(), così un client lento rallenta solo la propria sessione.
+      - con un AttemptLimiter su AsyncDFALogin, username e host del client bloccati ricevono "ERR ...".
+    """
+
+    def __init__(
+            self,
+            dfa: AsyncDFALogin,
+            max_sessions: int = 10000,
+            idle_timeout: float = 30.0,
+            max_pass_attempts: int = 3,
+            max_line: int = 1024
+    ):
+        """
+        :param dfa: automa che fornisce tabella di transizione e metodi di validazione
+        :param max_sessions: numero massimo di sessioni contemporanee
+        :param idle_timeout: timeout (secondi) in attesa di una riga dal client
+        :param max_pass_attempts: tentativi password per sessione
+        :param max_line: lunghezza massima di una riga in byte
+        """
+        self.dfa = dfa
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_pass_attempts = max_pass_attempts
+        self.max_line = max_line
+        self.active_sessions = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._ids = itertools.count(1)
+
+    # Metodo per avviare il server
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None,
+                    backlog: int = 1024) -> asyncio.AbstractServer:
+        """
+        Avvia il server su TCP (host, port) oppure su socket Unix se `path` è indicato.
+        Con port=0 il sistema sceglie una porta libera (vedi self.server.sockets).
+        """
+        if path is not None:
+            self.server = await asyncio.start_unix_server(
+                self.handle, path=path, limit=self.max_line, backlog=backlog)
+        else:
+            self.server = await asyncio.start_server(
+                self.handle, host=host, port=port, limit=self.max_line, backlog=backlog)
+        self.logger.info("Server di login in ascolto su %s",
+                         [sock.getsockname() for sock in self.server.sockets])
+        return self.server
+
+    # Metodo per chiudere il server
+    async def close(self) -> None:
+        """Smette di accettare connessioni e attende la chiusura del server."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    # Metodo per applicare una transizione della sessione
+    def _transition(self, session: LoginSession, event: int) -> int:
+        """Applica (stato, evento) → stato sulla tabella condivisa (id interi) e registra lo step della sessione."""
+        automaton = self.dfa.automaton
+        evento = automaton.event_names[event]
+        session.step += 1
+        self.logger.debug("Sessione %d step %d: evento='%s', stato_precedente='%s'",
+                          session.session_id, session.step, evento, automaton.names[session.state])
+        if transition_counter.enabled:
+            transition_counter.inc("server", automaton.names[session.state], evento)
+        session.state = automaton.step(session.state, event)
+        if tracer.enabled:
+            tracer.record(session.step, session.state, event)
+        return session.state
+
+    # Metodi di I/O con backpressure e timeout
+    async def _send(self, writer: asyncio.StreamWriter, text: str) -> None:
+        """Scrive sul socket e attende lo svuotamento del buffer (backpressure)."""
+        writer.write(text.encode())
+        await writer.drain()
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> Optional[str]:
+        """Legge una riga entro idle_timeout; None se il client chiude la connessione."""
+        line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        if not line:
+            return None
+        return line.decode(errors="replace").rstrip("\r\n")
+
+    # Metodo che gestisce una connessione
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Gestisce una connessione: rifiuta se il server è saturo, altrimenti esegue la sessione."""
+        if self.active_sessions >= self.max_sessions:
+            try:
+                await self._send(writer, "ERR busy\n")
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+
+        self.active_sessions += 1
+        active_sessions.inc("server")
+        start = time.perf_counter()
+        outcome = "rejected"
+        peer = writer.get_extra_info("peername")
+        client = peer[0] if isinstance(peer, tuple) else None   # host TCP; None su socket Unix
+        session = LoginSession(next(self._ids), self.dfa.automaton.start, client)
+        try:
+            if await self.run_session(session, reader, writer):
+                outcome = "accepted"
+        except VerificationQueueFull as exc:
+            outcome = "busy"
+            self.logger.warning("Sessione %d: verifica rifiutata, %s", session.session_id, exc)
+            try:
+                await self._send(writer, "ERR busy\n")
+            except ConnectionError:
+                pass
+        except asyncio.TimeoutError:
+            self.logger.info("Sessione %d: timeout di inattività", session.session_id)
+            try:
+                await self._send(writer, "ERR timeout\n")
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as exc:
+            self.logger.info("Sessione %d interrotta: %s", session.session_id, exc)
+        finally:
+            self.active_sessions -= 1
+            active_sessions.dec("server")
+            session_seconds.observe(time.perf_counter() - start, "server")
+            run_counter.inc("server", outcome)
+            writer.close()
+
+    # Metodo che esegue il flusso del DFA per una sessione
+    async def run_session(self, session: LoginSession, reader: asyncio.StreamReader,
+                          writer: asyncio.StreamWriter) -> bool:
+        """
+        Esegue lo stesso flusso di AsyncDFALogin.run, ma con stato per sessione e I/O sul socket.
+        :return: True se la sessione termina autenticata
+        """
+        dfa = self.dfa
+        # --- STEP 1: input_user ---
+        self._transition(session, dfa.ev_input_user)
+        await self._send(writer, "Username: ")
+        username = await self._read_line(reader)
+        if username is None:
+            return False
+        session.username = username
+        if dfa.is_locked_out(username, session.client):
+            dfa.audit_event(username, "lockout", False, "server")
+            self.logger.info("Sessione %d: utente '%s' bloccato", session.session_id, username)
+            await self._send(writer, "ERR Troppi tentativi falliti, riprova più tardi.\n")
+            return False
+
+        # --- STEP 2: valid_user / invalid_user ---
+        is_valid_user = await dfa.validate_user(username)
+        if self._transition(session, dfa.ev_valid_user if is_valid_user else dfa.ev_invalid_user) \
+                == dfa.automaton.error:
+            dfa.audit_event(username, "validate", False, "server")
+            await self._send(writer, "ERR Utente non riconosciuto.\n")
+            return False
+
+        # --- STEP 3: ciclo password fino a max_pass_attempts ---
+        accept = dfa.automaton.state_id(dfa.accept_state)
+        while session.attempts < self.max_pass_attempts:
+            session.attempts += 1
+            self._transition(session, dfa.ev_input_pass)   # check_pass, o retry_pass -> check_pass
+            await self._send(writer, "Password: ")
+            password = await self._read_line(reader)
+            if password is None:
+                return False
+
+            is_valid_pass = await dfa.validate_password(username, password)
+            dfa.record_attempt(username, session.client, is_valid_pass, "server")
+            if self._transition(session, dfa.ev_valid_pass if is_valid_pass else dfa.ev_invalid_pass) == accept:
+                self.logger.info("Sessione %d: utente '%s' autenticato", session.session_id, username)
+                await self._send(writer, f"OK Benvenuto, {username}!\n")
+                return True
+
+            if dfa.is_locked_out(username, session.client):
+                break
+            if session.attempts < self.max_pass_attempts:
+                await self._send(writer, "RETRY Password errata, riprova.\n")
+
+        await self._send(writer, "ERR Numero tentativi esaurito. Accesso negato.\n")
+        return False
+
+
+async def serve(server: AsyncLoginServer, host: str, port: int, path: Optional[str],
+                metrics_port: Optional[int] = None) -> None:
+    """
+    Avvia il server (e, se indicato, l'endpoint /metrics) e resta in ascolto fino all'interruzione.
+    Con l'endpoint attivo vengono contate anche le singole transizioni (automaton_transitions_total).
+    """
+    if metrics_port is not None:
+        transition_counter.enable()
+        await start_metrics_server(host=host, port=metrics_port)
+    srv = await server.start(host=host, port=port, path=path)
+    async with srv:
+        await srv.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    parser = argparse.ArgumentParser(description="Server di login asincrono basato su AsyncDFALogin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="percorso del socket Unix (al posto di TCP)")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=30.0)
+    parser.add_argument("--max-failures", type=int, default=5,
+                        help="tentativi falliti (per utente o host) in --window secondi prima del blocco")
+    parser.add_argument("--window", type=float, default=300.0)
+    parser.add_argument("--lockout", type=float, default=900.0, help="durata del blocco in secondi")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="porta dell'endpoint HTTP /metrics in formato Prometheus")
+    parser.add_argument("--audit-dir", default=None,
+                        help="directory del journal di audit binario (esiti dei tentativi di login)")
+    parser.add_argument("--user-filter", default=None,
+                        help="filtro degli username creato con Automata_core.Cuckoo_Filter (aperto con mmap)")
+    args = parser.parse_args()
+
+    # Esempio di database iniziale
+    users_db = {
+        "alice": hashlib.sha256("wonderland".encode()).hexdigest(),
+        "bob":   hashlib.sha256("builder".encode()).hexdigest(),
+    }
+    limiter = AttemptLimiter(max_attempts=args.max_failures, window=args.window, lockout=args.lockout)
+    audit = AuditJournal(args.audit_dir) if args.audit_dir else None
+    user_filter = CuckooFilter.open(args.user_filter) if args.user_filter else None
+    login_server = AsyncLoginServer(AsyncDFALogin(users_db, limiter=limiter, audit=audit, user_filter=user_filter),
+                                    max_sessions=args.max_sessions, idle_timeout=args.idle_timeout)
+    try:
+        asyncio.run(serve(login_server, args.host, args.port, args.unix, args.metrics_port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if audit is not None:
+            audit.close()
+        if user_filter is not None:
+            user_filter.close()
@@ -3,14 +3,42 @@ import getpass
 import hashlib
 import logging
 import sys
+import time
+from typing import TYPE_CHECKING, Optional, Sequence
 
+from Automata_core.Automaton_Spec import AutomatonSpec, TableAutomaton
+from Automata_core.Metrics import (active_sessions, hash_verify_seconds, run_counter, session_seconds,
+                                   transition_counter)
+from Automata_core.Tracing import tracer
+from DFA_asys.Password_Hashing import Sha256Hasher, VerificationQueueFull
 
-# Configurazione base del logger
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+if TYPE_CHECKING:
+    # Solo per le annotazioni: limiter, audit, filtro, pool di verifica e archivio su disco sono
+    # opzionali e i loro moduli vengono caricati da chi li crea (o al primo uso), non all'import.
+    from Automata_core.Attempt_Limiter import AttemptLimiter
+    from Automata_core.Audit_Journal import AuditJournal
+    from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+    from Automata_core.Credential_Store import CredentialStore
+    from Automata_core.Cuckoo_Filter import CuckooFilter
+    from DFA_asys.Password_Hashing import PasswordHasher, VerificationPool
+
+# Specifica dichiarativa del flusso: (stato_corrente, evento) → stato_successivo.
+# Le coppie non definite portano nello stato di errore. Una password errata porta in
+# retry_pass, da cui un nuovo input_pass riapre la verifica: il limite di tentativi
+# (max_pass_attempts) non è nella tabella ma in run() e run_batch().
+ASYNC_LOGIN_SPEC = AutomatonSpec.from_dict({
+    "start": "start",
+    "accept": ["authenticated"],
+    "error": "error",
+    "transitions": {
+        "start":      {"input_user": "check_user"},
+        "check_user": {"valid_user": "check_pass", "invalid_user": "error"},
+        "check_pass": {"input_pass": "check_pass", "valid_pass": "authenticated", "invalid_pass": "retry_pass"},
+        "retry_pass": {"input_pass": "check_pass"},
+    },
+})
+ASYNC_LOGIN_AUTOMATON = ASYNC_LOGIN_SPEC.compile()
+ASYNC_LOGIN_EVENTS = ("input_user", "valid_user", "invalid_user", "input_pass", "valid_pass", "invalid_pass")
 
 
 # Classe che implementa un Automa a Stati Finiti (DFA) asincrono per la gestione del login
@@ -25,29 +53,44 @@ class AsyncDFALogin:
     """
 
     # Metodo di inizializzazione
-    def __init__(self, users_db: dict):
+    def __init__(self, users_db: "CredentialStore", hasher: Optional["PasswordHasher"] = None,
+                 verifier: Optional["VerificationPool"] = None, limiter: Optional["AttemptLimiter"] = None,
+                 audit: Optional["AuditJournal"] = None, automaton: Optional[TableAutomaton] = None,
+                 user_filter: Optional["CuckooFilter"] = None):
         """
         Inizializza stati, transizioni, contatore di step e database utenti.
-        :param users_db: dizionario username→password_hash
-        """
-        # Stati
-        self.initial_state = "start"
-        self.accept_state = "authenticated"
-        self.error_state = "error"
-
-        # Transizioni DFA: (stato_corrente, evento) → stato_successivo
-        self.transitions = {
-            ("start",       "input_user"):  "check_user",
-            ("check_user",  "valid_user"):  "check_pass",
-            ("check_user",  "invalid_user"):"error",
-            ("check_pass",  "input_pass"):  "check_pass",
-            ("check_pass",  "valid_pass"):  "authenticated",
-            ("check_pass",  "invalid_pass"):"error",
-        }
+        :param users_db: archivio username→password_hash (dict o MmapCredentialStore)
+        :param hasher: KDF usato per calcolare e verificare gli hash (default: SHA-256)
+        :param verifier: pool opzionale che esegue le verifiche fuori dall'event loop
+        :param limiter: contatore condiviso dei tentativi falliti (per username e client) con blocco temporaneo
+        :param audit: journal di audit in cui registrare l'esito di ogni tentativo
+        :param automaton: specifica compilata del flusso (default ASYNC_LOGIN_SPEC), con gli eventi
+                          di ASYNC_LOGIN_EVENTS, uno stato di accettazione e uno di errore
+        :param user_filter: filtro degli username davanti a users_db (CuckooFilter, opzionale)
+        """
+        # Tabella di transizione condivisa: stati ed eventi interi, un accesso per transizione
+        self.automaton = automaton or ASYNC_LOGIN_AUTOMATON
+        spec = self.automaton.spec
+        if spec.error is None or len(spec.accept) != 1:
+            raise ValueError("La specifica del login asincrono richiede uno stato di errore e uno di accettazione")
+        (self.ev_input_user, self.ev_valid_user, self.ev_invalid_user,
+         self.ev_input_pass, self.ev_valid_pass, self.ev_invalid_pass) = self.automaton.resolve(*ASYNC_LOGIN_EVENTS)
+
+        # Stati (nomi) e transizioni (stato_corrente, evento) → stato_successivo della specifica
+        self.initial_state = spec.start
+        self.accept_state = next(iter(spec.accept))
+        self.error_state = spec.error
+        self.transitions = spec.transitions
 
         self.users_db = users_db
+        self.verifier = verifier
+        self.limiter = limiter
+        self.audit = audit
+        self.user_filter = user_filter
+        self.hasher = verifier.hasher if verifier is not None else (hasher or Sha256Hasher())
         self.step = 0
-        self.logger = logging.getLogger(self.__class__.__name__)
+        self.outcome: Optional[str] = None   # esito dell'ultima run(): accepted, rejected o busy
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
     # Metodo per leggere l'username e la password in modo asincrono
     async def read_username(self) -> str:
@@ -81,57 +124,153 @@ class AsyncDFALogin:
 
     # Metodo per calcolare l'hash della password
     def hash_password(self, password: str) -> str:
-        """Calcola e restituisce l’hash SHA-256 della password in chiaro."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Calcola e restituisce l’hash della password in chiaro con l'hasher configurato (default SHA-256)."""
+        return self.hasher.hash(password)
 
     # Metodo per validare l'username
     async def validate_user(self, username: str) -> bool:
-        """Step: valid_user/invalid_user — controlla se l’username esiste."""
+        """
+        Step: valid_user/invalid_user — controlla se l’username esiste.
+        Con user_filter gli username assenti dal filtro sono respinti in memoria, senza
+        accedere a users_db (il filtro non ha falsi negativi).
+        """
         await asyncio.sleep(0)
+        if self.user_filter is not None and username not in self.user_filter:
+            return False
         return username in self.users_db
 
     # Metodo per validare la password
     async def validate_password(self, username: str, password: str) -> bool:
-        """Step: valid_pass/invalid_pass — controlla se la password è corretta."""
-        await asyncio.sleep(0)
-        return self.users_db.get(username) == self.hash_password(password)
+        """
+        Step: valid_pass/invalid_pass — controlla se la password è corretta.
+        Con un VerificationPool il calcolo del KDF avviene nel pool, senza bloccare l'event loop;
+        a coda piena solleva VerificationQueueFull, che il chiamante tratta come sovraccarico
+        (né accesso né tentativo fallito).
+        """
+        stored = self.users_db.get(username)
+        if stored is None:
+            await asyncio.sleep(0)
+            return False
+        start = time.perf_counter()
+        if self.verifier is not None:
+            valid = await self.verifier.verify(password, stored)
+        else:
+            await asyncio.sleep(0)
+            valid = self.hasher.verify(password, stored)
+        hash_verify_seconds.observe(time.perf_counter() - start, self.hasher.name)
+        return valid
+
+    # Metodi per il contatore dei tentativi condiviso tra sessioni
+    def is_locked_out(self, username: str, client_id: Optional[str] = None) -> bool:
+        """True se username o client sono bloccati dal limiter (sempre False senza limiter)."""
+        if self.limiter is None:
+            return False
+        from Automata_core.Attempt_Limiter import client_key, user_key
+        if client_id is not None and self.limiter.is_locked(client_key(client_id)):
+            return True
+        return self.limiter.is_locked(user_key(username))
+
+    def record_attempt(self, username: str, client_id: Optional[str], success: bool,
+                       engine: str = "dfa-async") -> None:
+        """
+        Registra l'esito di un tentativo nel journal di audit e nel limiter:
+        un successo azzera solo il contatore dell'username.
+        """
+        self.audit_event(username, "validate", success, engine)
+        if self.limiter is None:
+            return
+        from Automata_core.Attempt_Limiter import client_key, user_key
+        if success:
+            self.limiter.record_success(user_key(username))
+            return
+        self.limiter.record_failure(user_key(username))
+        if client_id is not None:
+            self.limiter.record_failure(client_key(client_id))
+
+    def audit_event(self, username: str, event: str, success: bool, engine: str = "dfa-async") -> None:
+        """Accoda l'evento nel journal di audit, se configurato (nessun I/O nel chiamante)."""
+        if self.audit is not None:
+            self.audit.record(username, engine, event, success)
 
     # Metodo principale che esegue l'automa
-    async def run(self, max_pass_attempts: int = 3) -> bool:
+    async def run(self, max_pass_attempts: int = 3, client_id: Optional[str] = None) -> bool:
         """
         Esegue l’automa:
          - legge e valida username
          - in caso di utente valido, richiede la password (fino a max_pass_attempts tentativi)
          - effettua il log di ogni transizione con numero di step
+        Con un limiter, i tentativi falliti sono contati per username e client_id anche
+        tra esecuzioni diverse, e un utente bloccato viene respinto prima della verifica.
+        Se la coda del VerificationPool è piena la sessione termina senza contare un tentativo
+        fallito: l'esito (self.outcome e run_counter) è "busy".
         :return: True se autenticato, False altrimenti
         """
-        state = self.initial_state
+        start = time.perf_counter()
+        active_sessions.inc("dfa-async")
+        self.outcome = "rejected"
+        try:
+            if await self._run_flow(max_pass_attempts, client_id):
+                self.outcome = "accepted"
+        except VerificationQueueFull as exc:
+            self.outcome = "busy"
+            self.logger.warning("Verifica rifiutata: %s", exc)
+            print("Servizio occupato. Riprova più tardi.")
+        finally:
+            active_sessions.dec("dfa-async")
+            session_seconds.observe(time.perf_counter() - start, "dfa-async")
+            run_counter.inc("dfa-async", self.outcome)
+        return self.outcome == "accepted"
+
+    async def _run_flow(self, max_pass_attempts: int, client_id: Optional[str]) -> bool:
+        """Flusso dell'automa eseguito da run() (metriche di sessione escluse)."""
+        automaton = self.automaton
+        names, error, accept = automaton.names, automaton.error, automaton.state_id(self.accept_state)
+        state = automaton.start
         self.logger.info("DFA login start")
 
         # --- STEP 1: input_user ---
         self.step += 1
-        self.logger.info(f"Step {self.step}: evento='input_user', stato_precedente='{state}'")
-        state = self.transitions.get((state, "input_user"), self.error_state)
+        self.logger.info("Step %d: evento='input_user', stato_precedente='%s'", self.step, names[state])
+        if transition_counter.enabled:
+            transition_counter.inc("dfa-async", names[state], "input_user")
+        state = automaton.step(state, self.ev_input_user)
+        if tracer.enabled:
+            tracer.record(self.step, state, self.ev_input_user)
 
         # Lettura username
         username = await self.read_username()
+        if self.is_locked_out(username, client_id):
+            self.audit_event(username, "lockout", False)
+            self.logger.warning("Utente '%s' bloccato per troppi tentativi", username)
+            print("Troppi tentativi falliti. Riprova più tardi.")
+            return False
 
         # --- STEP 2: valid_user / invalid_user ---
         is_valid_user = await self.validate_user(username)
         evento = "valid_user" if is_valid_user else "invalid_user"
         self.step += 1
-        self.logger.info(f"Step {self.step}: evento='{evento}', stato_precedente='check_user'")
-        state = self.transitions.get(("check_user", evento), self.error_state)
+        self.logger.info("Step %d: evento='%s', stato_precedente='%s'", self.step, evento, names[state])
+        if transition_counter.enabled:
+            transition_counter.inc("dfa-async", names[state], evento)
+        event = self.ev_valid_user if is_valid_user else self.ev_invalid_user
+        state = automaton.step(state, event)
+        if tracer.enabled:
+            tracer.record(self.step, state, event)
 
-        if state == self.error_state:
+        if state == error:
+            self.audit_event(username, "validate", False)
             print("Utente non riconosciuto.")
             return False
 
         # --- STEP 3: ciclo password fino a max_pass_attempts ---
         # Prima transizione per 'input_pass'
         self.step += 1
-        self.logger.info(f"Step {self.step}: evento='input_pass', stato_precedente='check_pass'")
-        state = self.transitions.get((state, "input_pass"), self.error_state)
+        self.logger.info("Step %d: evento='input_pass', stato_precedente='%s'", self.step, names[state])
+        if transition_counter.enabled:
+            transition_counter.inc("dfa-async", names[state], "input_pass")
+        state = automaton.step(state, self.ev_input_pass)
+        if tracer.enabled:
+            tracer.record(self.step, state, self.ev_input_pass)
 
         for attempt in range(1, max_pass_attempts + 1):
             # Lettura password
@@ -142,28 +281,79 @@ class AsyncDFALogin:
             evento = "valid_pass" if is_valid_pass else "invalid_pass"
             self.step += 1
             self.logger.info(
-                f"Step {self.step}: tentativo_password={attempt}, evento='{evento}', stato_precedente='check_pass'"
+                "Step %d: tentativo_password=%d, evento='%s', stato_precedente='%s'",
+                self.step, attempt, evento, names[state]
             )
-            state = self.transitions.get(("check_pass", evento), self.error_state)
+            if transition_counter.enabled:
+                transition_counter.inc("dfa-async", names[state], evento)
+            event = self.ev_valid_pass if is_valid_pass else self.ev_invalid_pass
+            state = automaton.step(state, event)
+            if tracer.enabled:
+                tracer.record(self.step, state, event)
+            self.record_attempt(username, client_id, is_valid_pass)
 
-            if state == self.accept_state:
+            if state == accept:
                 print(f"Accesso effettuato con successo. Benvenuto, {username}!")
                 return True
 
+            if self.is_locked_out(username, client_id):
+                print("Troppi tentativi falliti. Riprova più tardi.")
+                return False
+
             # Se password sbagliata e restano tentativi, riprova
             if attempt < max_pass_attempts:
                 print("Password errata, riprova.")
-                # rimettiamo lo stato su 'check_pass' e facciamo un nuovo input_pass
+                # nuovo input_pass: retry_pass -> check_pass, come nella tabella della specifica
                 self.step += 1
-                self.logger.info(f"Step {self.step}: evento='input_pass' per retry, stato_precedente='error'")
-                state = self.transitions.get((self.error_state, "input_pass"), "check_pass")
+                self.logger.info("Step %d: evento='input_pass' per retry, stato_precedente='%s'",
+                                 self.step, names[state])
+                if transition_counter.enabled:
+                    transition_counter.inc("dfa-async", names[state], "input_pass")
+                state = automaton.step(state, self.ev_input_pass)
+                if tracer.enabled:
+                    tracer.record(self.step, state, self.ev_input_pass)
 
         # Se esauriti i tentativi
         print("Numero tentativi esaurito. Accesso negato.")
         return False
 
+    # Metodo per valutare in blocco tracce di eventi registrate
+    def run_batch(self, traces: Sequence[Sequence[str]], max_pass_attempts: Optional[int] = 3):
+        """
+        Valuta molte tracce di eventi (es. ['input_user', 'valid_user', 'input_pass', 'valid_pass'])
+        sulla tabella della specifica, senza I/O né event-loop.
+        Le coppie (stato, evento) non definite portano in errore. I tentativi ripetuti
+        (invalid_pass, input_pass, ...) seguono la transizione retry_pass -> check_pass come in run();
+        come in run(), una traccia con max_pass_attempts password errate non è accettata
+        (None per non applicare il limite). Le password errate sono contate sulla stessa
+        matrice codificata usata per l'esecuzione, con un confronto vettoriale per colonna.
+        :return: vettore booleano NumPy, True se la traccia termina in 'authenticated'
+        """
+        from Automata_core.Batch_Evaluation import encode_sequences, run_encoded
+
+        self.logger.info("Batch: valutazione di %d tracce", len(traces))
+        dfa = self.compile()
+        matrix, _ = encode_sequences(dfa, traces)
+        accepted = run_encoded(dfa, matrix)
+        if max_pass_attempts is not None:
+            # ev_invalid_pass è già la colonna dell'evento nella tabella (e nella matrice)
+            accepted &= (matrix == self.ev_invalid_pass).sum(axis=1) < max_pass_attempts
+        return accepted
+
+    # Metodo per compilare la tabella di transizione
+    def compile(self) -> "CompiledDFA":
+        """Restituisce la tabella della specifica come CompiledDFA (condivisa dalle istanze con lo stesso automa)."""
+        return self.automaton.dfa
+
 # Esecuzione del DFA asincrono
 if __name__ == "__main__":
+    # Configurazione base del logger (solo quando il modulo è eseguito come script)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
     # Esempio di database iniziale
     users_db = {
         "alice": hashlib.sha256("wonderland".encode()).hexdigest(),
@@ -0,0 +1,210 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+from typing import TYPE_CHECKING, List, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+# Classe base dei generatori di hash (KDF) intercambiabili
+class PasswordHasher(abc.ABC):
+    """
+    Interfaccia di un hasher di password:
+      - hash(password): produce il record da salvare nel database utenti
+      - verify(password, stored): verifica la password contro il record salvato
+    Le sottoclassi devono essere serializzabili con pickle per poter girare in un ProcessPoolExecutor.
+    """
+    name = "base"
+
+    @abc.abstractmethod
+    def hash(self, password: str) -> str:
+        """Record da salvare nel database utenti per la password."""
+
+    def verify(self, password: str, stored: str) -> bool:
+        """Confronto a tempo costante tra l'hash ricalcolato e il record salvato."""
+        return hmac.compare_digest(self.hash(password), stored)
+
+
+class Sha256Hasher(PasswordHasher):
+    """SHA-256 esadecimale senza sale: il formato storico di AsyncDFALogin.hash_password."""
+    name = "sha256"
+
+    def hash(self, password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    """PBKDF2-HMAC-SHA256 con sale casuale; formato: pbkdf2_sha256$iterazioni$sale_hex$hash_hex."""
+    name = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = 200_000, salt_size: int = 16):
+        self.iterations = iterations
+        self.salt_size = salt_size
+
+    def _derive(self, password: str, salt: bytes, iterations: int) -> str:
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations).hex()
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_size)
+        return f"{self.name}${self.iterations}${salt.hex()}${self._derive(password, salt, self.iterations)}"
+
+    def verify(self, password: str, stored: str) -> bool:
+        """False anche per un record malformato (campi mancanti, sale non esadecimale, iterazioni non valide)."""
+        try:
+            name, iterations, salt, digest = stored.split("$")
+            if name != self.name:
+                return False
+            derived = self._derive(password, bytes.fromhex(salt), int(iterations))
+        except (ValueError, OverflowError):
+            return False
+        return hmac.compare_digest(derived, digest)
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt con sale casuale; formato: scrypt$n$r$p$sale_hex$hash_hex."""
+    name = "scrypt"
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, salt_size: int = 16):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+
+    def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> str:
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=2 * 128 * r * n).hex()
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self.salt_size)
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.name}${self.n}${self.r}${self.p}${salt.hex()}${digest}"
+
+    def verify(self, password: str, stored: str) -> bool:
+        """False anche per un record malformato (campi mancanti, sale non esadecimale, parametri non validi)."""
+        try:
+            name, n, r, p, salt, digest = stored.split("$")
+            if name != self.name:
+                return False
+            derived = self._derive(password, bytes.fromhex(salt), int(n), int(r), int(p))
+        except (ValueError, OverflowError, MemoryError):
+            return False
+        return hmac.compare_digest(derived, digest)
+
+
+# Funzione eseguita nei worker: verifica un lotto di password con una sola chiamata al pool
+def verify_batch(hasher: PasswordHasher, items: Sequence[Tuple[str, str]]) -> List[bool]:
+    """Verifica in sequenza le coppie (password, record) del lotto e restituisce gli esiti."""
+    return [hasher.verify(password, stored) for password, stored in items]
+
+
+class VerificationQueueFull(RuntimeError):
+    """Sollevata quando le verifiche in attesa superano max_queue: il chiamante deve rifiutare la richiesta."""
+
+
+# Classe che sposta le verifiche fuori dall'event loop
+class VerificationPool:
+    """
+    Esegue le verifiche delle password in un pool di processi (o thread) senza bloccare l'event loop.
+
+    Controlli:
+      - max_concurrency: lotti in esecuzione contemporaneamente nel pool
+      - max_queue: verifiche in attesa o in corso; oltre il limite verify() solleva VerificationQueueFull
+      - batch_size / batch_delay: micro-batching; le verifiche in attesa vengono raggruppate
+        fino a batch_size elementi o per al più batch_delay secondi, e inviate al pool con una sola chiamata
+    """
+
+    def __init__(
+            self,
+            hasher: PasswordHasher,
+            executor: Optional["Executor"] = None,
+            use_processes: bool = True,
+            max_workers: Optional[int] = None,
+            max_concurrency: Optional[int] = None,
+            max_queue: int = 1024,
+            batch_size: int = 1,
+            batch_delay: float = 0.0
+    ):
+        """
+        :param hasher: KDF usato per le verifiche
+        :param executor: executor esistente da riusare (non viene chiuso da close())
+        :param use_processes: se executor è None, crea un ProcessPoolExecutor (altrimenti ThreadPoolExecutor)
+        :param max_workers: dimensione del pool creato (default: numero di CPU)
+        :param max_concurrency: lotti contemporanei nel pool (default: max_workers)
+        """
+        self.hasher = hasher
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._owns_executor = executor is None
+        if executor is None:
+            # import al primo pool creato: concurrent.futures.process non pesa su chi non usa il pool
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+            pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            executor = pool_class(max_workers=self.max_workers)
+        self.executor = executor
+        self.max_concurrency = max_concurrency or self.max_workers
+        self.max_queue = max_queue
+        self.batch_size = max(1, batch_size)
+        self.batch_delay = batch_delay
+        self.pending = 0
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._batch: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    # Metodo principale: verifica asincrona di una password
+    async def verify(self, password: str, stored: str) -> bool:
+        """Accoda la verifica e ne attende l'esito senza bloccare l'event loop."""
+        if self.pending >= self.max_queue:
+            raise VerificationQueueFull(f"Coda di verifica piena ({self.max_queue} richieste in attesa)")
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        future = loop.create_future()
+        self.pending += 1
+        self._batch.append((password, stored, future))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+
+    # Metodo che invia il lotto corrente al pool
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._batch:
+            batch, self._batch = self._batch, []
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        """Esegue un lotto nel pool rispettando max_concurrency e risolve i future in attesa."""
+        items = [(password, stored) for password, stored, _ in batch]
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self.executor, verify_batch, self.hasher, items)
+        except Exception as exc:
+            self.logger.error("Verifica del lotto fallita: %s", exc)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    # Metodo di chiusura del pool
+    def close(self) -> None:
+        """Chiude l'executor se è stato creato dal pool."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
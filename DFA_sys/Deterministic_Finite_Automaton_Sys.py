@@ -2,14 +2,24 @@ import sys
 import getpass
 import logging
 from enum import Enum, auto
+from typing import TYPE_CHECKING, Optional, Sequence
 
-# CONFIGURAZIONE INIZIALE
-# Step 1: Configura il logging per tracciare il flusso di esecuzione
-logging.basicConfig(
-    #level=logging.DEBUG,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from Automata_core.Automaton_Spec import AutomatonSpec, TableAutomaton
+from Automata_core.Metrics import run_counter, transition_counter
+from Automata_core.Tracing import tracer
+
+if TYPE_CHECKING:
+    # Solo per le annotazioni: limiter, audit, filtro e archivio su disco sono opzionali e
+    # i loro moduli vengono caricati da chi li crea (o al primo uso), non all'import del motore.
+    from Automata_core.Attempt_Limiter import AttemptLimiter
+    from Automata_core.Audit_Journal import AuditJournal
+    from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA
+    from Automata_core.Credential_Store import CredentialStore
+    from Automata_core.Cuckoo_Filter import CuckooFilter
+
+# Logger del modulo: la configurazione (livello, formato) spetta a chi esegue lo script.
+# I messaggi usano la formattazione lazy di logging, pagata solo se il livello è attivo.
+logger = logging.getLogger(__name__)
 
 # Classe: State (Enum)
 # Obiettivo: Definire i possibili stati del DFA di autenticazione
@@ -20,6 +30,26 @@ class State(Enum):
     AUTH_SUCCESS = auto()     # Autenticazione riuscita
     AUTH_FAILURE = auto()     # Autenticazione fallita
 
+# Specifica dichiarativa del flusso (stati, eventi e transizioni come dati, vedi Automata_core.Automaton_Spec).
+# Gli eventi sono quelli eseguiti da input_username / input_password / validate; le coppie
+# (stato, evento) non definite portano nello stato pozzo e vengono rifiutate con ValueError.
+LOGIN_SPEC = AutomatonSpec.from_dict({
+    "start": "START",
+    "accept": ["AUTH_SUCCESS"],
+    "transitions": {
+        "START":            {"input_username": "USERNAME_ENTERED"},
+        "AUTH_FAILURE":     {"input_username": "USERNAME_ENTERED"},
+        "USERNAME_ENTERED": {"input_password": "PASSWORD_ENTERED"},
+        "PASSWORD_ENTERED": {"auth_success": "AUTH_SUCCESS", "auth_failure": "AUTH_FAILURE"},
+    },
+})
+LOGIN_AUTOMATON = LOGIN_SPEC.compile()
+LOGIN_EVENTS = ('input_username', 'input_password', 'auth_success', 'auth_failure')
+
+# Tabella degli eventi del DFA: (stato, evento) -> stato successivo, con i membri di State
+# (vista della specifica per chi lavora con l'Enum; i motori usano la tabella intera).
+EVENT_TRANSITIONS = {(State[src], event): State[dst] for (src, event), dst in LOGIN_SPEC.transitions.items()}
+
 # Classe: LoginDFA
 # Obiettivo: Gestire il flusso di autenticazione usando un DFA sincronizzato
 # Step 2: Inizializza il DFA con lo stato START e le credenziali
@@ -27,17 +57,50 @@ class State(Enum):
 # Step 4: Ricezione della password e transizione di stato
 # Step 5: Validazione delle credenziali e transizione di stato
 class LoginDFA:
-    def __init__(self, credentials: dict):
+    # Tabella condivisa tra le istanze e colonne degli eventi, risolte una sola volta:
+    # ogni transizione è un accesso a automaton.table con lo stato intero corrente.
+    automaton: TableAutomaton = LOGIN_AUTOMATON
+    _ev_username, _ev_password, _ev_success, _ev_failure = LOGIN_AUTOMATON.resolve(*LOGIN_EVENTS)
+
+    def __init__(self, credentials: "CredentialStore", limiter: Optional["AttemptLimiter"] = None,
+                 client_id: Optional[str] = None, audit: Optional["AuditJournal"] = None,
+                 automaton: Optional[TableAutomaton] = None, user_filter: Optional["CuckooFilter"] = None):
         """
         Metodo: __init__
-        Obiettivo: Inizializza il DFA con lo stato START e carica il dizionario delle credenziali
+        Obiettivo: Inizializza il DFA con lo stato START e carica l'archivio delle credenziali
+        (un dict oppure un MmapCredentialStore su disco). Con un AttemptLimiter i tentativi
+        falliti sono contati per username (e per client_id, se indicato) anche tra istanze diverse.
+        Con un AuditJournal l'esito di ogni validazione viene registrato nel journal di audit.
+        Con `automaton` (una AutomatonSpec compilata con gli eventi di LOGIN_EVENTS) il flusso
+        segue una specifica diversa da LOGIN_SPEC, senza modificare i metodi.
+        Con `user_filter` (un CuckooFilter degli username) gli username sicuramente inesistenti
+        sono respinti in memoria, senza interrogare l'archivio.
         """
         # Step 2: Inizializza attributi
-        self.state = State.START
+        if automaton is not None:
+            self.automaton = automaton
+            self._ev_username, self._ev_password, self._ev_success, self._ev_failure = \
+                automaton.resolve(*LOGIN_EVENTS)
+        self._state = self.automaton.start
+        self.step = 0             # transizioni eseguite dall'istanza (passo registrato nel tracer)
         self.username_buffer = ''
         self.password_buffer = ''
         self.credentials = credentials
-        logging.info(f"[Step 2][__init__] DFA inizializzato nello stato {self.state}")
+        self.limiter = limiter
+        self.client_id = client_id
+        self.audit = audit
+        self.user_filter = user_filter
+        logger.info("[Step 2][__init__] DFA inizializzato nello stato %s", self.automaton.names[self._state])
+
+    @property
+    def state(self):
+        """Stato corrente come membro di State (il nome, per stati non presenti nell'Enum)."""
+        name = self.automaton.names[self._state]
+        return State[name] if name in State.__members__ else name
+
+    @state.setter
+    def state(self, value) -> None:
+        self._state = self.automaton.state_id(value.name if isinstance(value, State) else value)
 
     def input_username(self, user: str):
         """
@@ -45,13 +108,21 @@ class LoginDFA:
         Obiettivo: Ricevere l'username dell'utente e fare la transizione di stato START/FAILURE -> USERNAME_ENTERED
         """
         # Step 3: Ricezione input dell'username
-        logging.info(f"[Step 3][input_username] Chiamato con user='{user}' in stato {self.state}")
-        if self.state in {State.START, State.AUTH_FAILURE}:
+        automaton, state = self.automaton, self._state
+        names = automaton.names
+        logger.info("[Step 3][input_username] Chiamato con user='%s' in stato %s", user, names[state])
+        nxt = automaton.table[state * automaton.width + self._ev_username]
+        if nxt != automaton.dead:
+            if transition_counter.enabled:
+                transition_counter.inc("dfa-sync", names[state], 'input_username')
             self.username_buffer = user
-            self.state = State.USERNAME_ENTERED
-            logging.info(f"[Step 3][input_username] Transizione a {self.state}; username_buffer='{self.username_buffer}'")
+            self._state = nxt
+            self.step += 1
+            if tracer.enabled:
+                tracer.record(self.step, nxt, self._ev_username)
+            logger.info("[Step 3][input_username] Transizione a %s; username_buffer='%s'", names[nxt], self.username_buffer)
         else:
-            logging.error(f"[Step 3][input_username] Input inatteso in stato {self.state}")
+            logger.error("[Step 3][input_username] Input inatteso in stato %s", names[state])
             raise ValueError(f"Input inatteso 'username' in stato {self.state}")
 
     def input_password(self, pwd: str):
@@ -60,13 +131,21 @@ class LoginDFA:
         Obiettivo: Ricevere la password e fare la transizione USERNAME_ENTERED -> PASSWORD_ENTERED
         """
         # Step 4: Ricezione input della password
-        logging.info(f"[Step 4][input_password] Chiamato in stato {self.state}")
-        if self.state == State.USERNAME_ENTERED:
+        automaton, state = self.automaton, self._state
+        names = automaton.names
+        logger.info("[Step 4][input_password] Chiamato in stato %s", names[state])
+        nxt = automaton.table[state * automaton.width + self._ev_password]
+        if nxt != automaton.dead:
+            if transition_counter.enabled:
+                transition_counter.inc("dfa-sync", names[state], 'input_password')
             self.password_buffer = pwd
-            self.state = State.PASSWORD_ENTERED
-            logging.info(f"[Step 4][input_password] Transizione a {self.state}; password_buffer='***'")
+            self._state = nxt
+            self.step += 1
+            if tracer.enabled:
+                tracer.record(self.step, nxt, self._ev_password)
+            logger.info("[Step 4][input_password] Transizione a %s; password_buffer='***'", names[nxt])
         else:
-            logging.error(f"[Step 4][input_password] Input inatteso in stato {self.state}")
+            logger.error("[Step 4][input_password] Input inatteso in stato %s", names[state])
             raise ValueError(f"Input inatteso 'password' in stato {self.state}")
 
     def validate(self):
@@ -75,29 +154,117 @@ class LoginDFA:
         Obiettivo: Verificare le credenziali e fare la transizione PASSWORD_ENTERED -> AUTH_SUCCESS/AUTH_FAILURE
         """
         # Step 5: Validazione delle credenziali
-        logging.info(f"[Step 5][validate] Chiamato in stato {self.state}")
-        if self.state != State.PASSWORD_ENTERED:
-            logging.error(f"[Step 5][validate] Validazione inattesa in stato {self.state}")
+        automaton, state = self.automaton, self._state
+        names = automaton.names
+        logger.info("[Step 5][validate] Chiamato in stato %s", names[state])
+        row = state * automaton.width
+        success = automaton.table[row + self._ev_success]
+        failure = automaton.table[row + self._ev_failure]
+        if success == automaton.dead or failure == automaton.dead:
+            logger.error("[Step 5][validate] Validazione inattesa in stato %s", names[state])
             raise ValueError(f"Validazione inattesa in stato {self.state}")
-        expected = self.credentials.get(self.username_buffer)
-        if expected and expected == self.password_buffer:
-            self.state = State.AUTH_SUCCESS
-            logging.info(f"[Step 5][validate] Autenticazione riuscita per utente '{self.username_buffer}'")
-            return True
+        accepted = self.check_credentials(self.credentials, self.limiter, self.audit, self.user_filter,
+                                          self.username_buffer, self.password_buffer, self.client_id)
+        event, nxt = (self._ev_success, success) if accepted else (self._ev_failure, failure)
+        if transition_counter.enabled:
+            transition_counter.inc("dfa-sync", names[state], automaton.event_names[event])
+        self._state = nxt
+        self.step += 1
+        if tracer.enabled:
+            tracer.record(self.step, nxt, event)
+        return accepted
+
+    @staticmethod
+    def check_credentials(credentials: "CredentialStore", limiter: Optional["AttemptLimiter"],
+                          audit: Optional["AuditJournal"], user_filter: Optional["CuckooFilter"],
+                          username: str, password: str, client_id: Optional[str]) -> bool:
+        """
+        Metodo: check_credentials
+        Obiettivo: Decidere l'esito di una validazione (Step 5) senza toccare lo stato dell'automa:
+        blocco del limiter, filtro degli username, confronto con l'archivio, aggiornamento del
+        limiter, journal di audit e contatore delle esecuzioni. Condiviso da LoginDFA.validate e
+        LoginSessionStore.validate, che applicano poi la transizione auth_success / auth_failure.
+        """
+        if limiter is not None:
+            from Automata_core.Attempt_Limiter import client_key, user_key
+            if ((client_id is not None and limiter.is_locked(client_key(client_id)))
+                    or limiter.is_locked(user_key(username))):
+                # Utente o client bloccato: le credenziali non vengono nemmeno confrontate
+                run_counter.inc("dfa-sync", "locked")
+                if audit is not None:
+                    audit.record(username, "dfa-sync", "lockout", False)
+                logger.warning("[Step 5][validate] Utente '%s' bloccato per troppi tentativi", username)
+                return False
+        if user_filter is not None and username not in user_filter:
+            expected = None
+        else:
+            expected = credentials.get(username)
+        accepted = bool(expected) and expected == password
+        run_counter.inc("dfa-sync", "accepted" if accepted else "rejected")
+        if limiter is not None:
+            if accepted:
+                limiter.record_success(user_key(username))
+            else:
+                limiter.record_failure(user_key(username))
+                if client_id is not None:
+                    limiter.record_failure(client_key(client_id))
+        if audit is not None:
+            audit.record(username, "dfa-sync", "validate", accepted)
+        if accepted:
+            logger.info("[Step 5][validate] Autenticazione riuscita per utente '%s'", username)
         else:
-            self.state = State.AUTH_FAILURE
-            logging.warning(f"[Step 5][validate] Autenticazione fallita per utente '{self.username_buffer}'")
+            logger.warning("[Step 5][validate] Autenticazione fallita per utente '%s'", username)
+        return accepted
+
+    def is_locked_out(self) -> bool:
+        """
+        Metodo: is_locked_out
+        Obiettivo: Verificare se l'username corrente (o il client) è bloccato dal limiter condiviso
+        """
+        if self.limiter is None:
             return False
+        from Automata_core.Attempt_Limiter import client_key, user_key
+        if self.client_id is not None and self.limiter.is_locked(client_key(self.client_id)):
+            return True
+        return self.limiter.is_locked(user_key(self.username_buffer))
+
+    def run_batch(self, traces: Sequence[Sequence[str]]):
+        """
+        Metodo: run_batch
+        Obiettivo: Valutare in blocco tracce di eventi registrate (es. ['input_username',
+        'input_password', 'auth_success']) sulla tabella della specifica,
+        restituendo un vettore booleano: True se la traccia termina in AUTH_SUCCESS.
+        Le transizioni non previste (che i metodi rifiutano con ValueError) rendono la traccia non accettata.
+        """
+        logger.info("[run_batch] Valutazione di %d tracce", len(traces))
+        return self.compile().run_batch(traces)
+
+    def compile(self) -> "CompiledDFA":
+        """
+        Metodo: compile
+        Obiettivo: Restituire la tabella della specifica come CompiledDFA
+        (condivisa tra le istanze con lo stesso automa), ad es. per salvarla su disco.
+        """
+        return self.automaton.dfa
 
 if __name__ == '__main__':
+    # CONFIGURAZIONE INIZIALE
+    # Step 1: Configura il logging per tracciare il flusso di esecuzione
+    logging.basicConfig(
+        #level=logging.DEBUG,
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
     # Step 6: Configurazione delle credenziali di esempio
     users = {
         'alice': 'pa$$w0rd',
         'bob': '123456'
     }
 
-    # Step 7: Creazione istanza del DFA
-    dfa = LoginDFA(users)
+    # Step 7: Creazione istanza del DFA (blocco dopo 3 errori in 5 minuti)
+    from Automata_core.Attempt_Limiter import AttemptLimiter, user_key
+    dfa = LoginDFA(users, limiter=AttemptLimiter(max_attempts=3, window=300.0, lockout=60.0))
     print("Benvenuto al sistema di autenticazione")
 
     # Step 8: Ciclo principale di login
@@ -123,4 +290,7 @@ if __name__ == '__main__':
             break
         else:
             # Step 10: Accesso negato -> ripeti il ciclo
-            print("Credenziali invalide. Riprova.\n")
\ No newline at end of file
+            if dfa.is_locked_out():
+                print(f"Troppi tentativi: utente bloccato per {dfa.limiter.retry_after(user_key(username)):.0f} s.\n")
+            else:
+                print("Credenziali invalide. Riprova.\n")
\ No newline at end of file
@@ -0,0 +1,226 @@
+import logging
+import time
+from array import array
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from Automata_core.Metrics import transition_counter
+from Automata_core.Tracing import tracer
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LOGIN_AUTOMATON, LOGIN_EVENTS, LoginDFA, State
+
+if TYPE_CHECKING:
+    from Automata_core.Attempt_Limiter import AttemptLimiter
+    from Automata_core.Audit_Journal import AuditJournal
+    from Automata_core.Credential_Store import CredentialStore
+    from Automata_core.Cuckoo_Filter import CuckooFilter
+
+logger = logging.getLogger(__name__)
+
+FREE = 0xFF                 # codice di uno slot libero (gli altri codici sono gli stati di LOGIN_AUTOMATON)
+_SLOT_MASK = 0xFFFFFFFF
+_EV_USERNAME, _EV_PASSWORD, _EV_SUCCESS, _EV_FAILURE = LOGIN_AUTOMATON.resolve(*LOGIN_EVENTS)
+
+
+class SessionStoreFull(RuntimeError):
+    """Sollevata da open() quando sono aperte max_sessions sessioni e nessuna è scaduta."""
+
+
+class LoginSessionStore:
+    """
+    Classe LoginSessionStore:
+    - Scopo: mantenere milioni di login in corso senza un oggetto LoginDFA per sessione.
+    - Motivazione: ogni LoginDFA ha un proprio __dict__; qui una sessione occupa uno slot
+      in array paralleli (struttura di array), riusato tramite free list, quindi nessuna
+      allocazione per sessione e nessun lavoro per il garbage collector.
+
+    Layout per slot:
+    - states[slot]: id intero dello stato in LOGIN_AUTOMATON (FREE = slot libero), 1 byte;
+    - last_active[slot]: istante dell'ultima operazione (float64), per la scadenza per inattività;
+    - generations[slot]: generazione dello slot (uint32), incrementata a ogni riuso;
+    - steps[slot]: transizioni eseguite dalla sessione (uint32), il passo registrato nel tracer;
+    - usernames[slot] / passwords[slot] / clients[slot]: riferimenti alle stringhe ricevute
+      (None se assenti).
+
+    L'id di sessione è (generazione << 32) | slot: un id di una sessione chiusa o scaduta non
+    può agire sulla sessione che ha riusato lo slot. Le transizioni usano LOGIN_AUTOMATON,
+    la stessa tabella di LoginDFA, e la validazione passa per LoginDFA.check_credentials,
+    la stessa di LoginDFA.validate (limiter, filtro degli username, audit, metriche).
+    """
+
+    def __init__(
+            self,
+            credentials: "CredentialStore",
+            idle_timeout: float = 300.0,
+            max_sessions: int = 1 << 24,
+            initial_capacity: int = 1024,
+            limiter: Optional["AttemptLimiter"] = None,
+            clock: Callable[[], float] = time.monotonic,
+            audit: Optional["AuditJournal"] = None,
+            user_filter: Optional["CuckooFilter"] = None
+    ):
+        """
+        :param credentials: archivio username -> password (dict o MmapCredentialStore)
+        :param idle_timeout: secondi di inattività dopo i quali una sessione viene chiusa
+        :param max_sessions: numero massimo di sessioni aperte contemporaneamente
+        :param initial_capacity: slot allocati all'avvio (la capacità raddoppia quando serve)
+        :param limiter: contatore condiviso dei tentativi falliti, come in LoginDFA
+        :param audit: AuditJournal in cui registrare gli esiti, come in LoginDFA
+        :param user_filter: CuckooFilter degli username consultato prima dell'archivio, come in LoginDFA
+        """
+        self.credentials = credentials
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.limiter = limiter
+        self.audit = audit
+        self.user_filter = user_filter
+        self.clock = clock
+        self.states = bytearray()
+        self.last_active = array('d')
+        self.generations = array('I')
+        self.steps = array('I')
+        self.usernames: List[Optional[str]] = []
+        self.passwords: List[Optional[str]] = []
+        self.clients: List[Optional[str]] = []
+        self._free = array('I')
+        self._sweep = 0          # posizione della scansione incrementale degli slot scaduti
+        self.open_sessions = 0
+        self._grow(min(initial_capacity, max_sessions))
+
+    @property
+    def capacity(self) -> int:
+        return len(self.states)
+
+    def _grow(self, extra: int) -> None:
+        """Aggiunge `extra` slot liberi (in coda alla free list, usati a partire dal più basso)."""
+        start = self.capacity
+        self.states.extend(bytes([FREE]) * extra)
+        self.last_active.extend(array('d', bytes(8 * extra)))
+        self.generations.extend(array('I', bytes(4 * extra)))
+        self.steps.extend(array('I', bytes(4 * extra)))
+        self.usernames.extend([None] * extra)
+        self.passwords.extend([None] * extra)
+        self.clients.extend([None] * extra)
+        self._free.extend(range(start + extra - 1, start - 1, -1))
+
+    # ─── Apertura, ricerca e chiusura ─────────────────────────────────────────────────────────────
+
+    def open(self, client_id: Optional[str] = None) -> int:
+        """Apre una sessione nello stato START e ne restituisce l'id (client_id come in LoginDFA)."""
+        if not self._free:
+            self.evict_idle(max_scan=1024)
+        if not self._free:
+            if self.capacity >= self.max_sessions:
+                raise SessionStoreFull(f"Raggiunto il limite di {self.max_sessions} sessioni aperte")
+            self._grow(min(max(self.capacity, 1), self.max_sessions - self.capacity))
+        slot = self._free.pop()
+        generation = (self.generations[slot] + 1) & _SLOT_MASK
+        self.generations[slot] = generation
+        self.states[slot] = LOGIN_AUTOMATON.start
+        self.steps[slot] = 0
+        self.last_active[slot] = self.clock()
+        self.clients[slot] = client_id
+        self.open_sessions += 1
+        return (generation << 32) | slot
+
+    def _slot(self, session_id: int) -> int:
+        """Slot di una sessione aperta e non scaduta (aggiorna l'istante di attività), altrimenti KeyError."""
+        slot = session_id & _SLOT_MASK
+        if (slot >= self.capacity or self.states[slot] == FREE
+                or self.generations[slot] != session_id >> 32):
+            raise KeyError(f"Sessione {session_id} inesistente o chiusa")
+        now = self.clock()
+        if now - self.last_active[slot] > self.idle_timeout:
+            self._release(slot)
+            raise KeyError(f"Sessione {session_id} scaduta per inattività")
+        self.last_active[slot] = now
+        return slot
+
+    def _release(self, slot: int) -> None:
+        self.states[slot] = FREE
+        self.usernames[slot] = None
+        self.passwords[slot] = None
+        self.clients[slot] = None
+        self._free.append(slot)
+        self.open_sessions -= 1
+
+    def close(self, session_id: int) -> None:
+        """Chiude la sessione e rende lo slot riutilizzabile."""
+        self._release(self._slot(session_id))
+
+    def state(self, session_id: int) -> State:
+        """Stato corrente della sessione."""
+        return State[LOGIN_AUTOMATON.names[self.states[self._slot(session_id)]]]
+
+    def evict_idle(self, max_scan: Optional[int] = None) -> int:
+        """
+        Chiude le sessioni inattive da più di idle_timeout.
+        Con max_scan esamina al più max_scan slot a partire da dove si era fermata la
+        scansione precedente (costo limitato per chiamata); restituisce le sessioni chiuse.
+        """
+        capacity = self.capacity
+        if not capacity:
+            return 0
+        limit = capacity if max_scan is None else min(max_scan, capacity)
+        deadline = self.clock() - self.idle_timeout
+        states, last_active = self.states, self.last_active
+        evicted = 0
+        slot = self._sweep % capacity
+        for _ in range(limit):
+            if states[slot] != FREE and last_active[slot] < deadline:
+                self._release(slot)
+                evicted += 1
+            slot = slot + 1 if slot + 1 < capacity else 0
+        self._sweep = slot
+        if evicted:
+            logger.info("LoginSessionStore: %d sessioni chiuse per inattività", evicted)
+        return evicted
+
+    # ─── Transizioni di LoginDFA per id di sessione ───────────────────────────────────────────────
+
+    def _transition(self, slot: int, event: int) -> int:
+        """Applica la transizione di LOGIN_AUTOMATON allo slot; ValueError se l'evento non è previsto nello stato."""
+        current = self.states[slot]
+        nxt = LOGIN_AUTOMATON.step(current, event)
+        name = LOGIN_AUTOMATON.event_names[event]
+        if nxt == LOGIN_AUTOMATON.dead:
+            raise ValueError(f"Input inatteso '{name}' in stato {State[LOGIN_AUTOMATON.names[current]]}")
+        if transition_counter.enabled:
+            transition_counter.inc("dfa-sync", LOGIN_AUTOMATON.names[current], name)
+        self.states[slot] = nxt
+        step = self.steps[slot] + 1
+        self.steps[slot] = step
+        if tracer.enabled:
+            tracer.record(step, nxt, event)
+        return nxt
+
+    def input_username(self, session_id: int, user: str) -> None:
+        """Come LoginDFA.input_username: START/AUTH_FAILURE -> USERNAME_ENTERED."""
+        slot = self._slot(session_id)
+        self._transition(slot, _EV_USERNAME)
+        self.usernames[slot] = user
+
+    def input_password(self, session_id: int, pwd: str) -> None:
+        """Come LoginDFA.input_password: USERNAME_ENTERED -> PASSWORD_ENTERED."""
+        slot = self._slot(session_id)
+        self._transition(slot, _EV_PASSWORD)
+        self.passwords[slot] = pwd
+
+    def validate(self, session_id: int) -> bool:
+        """
+        Come LoginDFA.validate: PASSWORD_ENTERED -> AUTH_SUCCESS / AUTH_FAILURE.
+        La password viene scartata subito dopo il confronto.
+        """
+        slot = self._slot(session_id)
+        if LOGIN_AUTOMATON.step(self.states[slot], _EV_SUCCESS) == LOGIN_AUTOMATON.dead:
+            raise ValueError(f"Validazione inattesa in stato {State[LOGIN_AUTOMATON.names[self.states[slot]]]}")
+        username, password, client = self.usernames[slot], self.passwords[slot], self.clients[slot]
+        self.passwords[slot] = None
+        accepted = LoginDFA.check_credentials(self.credentials, self.limiter, self.audit, self.user_filter,
+                                              username, password, client)
+        self._transition(slot, _EV_SUCCESS if accepted else _EV_FAILURE)
+        return accepted
+
+    def __len__(self) -> int:
+        return self.open_sessions
+
+    def __repr__(self) -> str:
+        return f"LoginSessionStore(open={self.open_sessions}, capacity={self.capacity})"
@@ -0,0 +1,223 @@
+import argparse
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import random
+import string
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from Automata_core.Attempt_Limiter import AttemptLimiter
+from Automata_core.Credential_Store import MmapCredentialStore
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+
+logger = logging.getLogger(__name__)
+
+Attempt = Tuple[str, str]  # (username, password)
+
+
+def _ring_hash(key: str) -> int:
+    """Hash stabile tra processi per l'anello di hashing consistente."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+class HashRing:
+    """
+    Classe HashRing:
+    - Scopo: assegnare ogni username a un worker con hashing consistente.
+    - Ogni worker occupa `replicas` punti dell'anello (nodi virtuali), così il carico
+      è uniforme e aggiungere o togliere un worker sposta solo ~1/N degli username.
+    """
+
+    def __init__(self, nodes: Iterable[int], replicas: int = 64):
+        points = sorted((_ring_hash(f"worker-{node}#{r}"), node) for node in nodes for r in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> int:
+        """Worker responsabile della chiave: il primo punto dell'anello in senso orario."""
+        i = bisect.bisect(self._keys, _ring_hash(key)) % len(self._keys)
+        return self._nodes[i]
+
+
+def _open_credentials(credentials: Union[str, Mapping]) -> Mapping:
+    """Un percorso è un indice creato con Credential_Store.build_index, aperto in sola lettura nel worker."""
+    return MmapCredentialStore(credentials) if isinstance(credentials, str) else credentials
+
+
+def _worker_main(worker_id: int, conn, credentials: Union[str, Mapping],
+                 limiter_options: Optional[Dict]) -> None:
+    """
+    Ciclo del processo worker: riceve blocchi di tentativi dalla pipe, esegue per ciascuno
+    una sessione LoginDFA (username -> password -> validate) e risponde con gli esiti.
+    Il limiter è locale al worker: grazie all'instradamento per username ogni utente
+    è sempre servito dallo stesso processo, quindi i contatori restano coerenti.
+    """
+    store = _open_credentials(credentials)
+    limiter = AttemptLimiter(**limiter_options) if limiter_options is not None else None
+    requests, successes, busy = 0, 0, 0.0
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        kind, payload = message
+        if kind == "stats":
+            conn.send({"worker": worker_id, "pid": os.getpid(), "requests": requests,
+                       "successes": successes, "busy_s": busy,
+                       "requests_per_s": requests / busy if busy else 0.0})
+            continue
+        start = time.perf_counter()
+        results = []
+        for username, password in payload:
+            dfa = LoginDFA(store, limiter=limiter)
+            dfa.input_username(username)
+            dfa.input_password(password)
+            results.append(dfa.validate())
+        busy += time.perf_counter() - start
+        requests += len(payload)
+        successes += sum(results)
+        conn.send(results)
+    if isinstance(store, MmapCredentialStore):
+        store.close()
+    conn.close()
+
+
+class LoginWorkerPool:
+    """
+    Classe LoginWorkerPool:
+    - Scopo: distribuire la validazione dei login su N processi, ciascuno con il proprio LoginDFA.
+    - Motivazione: LoginDFA è sincrono e un solo processo Python usa un solo core.
+
+    Il supervisore avvia i worker, instrada ogni tentativo con HashRing (per username, quindi
+    la sessione di un utente resta in un processo) e comunica con una Pipe per worker.
+    validate_many invia un blocco a ogni worker prima di attendere le risposte, così i
+    worker lavorano in parallelo e il costo della pipe è pagato una volta per blocco.
+
+    Le credenziali sono un percorso di indice MmapCredentialStore (ogni worker lo mappa in
+    sola lettura e le pagine sono condivise) oppure un Mapping ereditato dai worker.
+    """
+
+    def __init__(
+            self,
+            credentials: Union[str, Mapping],
+            workers: Optional[int] = None,
+            limiter_options: Optional[Dict] = None,
+            replicas: int = 64
+    ):
+        """
+        :param credentials: percorso dell'indice credenziali oppure Mapping username -> password
+        :param workers: numero di processi (default: os.cpu_count())
+        :param limiter_options: argomenti di AttemptLimiter per il limiter di ciascun worker (None = nessuno)
+        :param replicas: nodi virtuali per worker sull'anello
+        """
+        self.n_workers = workers or os.cpu_count() or 1
+        self.ring = HashRing(range(self.n_workers), replicas)
+        self._conns = []
+        self._processes = []
+        for worker_id in range(self.n_workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker_main, args=(worker_id, child_conn, credentials, limiter_options),
+                name=f"login-worker-{worker_id}", daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        logger.info("LoginWorkerPool: avviati %d worker", self.n_workers)
+
+    def worker_for(self, username: str) -> int:
+        """Indice del worker che gestisce l'username."""
+        return self.ring.node_for(username)
+
+    def validate(self, username: str, password: str) -> bool:
+        """Valida un singolo tentativo nel worker dell'username."""
+        conn = self._conns[self.worker_for(username)]
+        conn.send(("batch", [(username, password)]))
+        return conn.recv()[0]
+
+    def validate_many(self, attempts: Sequence[Attempt]) -> List[bool]:
+        """
+        Valida molti tentativi: li divide per worker, invia tutti i blocchi e poi raccoglie
+        le risposte. Gli esiti sono restituiti nell'ordine di `attempts`.
+        """
+        positions: List[List[int]] = [[] for _ in range(self.n_workers)]
+        batches: List[List[Attempt]] = [[] for _ in range(self.n_workers)]
+        for i, attempt in enumerate(attempts):
+            worker = self.worker_for(attempt[0])
+            positions[worker].append(i)
+            batches[worker].append(attempt)
+
+        for worker, batch in enumerate(batches):
+            if batch:
+                self._conns[worker].send(("batch", batch))
+        results: List[bool] = [False] * len(attempts)
+        for worker, batch in enumerate(batches):
+            if batch:
+                for i, ok in zip(positions[worker], self._conns[worker].recv()):
+                    results[i] = ok
+        return results
+
+    def stats(self) -> Dict:
+        """Statistiche per worker (richieste, successi, tempo occupato, throughput) e totali."""
+        for conn in self._conns:
+            conn.send(("stats", None))
+        per_worker = [conn.recv() for conn in self._conns]
+        busiest = max((w["busy_s"] for w in per_worker), default=0.0)
+        requests = sum(w["requests"] for w in per_worker)
+        return {
+            "workers": per_worker,
+            "requests": requests,
+            "successes": sum(w["successes"] for w in per_worker),
+            # Throughput aggregato: i worker lavorano in parallelo, conta il più lento
+            "requests_per_s": requests / busiest if busiest else 0.0,
+        }
+
+    def close(self) -> None:
+        """Chiede ai worker di terminare e attende i processi."""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for conn in self._conns:
+            conn.close()
+        self._conns, self._processes = [], []
+
+    def __enter__(self) -> "LoginWorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Validazione LoginDFA su più processi")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--attempts", type=int, default=200000)
+    parser.add_argument("--credentials", help="indice creato con Automata_core.Credential_Store (default: dict sintetico)")
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    users = {"".join(rng.choices(string.ascii_lowercase, k=8)): "".join(rng.choices(string.ascii_lowercase, k=8))
+             for _ in range(args.users)}
+    names = list(users)
+    attempts = [(name, users[name] if rng.random() < 0.5 else "wrong")
+                for name in (rng.choice(names) for _ in range(args.attempts))]
+
+    with LoginWorkerPool(args.credentials or users, workers=args.workers) as pool:
+        start = time.perf_counter()
+        outcomes = pool.validate_many(attempts)
+        elapsed = time.perf_counter() - start
+        report = pool.stats()
+    print(f"{len(attempts)} tentativi, {sum(outcomes)} riusciti, {args.workers} worker: "
+          f"{len(attempts) / elapsed:.0f} login/s")
+    for worker in report["workers"]:
+        print(f"  worker {worker['worker']} (pid {worker['pid']}): {worker['requests']} richieste, "
+              f"{worker['requests_per_s']:.0f} login/s")
@@ -0,0 +1,102 @@
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from Automata_core.Alphabet_Compression import OTHER, symbol_classes
+from NFA_asys.No_Deterministic_Finite_Automaton_Asys import NFA
+
+logger = logging.getLogger(__name__)
+
+
+class LazyDFA:
+    """
+    Classe LazyDFA:
+    - Scopo: eseguire un NFA_asys.NFA alla velocità di un DFA senza determinizzarlo in anticipo.
+    - Motivazione: la subset construction completa (NFA.compile) può produrre un numero
+      esponenziale di stati (es. "(a|b)*a(a|b){20}"); qui si creano solo gli stati del DFA
+      effettivamente visitati dall'input.
+
+    Funzionamento (in stile RE2):
+    - uno stato del DFA è la bitmask ε-chiusa degli stati dell'NFA (come in NFA._advance);
+    - i simboli sono raggruppati in classi di equivalenza (stesse righe di successori
+      nell'NFA, es. tutte le lettere di [a-z]); per ogni stato visitato si memorizza una riga
+      classe -> stato successivo, riempita alla prima occorrenza di un simbolo della classe;
+    - le righe stanno in una cache LRU di al più `max_states` stati;
+    - se in un'esecuzione si calcolano più di `max_states` transizioni nuove e ognuna è stata
+      riusata in media meno di `min_symbols_per_state` volte, la cache non sta aiutando
+      (thrashing): il resto dell'input viene elaborato con la simulazione dell'NFA.
+    """
+
+    def __init__(self, nfa: NFA, max_states: int = 4096, min_symbols_per_state: int = 10):
+        self.nfa = nfa
+        self.max_states = max_states
+        self.min_symbols_per_state = min_symbols_per_state
+        self.cache: "OrderedDict[int, List[Optional[int]]]" = OrderedDict()
+        self._index_classes()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fallbacks = 0
+
+    def _index_classes(self) -> None:
+        """Classi di equivalenza dei simboli dell'NFA (la classe OTHER, fuori alfabeto, porta a 0)."""
+        symbol_masks = self.nfa.symbol_masks
+        self.classes: Dict[str, int]
+        self.classes, self.representatives = symbol_classes(
+            sorted(symbol_masks), lambda sym: tuple(symbol_masks[sym]))
+        self.representatives.insert(OTHER, None)
+        self._empty_row = [0] + [None] * (len(self.representatives) - 1)
+
+    def _row(self, mask: int) -> List[Optional[int]]:
+        """Riga di transizioni dello stato `mask`, creata se assente (con sfratto LRU)."""
+        cache = self.cache
+        row = cache.get(mask)
+        if row is None:
+            row = cache[mask] = self._empty_row[:]
+            if len(cache) > self.max_states:
+                cache.popitem(last=False)
+                self.evictions += 1
+        else:
+            cache.move_to_end(mask)
+        return row
+
+    def run(self, text: str) -> bool:
+        """Esegue l'automa sull'intera stringa e restituisce True se accettata."""
+        return bool(self._final_mask(text) & self.nfa.accept_mask)
+
+    def _final_mask(self, text: str) -> int:
+        """Bitmask degli stati dell'NFA attivi dopo l'intera stringa (0 se l'input è già rifiutato)."""
+        nfa = self.nfa
+        classes, representatives = self.classes, self.representatives
+        mask = nfa.start_mask
+        computed = 0
+        processed = len(text)   # simboli elaborati tramite la cache
+        for i, symbol in enumerate(text):
+            row = self._row(mask)
+            cls = classes.get(symbol, OTHER)
+            nxt = row[cls]
+            if nxt is None:
+                nxt = row[cls] = nfa._advance(mask, representatives[cls])
+                computed += 1
+                if computed > self.max_states and i + 1 < computed * self.min_symbols_per_state:
+                    self.fallbacks += 1
+                    logger.info("[LazyDFA.run] Cache inefficace dopo %d simboli: simulazione NFA", i + 1)
+                    mask = nfa._advance_chunk(nxt, text[i + 1:], i + 2) if nxt else 0
+                    processed = i + 1
+                    break
+            mask = nxt
+            if not mask:
+                processed = i + 1
+                break
+        self.misses += computed
+        self.hits += processed - computed
+        return mask
+
+    def clear(self) -> None:
+        """Svuota la cache e ricalcola le classi (da chiamare se l'NFA viene modificato e rifinalizzato)."""
+        self.cache.clear()
+        self._index_classes()
+
+    def __repr__(self) -> str:
+        return (f"LazyDFA(cached={len(self.cache)}/{self.max_states}, hits={self.hits}, "
+                f"misses={self.misses}, evictions={self.evictions}, fallbacks={self.fallbacks})")
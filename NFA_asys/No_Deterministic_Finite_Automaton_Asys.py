@@ -1,14 +1,16 @@
 import asyncio
 import logging
+import time
 from dataclasses import dataclass, field
-from typing import Dict, List, Set
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Sequence, Set
 
-# ─── Configurazione del logger ─────────────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+from Automata_core.Alphabet_Compression import symbol_classes, widen
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA, minimize, subset_construction
+from Automata_core.Metrics import run_counter
+from Automata_core.Tracing import tracer
+
+# ─── Logger del modulo (configurato solo quando il file è eseguito come script) ────────────────────
+logger = logging.getLogger(__name__)
 
 @dataclass
 class State:
@@ -27,77 +29,303 @@ class State:
 
     def add_transition(self, symbol: str, state: 'State'):
         """Metodo State.add_transition: aggiunge una transizione etichettata."""
-        logging.info(f"[State.add_transition] Obiettivo: collegare stato '{self.name}' → '{state.name}' via '{symbol}'")
+        logger.info("[State.add_transition] Obiettivo: collegare stato '%s' → '%s' via '%s'",
+                     self.name, state.name, symbol)
         self.transitions.setdefault(symbol, []).append(state)
 
     def add_epsilon(self, state: 'State'):
         """Metodo State.add_epsilon: aggiunge una transizione ε."""
-        logging.info(f"[State.add_epsilon] Obiettivo: collegare stato '{self.name}' → '{state.name}' via ε")
+        logger.info("[State.add_epsilon] Obiettivo: collegare stato '%s' → '%s' via ε", self.name, state.name)
         self.epsilon_transitions.append(state)
 
 class NFA:
     """
     Classe NFA: automa non deterministico asincrono.
     Obiettivo: simulare un NFA su una stringa di input.
+
+    Rappresentazione interna (calcolata da finalize()):
+    - ogni State raggiungibile riceve un indice intero;
+    - un insieme di stati attivi è un int usato come bitmask;
+    - le ε-chiusure e i successori per simbolo (già chiusi) sono bitmask precalcolate,
+      quindi ogni passo di run è una sequenza di OR.
+
+    Budget di cooperazione con l'event loop:
+    - yield_every: numero di simboli elaborati tra due possibili yield (asyncio.sleep(0));
+    - yield_interval_us: se indicato, ogni yield_every simboli si cede il controllo solo
+      se sono trascorsi almeno yield_interval_us microsecondi dall'ultimo yield.
     """
-    def __init__(self, start_state: State, accept_states: Set[State]):
-        logging.info(f"[NFA.__init__] Obiettivo: inizializzare NFA con start={start_state.name}, accept={[s.name for s in accept_states]}")
+    def __init__(self, start_state: State, accept_states: Set[State],
+                 yield_every: int = 64, yield_interval_us: Optional[float] = None):
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[NFA.__init__] Obiettivo: inizializzare NFA con start=%s, accept=%s",
+                        start_state.name, [s.name for s in accept_states])
         self.start_state = start_state
         self.accept_states = accept_states
+        self.yield_every = max(1, yield_every)
+        self.yield_interval_us = yield_interval_us
+        self.compiled: Optional[CompiledDFA] = None
+        self.finalize()
 
-    def epsilon_closure(self, states: Set[State]) -> Set[State]:
+    def finalize(self) -> None:
         """
-        Metodo NFA.epsilon_closure:
-        Obiettivo: espandere lo stato corrente includendo transizioni ε ricorsive.
+        Metodo NFA.finalize:
+        Obiettivo: indicizzare gli stati raggiungibili e precalcolare ε-chiusure e
+        successori per simbolo come bitmask. Da richiamare se il grafo viene modificato
+        dopo la costruzione dell'NFA.
         """
-        logging.info(f"[NFA.epsilon_closure] Obiettivo: calcolare chiusura ε di {[s.name for s in states]}")
-        stack = list(states)
-        closure = set(states)
+        # Indicizzazione degli stati raggiungibili (più gli stati di accettazione)
+        states: List[State] = []
+        index: Dict[State, int] = {}
+        stack = [self.start_state, *self.accept_states]
         while stack:
             st = stack.pop()
-            for nxt in st.epsilon_transitions:
-                if nxt not in closure:
-                    logging.info(f"  ε-chiusura: aggiungo stato '{nxt.name}' da '{st.name}'")
-                    closure.add(nxt)
-                    stack.append(nxt)
-        logging.info(f"[NFA.epsilon_closure] Risultato chiusura ε: {[s.name for s in closure]}")
+            if st in index:
+                continue
+            index[st] = len(states)
+            states.append(st)
+            stack.extend(st.epsilon_transitions)
+            for targets in st.transitions.values():
+                stack.extend(targets)
+        self.states = states
+        self.index = index
+
+        # ε-chiusura di ogni stato, una sola visita per stato
+        closures = [0] * len(states)
+        for i, st in enumerate(states):
+            mask = 1 << i
+            pending = [st]
+            while pending:
+                for nxt in pending.pop().epsilon_transitions:
+                    bit = 1 << index[nxt]
+                    if not mask & bit:
+                        mask |= bit
+                        pending.append(nxt)
+            closures[i] = mask
+        self.closures = closures
+
+        # Successori per simbolo, già chiusi rispetto a ε: symbol_masks[symbol][i]
+        symbol_masks: Dict[str, List[int]] = {}
+        for i, st in enumerate(states):
+            for symbol, targets in st.transitions.items():
+                row = symbol_masks.setdefault(symbol, [0] * len(states))
+                for tgt in targets:
+                    row[i] |= closures[index[tgt]]
+        self.symbol_masks = symbol_masks
+
+        self.start_mask = closures[index[self.start_state]]
+        self.accept_mask = self._mask_of(self.accept_states)
+        self.compiled = None
+
+    def _mask_of(self, states: Iterable[State]) -> int:
+        """Converte un insieme di State nella bitmask corrispondente."""
+        mask = 0
+        for st in states:
+            mask |= 1 << self.index[st]
+        return mask
+
+    def _states_of(self, mask: int) -> Set[State]:
+        """Converte una bitmask nell'insieme di State corrispondente."""
+        result: Set[State] = set()
+        while mask:
+            low = mask & -mask
+            result.add(self.states[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def _close(self, mask: int) -> int:
+        """ε-chiusura di una bitmask: OR delle chiusure precalcolate dei suoi stati."""
+        closures = self.closures
+        closed = 0
+        while mask:
+            low = mask & -mask
+            closed |= closures[low.bit_length() - 1]
+            mask ^= low
+        return closed
+
+    def _advance(self, mask: int, symbol: str) -> int:
+        """Un passo dell'NFA su bitmask: OR dei successori (già ε-chiusi) degli stati attivi."""
+        row = self.symbol_masks.get(symbol)
+        if row is None:
+            return 0
+        nxt = 0
+        while mask:
+            low = mask & -mask
+            nxt |= row[low.bit_length() - 1]
+            mask ^= low
+        return nxt
+
+    def epsilon_closure(self, states: Set[State]) -> Set[State]:
+        """
+        Metodo NFA.epsilon_closure:
+        Obiettivo: espandere lo stato corrente includendo transizioni ε ricorsive,
+        usando le chiusure precalcolate da finalize().
+        """
+        closure = self._states_of(self._close(self._mask_of(states)))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[NFA.epsilon_closure] Chiusura ε di %s: %s",
+                        [s.name for s in states], [s.name for s in closure])
         return closure
 
+    def _advance_chunk(self, mask: int, chunk: str, position: int) -> int:
+        """
+        Metodo NFA._advance_chunk:
+        Obiettivo: elaborare un blocco di simboli senza cedere il controllo all'event loop.
+        `position` è l'indice (1-based) del primo simbolo del blocco, usato per log e tracer.
+        """
+        verbose = logger.isEnabledFor(logging.INFO)
+        symbol_masks = self.symbol_masks
+        for idx, symbol in enumerate(chunk, start=position):
+            row = symbol_masks.get(symbol)
+            nxt = 0
+            if row is not None:
+                while mask:
+                    low = mask & -mask
+                    nxt |= row[low.bit_length() - 1]
+                    mask ^= low
+            mask = nxt
+            if verbose:
+                logger.info("Step %d — simbolo '%s', stati dopo ε-chiusura: %s",
+                            idx, symbol, [s.name for s in self._states_of(mask)])
+            if tracer.enabled:
+                tracer.record(idx, mask, ord(symbol))
+            if not mask:
+                # Nessuno stato attivo: l'input non può più essere accettato
+                break
+        return mask
+
+    def stream(self) -> "NFAStream":
+        """
+        Metodo NFA.stream:
+        Obiettivo: creare un'esecuzione incrementale (feed / feed_stream / result)
+        per input lunghi o ricevuti a blocchi, senza materializzarli in una sola stringa.
+        """
+        return NFAStream(self)
+
     async def run(self, input_string: str) -> bool:
         """
         Metodo NFA.run:
         Obiettivo: eseguire l'NFA su input_string in modo asincrono, restituendo True se accettato.
+        Il controllo viene ceduto all'event loop secondo il budget (yield_every / yield_interval_us).
         """
-        logging.info(f"[NFA.run] Obiettivo: avvio esecuzione NFA su '{input_string}'")
-        # Step 0: epsilon-chiusura iniziale
-        current_states = self.epsilon_closure({self.start_state})
-        logging.info(f"Step 0 — Stati iniziali: {[s.name for s in current_states]}")
-
-        # Iterazione sui simboli
-        for idx, symbol in enumerate(input_string, start=1):
-            logging.info(f"[NFA.run] Step {idx} — ingresso simbolo '{symbol}'")
-            next_states: Set[State] = set()
-            for st in current_states:
-                targets = st.transitions.get(symbol, [])
-                for tgt in targets:
-                    logging.info(f"  da {st.name} → {tgt.name} tramite '{symbol}'")
-                    next_states.add(tgt)
-            # epsilon-chiusura del passo
-            current_states = self.epsilon_closure(next_states)
-            logging.info(f"Step {idx} — stati dopo ε-chiusura: {[s.name for s in current_states]}")
-            await asyncio.sleep(0)  # yield per simulare branching
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info("[NFA.run] Obiettivo: avvio esecuzione NFA su '%s'", input_string)
+            logger.info("Step 0 — Stati iniziali: %s", [s.name for s in self._states_of(self.start_mask)])
+
+        # Iterazione sui simboli a blocchi: ogni passo è un OR di bitmask precalcolate
+        run = self.stream()
+        await run.feed_async(input_string)
 
         # Verifica accettazione
-        accepted = any(st in self.accept_states for st in current_states)
-        logging.info(f"[NFA.run] Esito finale: {'ACCETTATO' if accepted else 'RIFIUTATO'}")
+        accepted = run.result()
+        run_counter.inc("nfa-async", "accepted" if accepted else "rejected")
+        if verbose:
+            logger.info("[NFA.run] Esito finale: %s", 'ACCETTATO' if accepted else 'RIFIUTATO')
         return accepted
 
+    def to_dfa(self, minimized: bool = True) -> CompiledDFA:
+        """
+        Metodo NFA.to_dfa:
+        Obiettivo: determinizzare l'NFA (subset construction sulle bitmask) in un DFA compatto.
+        I simboli con le stesse righe di successori (es. tutte le lettere di [a-z]) formano
+        una classe: la subset construction usa un rappresentante per classe e le colonne
+        degli altri simboli vengono ricopiate alla fine.
+        """
+        accept_mask = self.accept_mask
+        symbol_masks = self.symbol_masks
+        alphabet = sorted(symbol_masks)
+        classes, representatives = symbol_classes(alphabet, lambda sym: tuple(symbol_masks[sym]))
+        dfa = subset_construction(
+            self.start_mask,
+            representatives,
+            self._advance,
+            lambda mask: bool(mask & accept_mask)
+        )
+        return widen(minimize(dfa) if minimized else dfa, alphabet, classes)
+
+    def compile(self) -> CompiledDFA:
+        """
+        Metodo NFA.compile:
+        Obiettivo: restituire il DFA minimizzato, calcolandolo alla prima chiamata
+        (la cache viene invalidata da finalize()).
+        """
+        if self.compiled is None:
+            self.compiled = self.to_dfa()
+        return self.compiled
+
+    def run_batch(self, sequences: Sequence[str]):
+        """
+        Metodo NFA.run_batch:
+        Obiettivo: valutare molte stringhe insieme sul DFA compilato con indicizzazione
+        vettoriale NumPy. È sincrono: pensato per rivalidazioni offline, non per il loop di login.
+        """
+        return self.compile().run_batch(sequences)
+
+class NFAStream:
+    """
+    Classe NFAStream: esecuzione incrementale di un NFA.
+    Obiettivo: consumare l'input a blocchi (feed, feed_async, feed_stream) mantenendo
+    solo la bitmask degli stati attivi, e leggere l'esito con result().
+    Ogni istanza ha il proprio stato: più stream sullo stesso NFA possono procedere in parallelo.
+    """
+    def __init__(self, nfa: NFA):
+        self.nfa = nfa
+        self.mask = nfa.start_mask   # stati attivi (bitmask)
+        self.position = 0            # simboli consumati finora
+        self._last_yield = time.perf_counter()
+
+    def feed(self, chunk: str) -> None:
+        """Metodo NFAStream.feed: elabora un blocco in modo sincrono, senza yield."""
+        if self.mask:
+            self.mask = self.nfa._advance_chunk(self.mask, chunk, self.position + 1)
+        self.position += len(chunk)
+
+    async def _cooperate(self) -> None:
+        """Cede il controllo all'event loop rispettando il budget temporale dell'NFA."""
+        interval = self.nfa.yield_interval_us
+        if interval is None:
+            await asyncio.sleep(0)
+            return
+        now = time.perf_counter()
+        if (now - self._last_yield) * 1e6 >= interval:
+            await asyncio.sleep(0)
+            self._last_yield = time.perf_counter()
+
+    async def feed_async(self, chunk: str) -> None:
+        """
+        Metodo NFAStream.feed_async:
+        Obiettivo: elaborare un blocco a fette di yield_every simboli, cedendo il controllo
+        tra una fetta e l'altra secondo il budget.
+        """
+        step = self.nfa.yield_every
+        for start in range(0, len(chunk), step):
+            if not self.mask:
+                # Nessuno stato attivo: il resto del blocco non cambia l'esito
+                self.position += len(chunk) - start
+                break
+            self.feed(chunk[start:start + step])
+            await self._cooperate()
+
+    async def feed_stream(self, chunks: AsyncIterable[str]) -> bool:
+        """
+        Metodo NFAStream.feed_stream:
+        Obiettivo: consumare un iteratore asincrono di blocchi e restituire l'esito finale.
+        """
+        async for chunk in chunks:
+            await self.feed_async(chunk)
+        return self.result()
+
+    def result(self) -> bool:
+        """Metodo NFAStream.result: True se almeno uno stato attivo è di accettazione."""
+        return bool(self.mask & self.nfa.accept_mask)
+
+
 def build_nfa_for_string(target: str) -> NFA:
     """
     Funzione build_nfa_for_string:
     Obiettivo: costruire un NFA che accetta esattamente la stringa target.
     """
-    logging.info(f"[build_nfa_for_string] Obiettivo: creare NFA per '{target}'")
+    logger.info("[build_nfa_for_string] Obiettivo: creare NFA per '%s'", target)
     states = [State(f"q{i}") for i in range(len(target) + 1)]
     states[-1].is_accept = True
     for i, ch in enumerate(target):
@@ -105,38 +333,38 @@ def build_nfa_for_string(target: str) -> NFA:
     return NFA(start_state=states[0], accept_states={states[-1]})
 
 async def main():
-    logging.info("[main] Obiettivo: avvio procedura login asincrona")
+    logger.info("[main] Obiettivo: avvio procedura login asincrona")
 
     # 1) Creazione NFA per l’username
-    logging.info("[main] Invocazione -> build_nfa_for_string(target='admin')")
+    logger.info("[main] Invocazione -> build_nfa_for_string(target='admin')")
     nfa_user = build_nfa_for_string("admin")
-    logging.info(f"[main] Completato -> NFA USER: start={nfa_user.start_state.name}, accept={[s.name for s in nfa_user.accept_states]}")
+    logger.info("[main] Completato -> NFA USER: start=%s, accept=%s", nfa_user.start_state.name, [s.name for s in nfa_user.accept_states])
 
     # 2) Creazione NFA per la password
-    logging.info("[main] Invocazione -> build_nfa_for_string(target='secret')")
+    logger.info("[main] Invocazione -> build_nfa_for_string(target='secret')")
     nfa_pwd = build_nfa_for_string("secret")
-    logging.info(f"[main] Completato -> NFA PWD: start={nfa_pwd.start_state.name}, accept={[s.name for s in nfa_pwd.accept_states]}")
+    logger.info("[main] Completato -> NFA PWD: start=%s, accept=%s", nfa_pwd.start_state.name, [s.name for s in nfa_pwd.accept_states])
 
     # Input utente
-    logging.info("[main] Chiamata -> input('Username: ')")
+    logger.info("[main] Chiamata -> input('Username: ')")
     username = input("Username: ")
-    logging.info(f"[main] Inserito USERNAME: '{username}'")
-    logging.info("[main] Chiamata -> input('Password: ')")
+    logger.info("[main] Inserito USERNAME: '%s'", username)
+    logger.info("[main] Chiamata -> input('Password: ')")
     password = input("Password: ")
-    logging.info("[main] Inserita PASSWORD: '***'")
+    logger.info("[main] Inserita PASSWORD: '***'")
 
     # 3) Verifica username
-    logging.info("[main] Invocazione -> NFA.run su USERNAME")
+    logger.info("[main] Invocazione -> NFA.run su USERNAME")
     ok_user = await nfa_user.run(username)
-    logging.info(f"[main] NFA.run USERNAME restituito: {ok_user}")
+    logger.info("[main] NFA.run USERNAME restituito: %s", ok_user)
     if not ok_user:
         print("Login fallito: username non valido.")
         return
 
     # 4) Verifica password
-    logging.info("[main] Invocazione -> NFA.run su PASSWORD")
+    logger.info("[main] Invocazione -> NFA.run su PASSWORD")
     ok_pwd = await nfa_pwd.run(password)
-    logging.info(f"[main] NFA.run PASSWORD restituito: {ok_pwd}")
+    logger.info("[main] NFA.run PASSWORD restituito: %s", ok_pwd)
     if not ok_pwd:
         print("Login fallito: password errata.")
     else:
@@ -144,4 +372,9 @@ async def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
     asyncio.run(main())
@@ -0,0 +1,78 @@
+import logging
+from typing import Iterable, List, Sequence
+
+from NFA_asys.Lazy_Deterministic_Finite_Automaton import LazyDFA
+from NFA_asys.No_Deterministic_Finite_Automaton_Asys import NFA, State
+
+logger = logging.getLogger(__name__)
+
+
+class ProductRunner(LazyDFA):
+    """
+    Classe ProductRunner:
+    - Scopo: valutare molte policy (NFA) sulla stessa stringa con una sola lettura dell'input,
+      invece di una chiamata run per automa.
+    - Motivazione: con decine di regole per credenziale o riga di log il costo per richiesta
+      cresce con il numero di regole; qui cresce solo con la lunghezza dell'input, perché
+      ogni simbolo è una sola transizione del DFA prodotto.
+
+    Funzionamento:
+    - gli automi sono riuniti in un NFA unione (un nuovo stato iniziale con un arco ε verso
+      lo stato iniziale di ciascuno): la bitmask dell'unione contiene gli stati attivi di
+      tutti gli automi, cioè lo stato del prodotto;
+    - il prodotto è determinizzato su richiesta dalla cache di LazyDFA (classi di simboli,
+      LRU, ripiego sulla simulazione dell'NFA), quindi solo le combinazioni visitate;
+    - l'input si ferma appena nessun automa può più accettare;
+    - accept_masks[i] individua gli stati finali dell'automa i nella bitmask finale.
+
+    match() restituisce una bitmask (bit i = l'automa i accetta), accepted() gli indici;
+    run(), ereditato da LazyDFA, è True se almeno un automa accetta.
+    """
+
+    def __init__(self, automata: Sequence[NFA], max_states: int = 4096, min_symbols_per_state: int = 10):
+        if not automata:
+            raise ValueError("ProductRunner richiede almeno un automa")
+        self.automata = list(automata)
+        root = State("product")
+        for nfa in self.automata:
+            root.add_epsilon(nfa.start_state)
+        union = NFA(start_state=root, accept_states=set().union(*(nfa.accept_states for nfa in self.automata)))
+        super().__init__(union, max_states, min_symbols_per_state)
+        self.accept_masks = [union._mask_of(nfa.accept_states) for nfa in self.automata]
+        logger.info("ProductRunner: %d automi, %d stati nell'unione, %d classi di simboli",
+                    len(self.automata), len(union.states), len(self.representatives))
+
+    def match(self, text: str) -> int:
+        """Bitmask degli automi che accettano `text` (bit i -> automata[i]), in una sola passata."""
+        mask = self._final_mask(text)
+        result = 0
+        if mask:
+            for i, accept in enumerate(self.accept_masks):
+                if mask & accept:
+                    result |= 1 << i
+        return result
+
+    def accepted(self, text: str) -> List[int]:
+        """Indici degli automi che accettano `text`."""
+        bits = self.match(text)
+        return [i for i in range(len(self.automata)) if bits >> i & 1]
+
+    def match_batch(self, texts: Iterable[str]) -> List[int]:
+        """match() su più stringhe, con la stessa cache degli stati del prodotto."""
+        return [self.match(text) for text in texts]
+
+    def __repr__(self) -> str:
+        return (f"ProductRunner(automata={len(self.automata)}, cached={len(self.cache)}/{self.max_states}, "
+                f"hits={self.hits}, misses={self.misses}, evictions={self.evictions}, fallbacks={self.fallbacks})")
+
+
+if __name__ == "__main__":
+    from NFA_asys.Regex_Compiler import compile_regex
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(message)s')
+    # Regole di esempio su uno username: formato, blocklist di account di servizio, nomi numerici
+    rules = ["[a-z][a-z0-9_]{2,15}", "(admin|root|test).*", ".*[0-9]{4}"]
+    runner = ProductRunner([compile_regex(rule) for rule in rules])
+    for candidate in ("alice", "admin_2024", "Root", "bob1999"):
+        print(f"{candidate!r}: {[rules[i] for i in runner.accepted(candidate)]}")
+    print(runner)
@@ -0,0 +1,261 @@
+import itertools
+import logging
+import string
+from typing import FrozenSet, List, Optional, Tuple
+
+from NFA_asys.No_Deterministic_Finite_Automaton_Asys import NFA, State
+
+logger = logging.getLogger(__name__)
+
+# Universo dei simboli per '.', classi negate e \D \W \S: ASCII stampabile.
+# Gli NFA hanno transizioni per singolo carattere, quindi un insieme "tutto tranne X"
+# va espanso su un alfabeto finito.
+DEFAULT_ALPHABET = frozenset(chr(c) for c in range(32, 127))
+
+_ESCAPES = {
+    "d": frozenset(string.digits),
+    "w": frozenset(string.ascii_letters + string.digits + "_"),
+    "s": frozenset(" \t\n\r\f\v"),
+}
+_CONTROL = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+# Nodi dell'albero sintattico (tuple):
+#   ("chars", frozenset)            un simbolo tra quelli dell'insieme
+#   ("cat", [nodi]) / ("alt", [nodi])
+#   ("star" | "plus" | "opt", nodo)
+#   ("repeat", nodo, minimo, massimo | None)
+#   ("empty",)
+Node = tuple
+
+
+class _Parser:
+    """
+    Parser a discesa ricorsiva per il sottoinsieme di regex usato dalle policy:
+    letterali, '.', classi [a-z] e [^...], escape \\d \\w \\s (e complementi), gruppi (...) e (?:...),
+    alternanza '|', quantificatori * + ? {m} {m,} {m,n}. '^' iniziale e '$' finale sono ammessi
+    e ignorati: il match riguarda sempre l'intera stringa.
+    """
+
+    def __init__(self, pattern: str, alphabet: FrozenSet[str]):
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.pos = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Regex non valida '{self.pattern}' (posizione {self.pos}): {message}")
+
+    def peek(self) -> Optional[str]:
+        return self.pattern[self.pos] if self.pos < len(self.pattern) else None
+
+    def take(self) -> str:
+        ch = self.peek()
+        if ch is None:
+            raise self.error("fine inattesa del pattern")
+        self.pos += 1
+        return ch
+
+    def parse(self) -> Node:
+        if self.peek() == "^":
+            self.pos += 1
+        node = self.parse_alt()
+        if self.peek() == "$" and self.pos == len(self.pattern) - 1:
+            self.pos += 1
+        if self.peek() is not None:
+            raise self.error(f"carattere inatteso '{self.peek()}'")
+        return node
+
+    def parse_alt(self) -> Node:
+        branches = [self.parse_cat()]
+        while self.peek() == "|":
+            self.pos += 1
+            branches.append(self.parse_cat())
+        return branches[0] if len(branches) == 1 else ("alt", branches)
+
+    def parse_cat(self) -> Node:
+        items: List[Node] = []
+        while self.peek() not in (None, "|", ")"):
+            if self.peek() == "$" and self.pos == len(self.pattern) - 1:
+                break
+            items.append(self.parse_repeat())
+        if not items:
+            return ("empty",)
+        return items[0] if len(items) == 1 else ("cat", items)
+
+    def parse_repeat(self) -> Node:
+        node = self.parse_atom()
+        while True:
+            ch = self.peek()
+            if ch == "*":
+                node = ("star", node)
+            elif ch == "+":
+                node = ("plus", node)
+            elif ch == "?":
+                node = ("opt", node)
+            elif ch == "{":
+                self.pos += 1
+                low, high = self.parse_bounds()
+                node = ("repeat", node, low, high)
+                continue
+            else:
+                return node
+            self.pos += 1
+
+    def parse_bounds(self) -> Tuple[int, Optional[int]]:
+        end = self.pattern.find("}", self.pos)
+        if end < 0:
+            raise self.error("'{' senza '}'")
+        body = self.pattern[self.pos:end]
+        low_text, sep, high_text = body.partition(",")
+        if not low_text.isdigit() or (high_text and not high_text.isdigit()):
+            raise self.error(f"quantificatore non valido '{{{body}}}'")
+        low = int(low_text)
+        high = low if not sep else (int(high_text) if high_text else None)
+        if high is not None and high < low:
+            raise self.error(f"quantificatore con massimo minore del minimo '{{{body}}}'")
+        self.pos = end + 1
+        return low, high
+
+    def parse_atom(self) -> Node:
+        ch = self.take()
+        if ch == "(":
+            if self.pattern.startswith("?:", self.pos):
+                self.pos += 2
+            node = self.parse_alt()
+            if self.take() != ")":
+                raise self.error("manca ')'")
+            return node
+        if ch == "[":
+            return ("chars", self.parse_class())
+        if ch == ".":
+            return ("chars", self.alphabet)
+        if ch == "\\":
+            return ("chars", self.parse_escape())
+        if ch in "*+?{)|":
+            raise self.error(f"'{ch}' senza operando")
+        return ("chars", frozenset(ch))
+
+    def parse_escape(self) -> FrozenSet[str]:
+        ch = self.take()
+        if ch in _ESCAPES:
+            return _ESCAPES[ch]
+        if ch.lower() in _ESCAPES:
+            return self.alphabet - _ESCAPES[ch.lower()]
+        return frozenset(_CONTROL.get(ch, ch))
+
+    def parse_class(self) -> FrozenSet[str]:
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+        chars = set()
+        first = True
+        while first or self.peek() != "]":
+            first = False
+            ch = self.take()
+            if ch == "\\":
+                members = self.parse_escape()
+                if len(members) != 1:
+                    chars |= members
+                    continue
+                (ch,) = members
+            if self.peek() == "-" and self.pattern[self.pos + 1:self.pos + 2] not in ("]", ""):
+                self.pos += 1
+                end = self.take()
+                if end == "\\":
+                    (end,) = self.parse_escape()
+                if ord(end) < ord(ch):
+                    raise self.error(f"intervallo non valido '{ch}-{end}'")
+                chars.update(chr(c) for c in range(ord(ch), ord(end) + 1))
+            else:
+                chars.add(ch)
+        self.pos += 1
+        return frozenset(self.alphabet - chars if negated else chars)
+
+
+class _Builder:
+    """Costruzione di Thompson: ogni nodo diventa un frammento (ingresso, uscita) di State."""
+
+    def __init__(self):
+        self._names = itertools.count()
+
+    def new_state(self) -> State:
+        return State(f"r{next(self._names)}")
+
+    def build(self, node: Node) -> Tuple[State, State]:
+        kind = node[0]
+        if kind == "empty":
+            state = self.new_state()
+            return state, state
+        if kind == "chars":
+            start, end = self.new_state(), self.new_state()
+            for symbol in sorted(node[1]):
+                start.add_transition(symbol, end)
+            return start, end
+        if kind == "cat":
+            start, end = self.build(node[1][0])
+            for item in node[1][1:]:
+                nxt_start, nxt_end = self.build(item)
+                end.add_epsilon(nxt_start)
+                end = nxt_end
+            return start, end
+        if kind == "alt":
+            start, end = self.new_state(), self.new_state()
+            for branch in node[1]:
+                b_start, b_end = self.build(branch)
+                start.add_epsilon(b_start)
+                b_end.add_epsilon(end)
+            return start, end
+        if kind in ("star", "plus", "opt"):
+            start, end = self.new_state(), self.new_state()
+            inner_start, inner_end = self.build(node[1])
+            start.add_epsilon(inner_start)
+            inner_end.add_epsilon(end)
+            if kind != "plus":
+                start.add_epsilon(end)      # zero occorrenze
+            if kind != "opt":
+                inner_end.add_epsilon(inner_start)  # ripetizione
+            return start, end
+        if kind == "repeat":
+            _, inner, low, high = node
+            parts: List[Node] = [inner] * low
+            if high is None:
+                parts.append(("star", inner))
+            else:
+                parts.extend([("opt", inner)] * (high - low))
+            return self.build(("cat", parts) if parts else ("empty",))
+        raise ValueError(f"Nodo regex sconosciuto: {kind}")
+
+
+def parse_regex(pattern: str, alphabet: FrozenSet[str] = DEFAULT_ALPHABET) -> Node:
+    """Analizza il pattern e restituisce l'albero sintattico (solleva ValueError se non valido)."""
+    return _Parser(pattern, frozenset(alphabet)).parse()
+
+
+def compile_regex(pattern: str, alphabet: FrozenSet[str] = DEFAULT_ALPHABET) -> NFA:
+    """
+    Funzione compile_regex:
+    Obiettivo: trasformare una regex in un NFA_asys.NFA con la costruzione di Thompson
+    (State collegati da transizioni per simbolo ed ε). Il match è sull'intera stringa.
+
+    Parametri:
+    - pattern: regex (vedi _Parser per la sintassi supportata)
+    - alphabet: universo dei simboli per '.', [^...], \\D, \\W, \\S
+    """
+    node = parse_regex(pattern, alphabet)
+    start, end = _Builder().build(node)
+    end.is_accept = True
+    nfa = NFA(start_state=start, accept_states={end})
+    logger.info("[compile_regex] '%s' -> NFA con %d stati", pattern, len(nfa.states))
+    return nfa
+
+
+if __name__ == "__main__":
+    from NFA_asys.Lazy_Deterministic_Finite_Automaton import LazyDFA
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(message)s')
+    # Policy di esempio: username minuscolo di 3-16 caratteri, password stampabile senza spazi di 8-64
+    username_policy = LazyDFA(compile_regex(r"[a-z][a-z0-9_]{2,15}"))
+    password_policy = LazyDFA(compile_regex(r"[!-~]{8,64}"))
+    for candidate in ("alice", "Al", "bob_2024", "x" * 20):
+        print(f"username {candidate!r}: {username_policy.run(candidate)}")
+    for candidate in ("secret", "c0rrect horse", "Tr0ub4dor&3"):
+        print(f"password {candidate!r}: {password_policy.run(candidate)}")
@@ -1,8 +1,17 @@
 import logging
-from typing import Set, Dict, Tuple
+from typing import TYPE_CHECKING, Set, Dict, FrozenSet, Optional, Sequence, Tuple
 
-# Configurazione del logger per visualizzare informazioni passo-passo
-logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
+from Automata_core.Alphabet_Compression import symbol_classes, widen
+from Automata_core.Compiled_Deterministic_Finite_Automaton import CompiledDFA, minimize, subset_construction
+from Automata_core.Metrics import run_counter, transition_counter
+from Automata_core.Tracing import tracer
+
+if TYPE_CHECKING:
+    from Automata_core.Audit_Journal import AuditJournal
+    from Automata_core.Credential_Store import CredentialStore
+    from Automata_core.Cuckoo_Filter import CuckooFilter
+
+# Logger del modulo: la configurazione (basicConfig) avviene solo nello script principale
 logger = logging.getLogger(__name__)
 
 class NFA:
@@ -30,6 +39,12 @@ class NFA:
         self.start_state = start_state        # Stato iniziale dell'automa
         self.accept_states = accept_states    # Stati di accettazione
         self.current_states = {start_state}   # Stati attivi in un dato momento
+        # Id interi per il tracer: bit dello stato nella bitmask e colonna del simbolo (nomi risolti in dump)
+        self.state_names = sorted(states)
+        self.symbol_names = sorted(alphabet)
+        self.state_bits = {state: 1 << i for i, state in enumerate(self.state_names)}
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbol_names)}
+        self.compiled: Optional[CompiledDFA] = None  # DFA compilato (vedi compile())
 
     # Metodo di reset dell'automa della classe NFA
     def reset(self) -> None:
@@ -52,20 +67,30 @@ class NFA:
         Scopo:
         - Calcolare il nuovo insieme di stati attivi a partire dagli stati correnti
           usando la funzione di transizione.
-        - Annotare nel log lo stato precedente, il simbolo e i nuovi stati.
+        - Annotare nel log (se il livello INFO è attivo) e nel tracer lo stato
+          precedente, il simbolo e i nuovi stati.
         """
-        logger.info(f"Chiamato NFA.step (step_num={step_num}, symbol='{symbol}')")
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info("Chiamato NFA.step (step_num=%d, symbol='%s')", step_num, symbol)
         next_states: Set[str] = set()
+        counting = transition_counter.enabled
 
         # Applico la transizione su ciascuno stato corrente
         for state in self.current_states:
             key = (state, symbol)
             if key in self.transitions:
                 next_states |= self.transitions[key]
+                if counting:
+                    transition_counter.inc("nfa-sync", state, symbol)
 
         # Log degli stati prima e dopo la transizione
-        logger.info(f"  Stati precedenti: {self.current_states}")
-        logger.info(f"  Nuovi stati:      {next_states}")
+        if verbose:
+            logger.info("  Stati precedenti: %s", self.current_states)
+            logger.info("  Nuovi stati:      %s", next_states)
+        if tracer.enabled:
+            state_bits = self.state_bits
+            tracer.record(step_num, sum(state_bits[state] for state in next_states), self.symbol_ids.get(symbol, -1))
         self.current_states = next_states
 
     # Metodo per verificare se l'automa si trova in uno stato di accettazione della classe NFA
@@ -76,13 +101,85 @@ class NFA:
         Scopo:
         - Determinare se la sequenza elaborata è accettata dall'NFA.
         - Registrare nel log gli stati finali e l'esito.
+
+        È una semplice lettura dello stato: l'esecuzione viene contata in run_counter
+        da chi la conclude (login_process, motore nfa-sync), non qui.
         """
         logger.info("Chiamato NFA.accepts: controllo stati di accettazione")
         accepted = any(state in self.accept_states for state in self.current_states)
-        logger.info(f"Stati finali: {self.current_states}")
-        logger.info(f"Accettazione: {'SÌ' if accepted else 'NO'}")
+        logger.info("Stati finali: %s", self.current_states)
+        logger.info("Accettazione: %s", 'SÌ' if accepted else 'NO')
         return accepted
 
+    # Metodo per risolvere la bitmask registrata dal tracer della classe NFA
+    def states_of(self, mask: int) -> Set[str]:
+        """
+        Insieme degli stati codificati in una bitmask di stati (es. i record del tracer):
+        da passare a tracer.dump(states=nfa.states_of, symbols=nfa.symbol_names).
+        """
+        return {state for state, bit in self.state_bits.items() if mask & bit}
+
+    # Metodo per convertire l'NFA in un DFA compatto della classe NFA
+    def to_dfa(self, minimized: bool = True) -> CompiledDFA:
+        """
+        Converte l'NFA in un DFA con stati interi e tabella di transizione piatta.
+
+        Parametri:
+        - minimized: se True applica la minimizzazione di Hopcroft dopo la subset construction.
+
+        Scopo:
+        - Pagare una sola volta il costo della determinizzazione, così che l'esecuzione
+          richieda un solo accesso in tabella per simbolo invece di un'unione di insiemi.
+
+        La subset construction lavora su un simbolo per classe di equivalenza (simboli con
+        gli stessi successori in ogni stato); le colonne degli altri simboli vengono
+        ricopiate alla fine (vedi Automata_core.Alphabet_Compression).
+        """
+        logger.info("Chiamato NFA.to_dfa: subset construction (minimized=%s)", minimized)
+        transitions = self.transitions
+        accept_states = self.accept_states
+        alphabet = sorted(self.alphabet)
+        states = sorted(self.states)
+        classes, representatives = symbol_classes(
+            alphabet, lambda sym: tuple(frozenset(transitions.get((st, sym), ())) for st in states))
+
+        def move(subset: FrozenSet[str], symbol: str) -> FrozenSet[str]:
+            targets: Set[str] = set()
+            for state in subset:
+                targets |= transitions.get((state, symbol), set())
+            return frozenset(targets)
+
+        dfa = subset_construction(
+            frozenset({self.start_state}),
+            representatives,
+            move,
+            lambda subset: not accept_states.isdisjoint(subset)
+        )
+        return widen(minimize(dfa) if minimized else dfa, alphabet, classes)
+
+    # Metodo per compilare (una sola volta) l'NFA della classe NFA
+    def compile(self) -> CompiledDFA:
+        """
+        Restituisce il DFA minimizzato, calcolandolo solo alla prima chiamata.
+        Da usare per automi fissi al momento del deploy (login, policy).
+        """
+        if self.compiled is None:
+            self.compiled = self.to_dfa()
+        return self.compiled
+
+    # Metodo per valutare molte sequenze di simboli in blocco della classe NFA
+    def run_batch(self, sequences: Sequence[Sequence[str]]):
+        """
+        Valuta molte sequenze (es. tracce 'up', 'xy' registrate da login_process) insieme.
+
+        Scopo:
+        - Usare il DFA compilato e l'indicizzazione vettoriale NumPy per far avanzare
+          tutte le sequenze in parallelo, senza un ciclo Python per simbolo.
+        - Restituire un vettore booleano con l'esito di ciascuna sequenza.
+        """
+        logger.info("Chiamato NFA.run_batch su %d sequenze", len(sequences))
+        return self.compile().run_batch(sequences)
+
 
 # Metodo per costruire l'NFA specifico per il processo di login
 def build_login_nfa() -> NFA:
@@ -126,27 +223,36 @@ def build_login_nfa() -> NFA:
 
 
 # Metodo per gestire il processo di login usando l'NFA
-def login_process(nfa: NFA, credentials: Dict[str, str]) -> None:
+def login_process(nfa: NFA, credentials: "CredentialStore", audit: Optional["AuditJournal"] = None,
+                  user_filter: Optional["CuckooFilter"] = None) -> bool:
     """
     Processo interattivo di login usando l'NFA.
+    `credentials` può essere un dict o un MmapCredentialStore su disco.
+    Con un AuditJournal l'esito del tentativo viene registrato nel journal di audit.
+    Con user_filter (CuckooFilter) un username assente dal filtro produce 'x' senza consultare l'archivio.
 
     Step:
     1. Chiedere username e password all'utente.
     2. Tradurre la validità di ciascun dato in simboli NFA ('u'/'x', 'p'/'y').
     3. Ripristinare l'automa.
     4. Iterare sui simboli e chiamare nfa.step() (log interno).
-    5. Chiamare nfa.accepts() per verificare successo o fallimento.
+    5. Chiamare nfa.accepts() per verificare successo o fallimento e contare l'esecuzione.
+
+    Restituisce l'esito del tentativo.
     """
     logger.info("Chiamato login_process: avvio del processo di login")
     # 1. Input dell'utente
     input_username = input("Inserisci username: ")
     input_password = input("Inserisci password: ")
-    logger.info(f"  Input ricevuto: username='{input_username}', password='{'*'*len(input_password)}'")
+    logger.info("  Input ricevuto: username='%s', password='%s'", input_username, '*'*len(input_password))
     # 2. Mappatura in simboli dell'NFA
     symbols = []
-    symbols.append('u' if input_username in credentials else 'x')
-    symbols.append('p' if credentials.get(input_username) == input_password else 'y')
-    logger.info(f"  Simboli generati per NFA: {symbols}")
+    if user_filter is not None and input_username not in user_filter:
+        symbols.extend(('x', 'y'))
+    else:
+        symbols.append('u' if input_username in credentials else 'x')
+        symbols.append('p' if credentials.get(input_username) == input_password else 'y')
+    logger.info("  Simboli generati per NFA: %s", symbols)
 
     # 3. Reset dell'automa prima dell'elaborazione
     nfa.reset()
@@ -156,16 +262,22 @@ def login_process(nfa: NFA, credentials: Dict[str, str]) -> None:
 
     # 5. Verifica accettazione
     result = nfa.accepts()
+    run_counter.inc("nfa-sync", "accepted" if result else "rejected")
+    if audit is not None:
+        audit.record(input_username, "nfa-sync", "validate", result)
     if result:
         print("Login riuscito. Benvenuto!")
     else:
         print("Login fallito. Riprova.")
     logger.info("login_process completato con esito: %s", 'SUCCESSO' if result else 'FALLIMENTO')
+    return result
 
 
 
 # Metodo principale per avviare il processo di login
 if __name__ == '__main__':
+    # Configurazione del logger per visualizzare informazioni passo-passo
+    logging.basicConfig(format='[%(levelname)s] %(message)s', level=logging.INFO)
     logger.info("---- Avvio script di login ----")
     # Credenziali di esempio per la demo
     demo_credentials = {
@@ -0,0 +1,287 @@
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+from NFA_asys.No_Deterministic_Finite_Automaton_Asys import NFA as AsyncNFA, State, build_nfa_for_string
+from NFA_sys.No_Deterministic_Finite_Automaton_Sys import NFA as SyncNFA, build_login_nfa
+
+SEED = 1234
+
+
+# ─── Generatori di input sintetici ────────────────────────────────────────────────────────────────
+
+def random_word(rng: random.Random, length: int, alphabet: str = "abcdefghijklmnopqrstuvwxyz") -> str:
+    """Stringa casuale di lunghezza data."""
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def make_credentials(rng: random.Random, n_users: int, length: int) -> Dict[str, str]:
+    """Credenziali in chiaro: username e password di `length` caratteri."""
+    return {random_word(rng, length): random_word(rng, length) for _ in range(n_users)}
+
+
+def make_login_attempts(rng: random.Random, credentials: Dict[str, str], n: int, length: int) -> List[Tuple[str, str]]:
+    """Mix deterministico di tentativi: 50% validi, 25% utente sconosciuto, 25% password errata."""
+    users = list(credentials)
+    attempts = []
+    for i in range(n):
+        user = rng.choice(users)
+        kind = i % 4
+        if kind < 2:
+            attempts.append((user, credentials[user]))
+        elif kind == 2:
+            attempts.append((random_word(rng, length + 1), random_word(rng, length)))
+        else:
+            attempts.append((user, random_word(rng, length + 1)))
+    return attempts
+
+
+def make_random_sync_nfa(rng: random.Random, n_states: int, fan_out: int, alphabet: str = "ab") -> SyncNFA:
+    """NFA_sys casuale: ogni (stato, simbolo) porta a `fan_out` stati (controlla gli stati attivi)."""
+    states = [f"s{i}" for i in range(n_states)]
+    transitions = {(st, sym): set(rng.sample(states, min(fan_out, n_states)))
+                   for st in states for sym in alphabet}
+    accept = set(rng.sample(states, max(1, n_states // 4)))
+    return SyncNFA(set(states), set(alphabet), transitions, states[0], accept)
+
+
+def make_random_async_nfa(rng: random.Random, n_states: int, fan_out: int, epsilon_density: float,
+                          alphabet: str = "ab") -> AsyncNFA:
+    """NFA_asys casuale con `fan_out` successori per simbolo e ε-transizioni con densità data."""
+    states = [State(f"s{i}") for i in range(n_states)]
+    for st in states:
+        for sym in alphabet:
+            for tgt in rng.sample(states, min(fan_out, n_states)):
+                st.add_transition(sym, tgt)
+        for tgt in states:
+            if tgt is not st and rng.random() < epsilon_density:
+                st.add_epsilon(tgt)
+    accept = set(rng.sample(states, max(1, n_states // 4)))
+    return AsyncNFA(states[0], accept)
+
+
+class ScriptedAsyncDFALogin(AsyncDFALogin):
+    """AsyncDFALogin con input preimpostati al posto di stdin (una istanza per sessione)."""
+
+    def __init__(self, users_db: dict, username: str, password: str):
+        super().__init__(users_db)
+        self._username = username
+        self._password = password
+
+    async def read_username(self) -> str:
+        return self._username
+
+    async def read_password(self) -> str:
+        return self._password
+
+
+# ─── Misurazione ──────────────────────────────────────────────────────────────────────────────────
+
+def measure(fn: Callable[[], int], repeat: int) -> Dict[str, float]:
+    """
+    Esegue `fn` (che restituisce il numero di simboli/eventi elaborati) `repeat` volte.
+    Riporta il migliore dei tempi e il picco di memoria misurato con tracemalloc in un'esecuzione separata.
+    """
+    best, steps = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": best,
+        "steps": steps,
+        "steps_per_s": steps / best if best else 0.0,
+        "step_latency_ns": best / steps * 1e9 if steps else 0.0,
+        "peak_memory_bytes": peak,
+    }
+
+
+# ─── Casi di benchmark per motore ─────────────────────────────────────────────────────────────────
+
+def bench_login_dfa(rng: random.Random, length: int, n_logins: int) -> Callable[[], int]:
+    credentials = make_credentials(rng, 1000, length)
+    attempts = make_login_attempts(rng, credentials, n_logins, length)
+
+    def run() -> int:
+        for user, pwd in attempts:
+            # Una sessione per tentativo: da AUTH_SUCCESS il DFA non accetta un nuovo username
+            dfa = LoginDFA(credentials)
+            dfa.input_username(user)
+            dfa.input_password(pwd)
+            dfa.validate()
+        return 3 * len(attempts)
+    return run
+
+
+def bench_async_dfa(rng: random.Random, length: int, n_logins: int, concurrency: int) -> Callable[[], int]:
+    credentials = make_credentials(rng, 1000, length)
+    users_db = {user: hashlib.sha256(pwd.encode()).hexdigest() for user, pwd in credentials.items()}
+    attempts = make_login_attempts(rng, credentials, n_logins, length)
+
+    async def worker(chunk: List[Tuple[str, str]]) -> None:
+        for user, pwd in chunk:
+            await ScriptedAsyncDFALogin(users_db, user, pwd).run(max_pass_attempts=1)
+
+    async def main() -> None:
+        chunks = [attempts[i::concurrency] for i in range(concurrency)]
+        await asyncio.gather(*(worker(chunk) for chunk in chunks))
+
+    def run() -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(main())
+        return 4 * len(attempts)
+    return run
+
+
+def bench_sync_nfa(nfa: SyncNFA, sequences: List[str]) -> Callable[[], int]:
+    def run() -> int:
+        for seq in sequences:
+            nfa.reset()
+            for idx, sym in enumerate(seq, start=1):
+                nfa.step(sym, idx)
+            nfa.accepts()
+        return sum(len(seq) for seq in sequences)
+    return run
+
+
+def bench_async_nfa(nfa: AsyncNFA, sequences: List[str]) -> Callable[[], int]:
+    async def main() -> None:
+        for seq in sequences:
+            await nfa.run(seq)
+
+    def run() -> int:
+        asyncio.run(main())
+        return sum(len(seq) for seq in sequences)
+    return run
+
+
+def suite(quick: bool) -> List[Tuple[str, str, Dict, Callable[[], int]]]:
+    """Elenco dei casi: (motore, caso, parametri, funzione da misurare)."""
+    rng = random.Random(SEED)
+    scale = 0.1 if quick else 1.0
+    n = max(10, int(2000 * scale))
+    cases = []
+
+    for length in (8, 32):
+        cases.append(("dfa-sync", "login", {"input_length": length, "logins": n},
+                      bench_login_dfa(rng, length, n)))
+    for concurrency in (1, 100):
+        cases.append(("dfa-async", "login", {"input_length": 8, "logins": n, "concurrency": concurrency},
+                      bench_async_dfa(rng, 8, n, concurrency)))
+
+    traces = ["".join(rng.choice("uxpy") for _ in range(2)) for _ in range(n)]
+    cases.append(("nfa-sync", "build_login_nfa", {"input_length": 2, "sequences": n},
+                  bench_sync_nfa(build_login_nfa(), traces)))
+    for n_states, fan_out in ((16, 1), (64, 4), (256, 16)):
+        words = [random_word(rng, 32, "ab") for _ in range(max(5, n // 20))]
+        cases.append(("nfa-sync", "random", {"states": n_states, "active_fan_out": fan_out, "input_length": 32},
+                      bench_sync_nfa(make_random_sync_nfa(rng, n_states, fan_out), words)))
+
+    for length in (8, 64):
+        target = random_word(rng, length)
+        words = [target if i % 2 else random_word(rng, length) for i in range(max(5, n // 10))]
+        cases.append(("nfa-async", "build_nfa_for_string", {"input_length": length},
+                      bench_async_nfa(build_nfa_for_string(target), words)))
+    for n_states, epsilon_density in ((32, 0.0), (32, 0.1), (128, 0.05)):
+        words = [random_word(rng, 32, "ab") for _ in range(max(5, n // 20))]
+        cases.append(("nfa-async", "random",
+                      {"states": n_states, "active_fan_out": 2, "epsilon_density": epsilon_density, "input_length": 32},
+                      bench_async_nfa(make_random_async_nfa(rng, n_states, 2, epsilon_density), words)))
+    return cases
+
+
+def git_revision() -> Optional[str]:
+    """Revisione git corrente (se disponibile), per identificare il risultato."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(quick: bool = False, repeat: int = 3, engines: Optional[List[str]] = None) -> Dict:
+    """Esegue tutti i casi (eventualmente filtrati per motore) e restituisce il risultato serializzabile."""
+    results = []
+    for engine, case, params, fn in suite(quick):
+        if engines and engine not in engines:
+            continue
+        stats = measure(fn, repeat)
+        results.append({"engine": engine, "case": case, "params": params, **stats})
+        print(f"{engine:10s} {case:22s} {json.dumps(params):80s} "
+              f"{stats['steps_per_s']:14.0f} passi/s {stats['step_latency_ns']:10.1f} ns/passo "
+              f"{stats['peak_memory_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": SEED,
+            "quick": quick,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def case_key(result: Dict) -> str:
+    return f"{result['engine']}/{result['case']}/{json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(baseline: Dict, candidate: Dict) -> List[str]:
+    """Confronta due file di risultati: rapporto di throughput e di memoria per ogni caso comune."""
+    old = {case_key(r): r for r in baseline["results"]}
+    lines = [f"{baseline['meta'].get('revision')} -> {candidate['meta'].get('revision')}"]
+    for result in candidate["results"]:
+        key = case_key(result)
+        if key not in old:
+            continue
+        before = old[key]
+        speedup = result["steps_per_s"] / before["steps_per_s"] if before["steps_per_s"] else float("nan")
+        memory = (result["peak_memory_bytes"] / before["peak_memory_bytes"]
+                  if before["peak_memory_bytes"] else float("nan"))
+        lines.append(f"{key:110s} throughput x{speedup:6.2f}  memoria x{memory:6.2f}")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dei quattro motori di automi")
+    parser.add_argument("--output", help="file JSON in cui salvare i risultati")
+    parser.add_argument("--quick", action="store_true", help="input ridotti (per verifiche rapide)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", action="append", help="limita ai motori indicati (ripetibile)")
+    parser.add_argument("--log-level", default="ERROR",
+                        help="livello di logging dei motori durante le misure (default: ERROR)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="confronta due file JSON di risultati invece di eseguire la suite")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format='[%(levelname)s] %(message)s')
+
+    if args.compare:
+        with open(args.compare[0]) as fh_old, open(args.compare[1]) as fh_new:
+            print("\n".join(compare(json.load(fh_old), json.load(fh_new))))
+    else:
+        report = run_suite(quick=args.quick, repeat=args.repeat, engines=args.engine)
+        if args.output:
+            with open(args.output, "w") as fh:
+                json.dump(report, fh, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
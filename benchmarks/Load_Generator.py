@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import random
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from Automata_core.Latency_Histogram import LatencyHistogram
+from DFA_asys.Async_Login_Server import AsyncLoginServer
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+from DFA_asys.Password_Hashing import Pbkdf2Hasher, ScryptHasher, Sha256Hasher, VerificationQueueFull
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+from benchmarks.Benchmark_Suite import ScriptedAsyncDFALogin, make_credentials, random_word
+
+SEED = 1234
+KINDS = ("valid", "invalid_user", "wrong_password")
+HASHERS = {"sha256": Sha256Hasher, "pbkdf2": lambda: Pbkdf2Hasher(iterations=20_000), "scrypt": ScryptHasher}
+
+# Una richiesta: (tipo, username, password); un target la esegue e restituisce True se autenticata,
+# oppure solleva VerificationQueueFull se il motore è saturo ("ERR busy" dal server)
+Request = Tuple[str, str, str]
+Target = Callable[[str, str], Awaitable[bool]]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'valid=0.6,invalid_user=0.2,wrong_password=0.2' -> pesi normalizzati per tipo di traffico."""
+    weights = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"Tipo di traffico sconosciuto '{kind}' (ammessi: {', '.join(KINDS)})")
+        weights[kind] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Il mix deve avere almeno un peso positivo")
+    return {kind: weights.get(kind, 0.0) / total for kind in KINDS}
+
+
+def make_requests(rng: random.Random, credentials: Dict[str, str], mix: Dict[str, float], n: int) -> List[Request]:
+    """Sequenza deterministica di richieste secondo il mix."""
+    users = list(credentials)
+    kinds = rng.choices(KINDS, weights=[mix[k] for k in KINDS], k=n)
+    requests = []
+    for kind in kinds:
+        user = rng.choice(users)
+        if kind == "valid":
+            requests.append((kind, user, credentials[user]))
+        elif kind == "invalid_user":
+            requests.append((kind, random_word(rng, len(user) + 1), random_word(rng, 8)))
+        else:
+            requests.append((kind, user, credentials[user] + "!"))
+    return requests
+
+
+# ─── Target: motori in-process o server via socket ───────────────────────────────────────────────
+
+def sync_target(credentials: Dict[str, str]) -> Target:
+    """LoginDFA eseguito inline nel loop: le richieste non si sovrappongono e si accodano."""
+    async def login(username: str, password: str) -> bool:
+        dfa = LoginDFA(credentials)
+        dfa.input_username(username)
+        dfa.input_password(password)
+        return dfa.validate()
+    return login
+
+
+def async_target(users_db: Dict[str, str], hasher) -> Target:
+    """AsyncDFALogin in-process, una istanza (sessione) per richiesta."""
+    async def login(username: str, password: str) -> bool:
+        dfa = ScriptedAsyncDFALogin(users_db, username, password)
+        dfa.hasher = hasher
+        accepted = await dfa.run(max_pass_attempts=1)
+        if dfa.outcome == "busy":
+            raise VerificationQueueFull("coda di verifica piena")
+        return accepted
+    return login
+
+
+def socket_target(host: str, port: int, path: Optional[str]) -> Target:
+    """Una connessione per richiesta verso un AsyncLoginServer (TCP o socket Unix)."""
+    async def login(username: str, password: str) -> bool:
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        try:
+            try:
+                await reader.readuntil(b": ")
+                writer.write(username.encode() + b"\n")
+                reply = await reader.readuntil(b": ")
+            except asyncio.IncompleteReadError as exc:
+                # "ERR ..." seguito dalla chiusura della sessione: login respinto (o server saturo), non un errore
+                if exc.partial.startswith(b"ERR busy"):
+                    raise VerificationQueueFull("server saturo") from exc
+                if exc.partial.startswith(b"ERR"):
+                    return False
+                raise
+            if not reply.startswith(b"Password"):
+                return False
+            writer.write(password.encode() + b"\n")
+            reply = await reader.readline()
+            if reply.startswith(b"ERR busy"):
+                raise VerificationQueueFull("server saturo")
+            return reply.startswith(b"OK")
+        finally:
+            writer.close()
+    return login
+
+
+# ─── Generatore a ciclo aperto ────────────────────────────────────────────────────────────────────
+
+async def run_open_loop(target: Target, requests: List[Request], rps: float,
+                        max_outstanding: int = 10000) -> Dict:
+    """
+    Funzione run_open_loop:
+    Obiettivo: inviare le richieste a ritmo costante (`rps`) indipendentemente dalle risposte.
+
+    La latenza di ogni richiesta è misurata dall'istante in cui *doveva* partire
+    (t0 + i / rps), non da quando è partita davvero: se l'event loop si blocca (hash lento,
+    logging sincrono) le richieste in ritardo accumulano il ritardo nella latenza, invece di
+    essere semplicemente inviate più tardi (coordinated omission).
+    Oltre `max_outstanding` richieste in corso le nuove vengono scartate e contate in `dropped`;
+    le richieste respinte per sovraccarico (VerificationQueueFull, "ERR busy") sono contate in
+    outcomes[tipo]["busy"], separate dai login respinti e dagli errori di connessione.
+    """
+    histogram = LatencyHistogram()
+    per_kind = {kind: LatencyHistogram() for kind in KINDS}
+    outcomes = {kind: {"ok": 0, "rejected": 0, "busy": 0, "errors": 0} for kind in KINDS}
+    pending: set = set()
+    dropped = 0
+
+    async def one(kind: str, username: str, password: str, intended: float) -> None:
+        try:
+            ok = await target(username, password)
+            outcomes[kind]["ok" if ok else "rejected"] += 1
+        except VerificationQueueFull:
+            outcomes[kind]["busy"] += 1
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as exc:
+            # ValueError: riga oltre il limite dello StreamReader in readline()
+            outcomes[kind]["errors"] += 1
+            logging.getLogger(__name__).debug("Richiesta fallita: %s", exc)
+        latency_us = (time.perf_counter() - intended) * 1e6
+        histogram.record(latency_us)
+        per_kind[kind].record(latency_us)
+
+    interval = 1.0 / rps
+    start = time.perf_counter()
+    for i, (kind, username, password) in enumerate(requests):
+        intended = start + i * interval
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(pending) >= max_outstanding:
+            dropped += 1
+            continue
+        task = asyncio.ensure_future(one(kind, username, password, intended))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "target_rps": rps,
+        "achieved_rps": histogram.total / elapsed if elapsed else 0.0,
+        "duration_s": elapsed,
+        "sent": len(requests) - dropped,
+        "dropped": dropped,
+        "latency_us": histogram.summary(),
+        "latency_us_by_kind": {kind: h.summary() for kind, h in per_kind.items() if h.total},
+        "outcomes": outcomes,
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    rng = random.Random(SEED)
+    credentials = make_credentials(rng, args.users, 8)
+    requests = make_requests(rng, credentials, parse_mix(args.mix), int(args.rps * args.duration))
+    hasher = HASHERS[args.hasher]()
+
+    server = None
+    if args.target == "sync":
+        target = sync_target(credentials)
+    elif args.target == "async":
+        users_db = {user: hasher.hash(pwd) for user, pwd in credentials.items()}
+        target = async_target(users_db, hasher)
+    elif args.connect:
+        host, _, port = args.connect.rpartition(":")
+        target = socket_target(host, int(port), None)
+    elif args.unix:
+        target = socket_target("", 0, args.unix)
+    else:
+        # Server avviato nello stesso processo (stesso event loop del generatore)
+        users_db = {user: hasher.hash(pwd) for user, pwd in credentials.items()}
+        server = AsyncLoginServer(AsyncDFALogin(users_db, hasher=hasher), max_pass_attempts=1)
+        srv = await server.start(port=0)
+        target = socket_target("127.0.0.1", srv.sockets[0].getsockname()[1], None)
+
+    try:
+        report = await run_open_loop(target, requests, args.rps, args.max_outstanding)
+    finally:
+        if server is not None:
+            await server.close()
+    report.update({"engine": args.target, "hasher": args.hasher, "mix": args.mix})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generatore di carico a ciclo aperto per i flussi di login")
+    parser.add_argument("--target", choices=("sync", "async", "socket"), default="async",
+                        help="LoginDFA in-process, AsyncDFALogin in-process o AsyncLoginServer via socket")
+    parser.add_argument("--connect", help="host:porta di un server già avviato (con --target socket)")
+    parser.add_argument("--unix", help="socket Unix di un server già avviato (con --target socket)")
+    parser.add_argument("--rps", type=float, default=1000.0, help="richieste al secondo da sostenere")
+    parser.add_argument("--duration", type=float, default=10.0, help="durata del test in secondi")
+    parser.add_argument("--mix", default="valid=0.6,invalid_user=0.2,wrong_password=0.2")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--hasher", choices=sorted(HASHERS), default="sha256")
+    parser.add_argument("--max-outstanding", type=int, default=10000)
+    parser.add_argument("--log-level", default="ERROR",
+                        help="livello di logging dei motori (INFO mostra il costo del logging sulla latenza)")
+    parser.add_argument("--output", help="file JSON in cui salvare il report")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format='[%(levelname)s] %(message)s')
+
+    # I motori stampano l'esito su stdout: viene scartato per non falsare le misure
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(main(args))
+    latency = result["latency_us"]
+    print(f"{result['engine']}: {result['achieved_rps']:.0f}/{result['target_rps']:.0f} req/s, "
+          f"p50={latency['p50']} us p99={latency['p99']} us p999={latency['p999']} us max={latency['max']} us, "
+          f"scartate={result['dropped']}", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+    else:
+        print(json.dumps(result, indent=2))
@@ -0,0 +1,43 @@
+"""Automata_core.Alphabet_Compression: classi di simboli equivalenti e ByteClassDFA."""
+import itertools
+
+import pytest
+
+from Automata_core.Alphabet_Compression import OTHER, compress, symbol_classes
+from NFA_asys.Regex_Compiler import compile_regex
+
+PATTERNS = ["(a|b)*abb", "a(b|c)?c+", "[a-c]{2,3}", "(ab|a)*b?", ".*c.*", "a*|b*"]
+
+
+def words(alphabet: str = "abcd", max_len: int = 5):
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+def test_symbol_classes_group_equal_signatures():
+    classes, representatives = symbol_classes("abcxyz", lambda sym: sym in "xyz")
+    assert classes == {"a": 1, "b": 1, "c": 1, "x": 2, "y": 2, "z": 2}
+    assert representatives == ["a", "x"]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_byte_class_dfa_agrees_with_table(pattern):
+    minimal = compile_regex(pattern).to_dfa()
+    byte_class = compress(minimal)
+    assert byte_class.n_classes <= minimal.width
+    for word in words():
+        expected = minimal.run(word)
+        assert byte_class.run(word) is expected, word
+        assert byte_class.run_bytes(word.encode()) is expected, word
+
+
+def test_character_ranges_collapse_into_few_classes():
+    dfa = compile_regex("[a-z0-9]+@[a-z]+").to_dfa()
+    byte_class = compress(dfa)
+    # lettere, cifre, '@' e OTHER: la tabella passa da 38 colonne (37 simboli + OTHER) a 4
+    assert byte_class.n_classes == 4
+    assert byte_class.classify("q") == byte_class.classify("k") != byte_class.classify("7")
+    assert byte_class.classify("è") == OTHER
+    assert byte_class.nbytes() < len(dfa.table) * dfa.table.itemsize
+    assert byte_class.run("bob42@example") and not byte_class.run("bob@42")
@@ -0,0 +1,88 @@
+"""DFA_asys.Async_Login_Server: protocollo a righe, limiti di sessione, timeout e limiter per host."""
+import asyncio
+import hashlib
+
+from Automata_core.Attempt_Limiter import AttemptLimiter
+from DFA_asys.Async_Login_Server import AsyncLoginServer
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+
+USERS_DB = {"alice": hashlib.sha256(b"wonderland").hexdigest()}
+
+
+def with_server(scenario, limiter=None, **options):
+    """Avvia un server su una porta libera, esegue scenario(port, server) e chiude il server."""
+    server = AsyncLoginServer(AsyncDFALogin(USERS_DB, limiter=limiter), **options)
+
+    async def main():
+        srv = await server.start(port=0)
+        try:
+            return await scenario(srv.sockets[0].getsockname()[1], server)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+async def login(port: int, username: str, *passwords: str) -> bytes:
+    """Esegue una sessione e restituisce tutto ciò che il server ha scritto fino alla chiusura."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(username.encode() + b"\n" + b"".join(p.encode() + b"\n" for p in passwords))
+    reply = await reader.read()
+    writer.close()
+    return reply
+
+
+def test_login_retry_and_unknown_user():
+    async def scenario(port, _):
+        return (await login(port, "alice", "wonderland"), await login(port, "alice", "x", "wonderland"),
+                await login(port, "mallory"))
+
+    ok, retry, unknown = with_server(scenario)
+    assert ok == b"Username: Password: OK Benvenuto, alice!\n"
+    assert retry == b"Username: Password: RETRY Password errata, riprova.\nPassword: OK Benvenuto, alice!\n"
+    assert unknown == b"Username: ERR Utente non riconosciuto.\n"
+
+
+def test_attempts_exhausted_and_host_lockout():
+    limiter = AttemptLimiter(max_attempts=2, window=60.0, lockout=60.0)
+
+    async def scenario(port, _):
+        return await login(port, "alice", "x", "y"), await login(port, "alice", "wonderland")
+
+    exhausted, locked = with_server(scenario, limiter=limiter, max_pass_attempts=3)
+    assert exhausted.endswith(b"ERR Numero tentativi esaurito. Accesso negato.\n")
+    assert locked == "Username: ERR Troppi tentativi falliti, riprova più tardi.\n".encode()
+
+
+def test_sessions_over_limit_receive_busy():
+    async def scenario(port, server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        assert await reader.readuntil(b": ") == b"Username: "     # prima sessione aperta e in attesa
+        busy_reader, busy_writer = await asyncio.open_connection("127.0.0.1", port)
+        busy = await busy_reader.read()
+        busy_writer.close()
+        assert server.active_sessions == 1
+        writer.close()
+        await reader.read()                                      # fine della prima sessione
+        return busy
+
+    assert with_server(scenario, max_sessions=1) == b"ERR busy\n"
+
+
+def test_idle_session_times_out():
+    async def scenario(port, _):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        reply = await reader.read()
+        writer.close()
+        return reply
+
+    assert with_server(scenario, idle_timeout=0.05) == b"Username: ERR timeout\n"
+
+
+def test_line_over_max_line_closes_session():
+    async def scenario(port, server):
+        reply = await login(port, "a" * 200)
+        return reply, server.active_sessions
+
+    reply, active = with_server(scenario, max_line=64)
+    assert reply == b"Username: " and active == 0
@@ -0,0 +1,75 @@
+"""Automata_core.Attempt_Limiter: finestra scorrevole, blocco, memoria limitata e backend condiviso."""
+import uuid
+
+from Automata_core.Attempt_Limiter import AttemptLimiter, client_key, user_key
+
+
+class Clock:
+    """Orologio manuale per i test delle finestre."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lockout_after_max_attempts_and_expiry():
+    clock = Clock()
+    limiter = AttemptLimiter(max_attempts=3, window=60.0, lockout=30.0, clock=clock)
+    key = user_key("alice")
+    assert [limiter.record_failure(key) for _ in range(3)] == [False, False, True]
+    assert limiter.is_locked(key) and limiter.retry_after(key) == 30.0
+    assert not limiter.is_locked(client_key("alice"))          # chiavi utente e client distinte
+    limiter.record_success(key)                                # non sblocca una chiave bloccata
+    assert limiter.is_locked(key)
+    clock.now += 31.0
+    assert not limiter.is_locked(key)
+
+
+def test_sliding_window_weights_previous_window():
+    clock = Clock(0.0)
+    limiter = AttemptLimiter(max_attempts=10, window=60.0, clock=clock)
+    key = user_key("bob")
+    for _ in range(4):
+        limiter.record_failure(key)
+    clock.now = 90.0                                           # metà della finestra successiva
+    assert limiter.attempts(key) == 2.0
+    clock.now = 200.0                                          # due finestre dopo: contatore scaduto
+    assert limiter.attempts(key) == 0.0
+
+
+def test_success_resets_counter():
+    limiter = AttemptLimiter(max_attempts=2, clock=Clock())
+    key = user_key("carol")
+    limiter.record_failure(key)
+    limiter.record_success(key)
+    assert limiter.attempts(key) == 0.0
+    assert limiter.record_failure(key) is False
+
+
+def test_memory_is_bounded_and_locked_keys_survive_eviction():
+    clock = Clock()
+    limiter = AttemptLimiter(max_attempts=2, capacity=32, shards=4, max_probe=4, clock=clock)
+    victim = user_key("mallory")
+    limiter.record_failure(victim)
+    limiter.record_failure(victim)
+    for i in range(5000):
+        limiter.record_failure(client_key(f"10.0.{i // 256}.{i % 256}"))
+    assert limiter.capacity == 32
+    assert limiter.is_locked(victim)
+
+
+def test_shared_memory_backend_is_visible_by_name():
+    name = f"limiter-{uuid.uuid4().hex[:12]}"
+    owner = AttemptLimiter(max_attempts=2, capacity=64, shards=2, shared_name=name)
+    try:
+        peer = AttemptLimiter(max_attempts=2, capacity=64, shards=2, shared_name=name, create=False)
+        peer.share_locks(owner._locks)
+        owner.record_failure(user_key("dave"))
+        assert peer.record_failure(user_key("dave")) is True
+        assert owner.is_locked(user_key("dave"))
+        peer.close()
+    finally:
+        owner.close()
+        owner.unlink()
@@ -0,0 +1,62 @@
+"""AuditJournal / AuditReader: scrittura con group commit, rotazione dei segmenti e interrogazione."""
+import threading
+
+from Automata_core.Audit_Journal import AuditJournal, AuditReader, list_segments
+
+
+def test_records_are_read_back_in_order(tmp_path):
+    directory = str(tmp_path)
+    with AuditJournal(directory, sync=False) as journal:
+        assert journal.record("alice", "dfa-sync", "validate", True)
+        assert journal.record("bob", "dfa-async", "validate", False)
+        assert journal.record("alice", "server", "lockout", False)
+    records = list(AuditReader(directory))
+    assert [(r.user, r.engine, r.event, r.outcome) for r in records] == [
+        ("alice", "dfa-sync", "validate", "success"),
+        ("bob", "dfa-async", "validate", "failure"),
+        ("alice", "server", "lockout", "failure"),
+    ]
+    assert journal.written == 3 and journal.dropped == 0
+
+
+def test_query_by_user_and_time_across_segments(tmp_path):
+    directory = str(tmp_path)
+    clock = iter(range(1, 10 ** 6)).__next__
+    with AuditJournal(directory, sync=False, segment_bytes=256, clock=lambda: clock() * 1_000_000_000) as journal:
+        for i in range(40):
+            journal.record("alice" if i % 2 else "bob", "nfa-sync", "validate", i % 3 == 0)
+            journal.flush()          # un commit per record: più segmenti
+    assert len(list_segments(directory)) > 1
+    reader = AuditReader(directory)
+    assert reader.count() == 40
+    alice = list(reader.query(user="alice"))
+    assert len(alice) == 20 and all(r.user == "alice" for r in alice)
+    window = list(reader.query(start=10, end=20))
+    assert [r.timestamp for r in window] == list(range(10, 20))
+
+
+def test_record_after_close_is_dropped(tmp_path):
+    journal = AuditJournal(str(tmp_path), sync=False)
+    journal.close()
+    assert journal.record("alice", "dfa-sync", "validate", True) is False
+    assert journal.dropped == 1
+    assert journal.flush(timeout=1.0) is True
+    assert AuditReader(str(tmp_path)).count() == 0
+
+
+def test_concurrent_records_are_group_committed(tmp_path):
+    directory = str(tmp_path)
+    with AuditJournal(directory, sync=True) as journal:
+        threads = [threading.Thread(target=lambda t=t: [journal.record(f"user{t}", "server", "validate", True)
+                                                        for _ in range(500)]) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert journal.flush(timeout=10.0)
+    assert journal.written == 2000
+    assert journal.commits < journal.written              # più record per ogni commit (e fsync)
+    with AuditJournal(directory, sync=False) as reopened:   # una nuova apertura inizia un nuovo segmento
+        reopened.record("alice", "dfa-sync", "validate", False)
+    assert len(list_segments(directory)) == 2
+    assert AuditReader(directory).count() == 2001
@@ -0,0 +1,52 @@
+"""Automata_core.Automaton_Serialization: formato binario dei DFA compilati e caricamento con mmap."""
+import itertools
+import os
+import pickle
+
+import pytest
+
+from Automata_core.Automaton_Serialization import load_dfa, save_automaton, save_dfa
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+from NFA_asys.Regex_Compiler import compile_regex
+
+
+def words(alphabet: str, max_len: int = 6):
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+def test_saved_dfa_round_trip(tmp_path):
+    dfa = compile_regex("(a|b)*abb").to_dfa()
+    path = str(tmp_path / "abb.dfa")
+    save_dfa(dfa, path)
+    loaded = load_dfa(path)
+    assert (loaded.alphabet, loaded.n_states, loaded.start, loaded.dead) == \
+           (dfa.alphabet, dfa.n_states, dfa.start, dfa.dead)
+    for word in words("abc"):
+        assert loaded.run(word) is dfa.run(word), word
+    # il DFA mappato si può inviare ai processi figli
+    assert pickle.loads(pickle.dumps(loaded)).run("aabb") is True
+
+
+def test_save_automaton_accepts_engines(tmp_path):
+    path = str(tmp_path / "login.dfa")
+    saved = save_automaton(LoginDFA({}), path)
+    loaded = load_dfa(path)
+    trace = ["input_username", "input_password", "auth_success"]
+    assert loaded.run(trace) is saved.run(trace) is True
+
+
+@pytest.mark.parametrize("cut", [1, 40, 200])
+def test_truncated_or_foreign_files_are_rejected(tmp_path, cut):
+    path = str(tmp_path / "abb.dfa")
+    save_dfa(compile_regex("(a|b)*abb").to_dfa(), path)
+    size = os.path.getsize(path)
+    with open(path, "r+b") as fh:
+        fh.truncate(max(size - cut, 0))
+    with pytest.raises(ValueError):
+        load_dfa(path)
+    foreign = tmp_path / "foreign.dfa"
+    foreign.write_bytes(b"x" * 128)
+    with pytest.raises(ValueError):
+        load_dfa(str(foreign))
@@ -0,0 +1,48 @@
+"""Automata_core.Automaton_Spec: formato dict/JSON e compilazione in TableAutomaton."""
+import json
+
+import pytest
+
+from Automata_core.Automaton_Spec import AutomatonSpec
+from DFA_asys.Deterministic_Finite_Automaton_Asys import ASYNC_LOGIN_SPEC
+
+
+def test_unreachable_error_and_accept_states_are_interned():
+    spec = AutomatonSpec.from_dict({"start": "A", "error": "E", "accept": ["A", "Z"],
+                                    "transitions": {"A": {"e": "A"}}})
+    automaton = spec.compile()
+    e = automaton.event_id("e")
+    assert automaton.names[automaton.error] == "E"
+    assert automaton.step(automaton.start, e) == automaton.start
+    assert automaton.step(automaton.state_id("Z"), e) == automaton.error
+    assert not automaton.is_accepting(automaton.error)
+    assert automaton.is_accepting(automaton.state_id("Z"))
+
+
+def test_undefined_pairs_go_to_error_and_unknown_events_to_dead():
+    automaton = ASYNC_LOGIN_SPEC.compile()
+    start = automaton.start
+    assert automaton.step(start, automaton.event_id("valid_pass")) == automaton.error
+    assert automaton.event_id("reboot") == 0
+    assert automaton.step(start, automaton.event_id("reboot")) == automaton.dead
+    with pytest.raises(ValueError):
+        automaton.resolve("input_user", "reboot")
+
+
+def test_dict_round_trip_and_json_load(tmp_path):
+    path = tmp_path / "login.json"
+    path.write_text(json.dumps(ASYNC_LOGIN_SPEC.to_dict()))
+    spec = AutomatonSpec.load(str(path))
+    assert spec.to_dict() == ASYNC_LOGIN_SPEC.to_dict()
+    assert spec.compile().names == ASYNC_LOGIN_SPEC.compile().names
+
+
+@pytest.mark.parametrize("data", [
+    {"transitions": {}},
+    {"start": "A", "transitions": []},
+    {"start": "A", "transitions": {"A": {"e": 1}}},
+    {"start": "A", "transitions": {}, "final": ["A"]},
+])
+def test_from_dict_rejects_malformed_specs(data):
+    with pytest.raises(ValueError):
+        AutomatonSpec.from_dict(data)
@@ -0,0 +1,94 @@
+"""
+Automata_core.Batch_Evaluation e i run_batch dei motori: la valutazione vettoriale NumPy
+concorda con l'esecuzione passo-passo.
+"""
+import asyncio
+import hashlib
+import random
+
+import pytest
+
+from Automata_core.Batch_Evaluation import encode_sequences, run_batch
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+from NFA_sys.No_Deterministic_Finite_Automaton_Sys import build_login_nfa
+
+USERS = {"alice": "wonderland", "bob": "builder"}
+HASHED = {user: hashlib.sha256(pwd.encode()).hexdigest() for user, pwd in USERS.items()}
+
+
+class ScriptedLogin(AsyncDFALogin):
+    """AsyncDFALogin che legge username e password da liste invece che da stdin, registrando la traccia."""
+
+    def __init__(self, users_db, username, passwords, **kwargs):
+        super().__init__(users_db, **kwargs)
+        self._username = username
+        self._passwords = list(passwords)
+        self.trace = ["input_user"]
+
+    async def read_username(self) -> str:
+        return self._username
+
+    async def read_password(self) -> str:
+        return self._passwords.pop(0)
+
+    async def validate_user(self, username: str) -> bool:
+        valid = await super().validate_user(username)
+        self.trace += ["valid_user", "input_pass"] if valid else ["invalid_user"]
+        return valid
+
+    async def validate_password(self, username: str, password: str) -> bool:
+        valid = await super().validate_password(username, password)
+        self.trace.append("valid_pass" if valid else "invalid_pass")
+        if not valid and self._passwords:
+            self.trace.append("input_pass")
+        return valid
+
+
+def test_run_batch_matches_run_on_random_words():
+    dfa = build_login_nfa().compile()
+    rng = random.Random(7)
+    words = ["".join(rng.choice("uxpyzq") for _ in range(rng.randrange(6))) for _ in range(500)]
+    assert [bool(x) for x in run_batch(dfa, words)] == [dfa.run(word) for word in words]
+    # stesso esito con sequenze di simboli invece che stringhe (codifica non vettoriale)
+    assert [bool(x) for x in run_batch(dfa, [list(word) for word in words])] == [dfa.run(word) for word in words]
+
+
+def test_encode_sequences_pads_with_width():
+    dfa = build_login_nfa().compile()
+    matrix, lengths = encode_sequences(dfa, ["up", "", "q"])
+    assert list(lengths) == [2, 0, 1]
+    assert matrix.shape == (3, 2)
+    assert list(matrix[1]) == [dfa.width, dfa.width]
+    assert matrix[2, 0] == 0                               # simbolo fuori alfabeto: colonna 0
+
+
+@pytest.mark.parametrize("passwords", [("wonderland",), ("bad", "wonderland"), ("bad", "bad", "wonderland"),
+                                       ("bad", "bad", "bad")])
+def test_async_run_batch_matches_run(passwords):
+    login = ScriptedLogin(HASHED, "alice", passwords)
+    accepted = asyncio.run(login.run(max_pass_attempts=3))
+    assert bool(login.run_batch([login.trace], max_pass_attempts=3)[0]) is accepted
+    assert accepted is ("wonderland" in passwords)
+
+
+def test_async_run_batch_applies_max_pass_attempts():
+    login = AsyncDFALogin(HASHED)
+    fourth_try = ["input_user", "valid_user", "input_pass"] + ["invalid_pass", "input_pass"] * 3 + ["valid_pass"]
+    traces = [
+        ["input_user", "invalid_user"],
+        ["input_user", "valid_user", "input_pass"] + ["invalid_pass", "input_pass"] * 2 + ["invalid_pass"],
+        ["input_user", "valid_user", "input_pass", "invalid_pass", "input_pass", "valid_pass"],
+        fourth_try,
+    ]
+    assert [bool(x) for x in login.run_batch(traces)] == [False, False, True, False]
+    assert [bool(x) for x in login.run_batch(traces, max_pass_attempts=4)] == [False, False, True, True]
+    assert [bool(x) for x in login.run_batch(traces, max_pass_attempts=None)] == [False, False, True, True]
+
+
+def test_login_dfa_run_batch_matches_methods():
+    traces = [["input_username", "input_password", "auth_success"],
+              ["input_username", "input_password", "auth_failure"],
+              ["input_username", "input_password", "auth_failure", "input_username", "input_password", "auth_success"],
+              ["input_password", "auth_success"]]
+    assert [bool(x) for x in LoginDFA(dict(USERS)).run_batch(traces)] == [True, False, True, False]
@@ -0,0 +1,46 @@
+"""Automata_core.Compact_No_Deterministic_Finite_Automaton: NFA in formato CSR contro NFA_asys.NFA."""
+import asyncio
+import itertools
+
+import pytest
+
+from Automata_core.Compact_No_Deterministic_Finite_Automaton import CompactNFABuilder, from_nfa
+from NFA_asys.Regex_Compiler import compile_regex
+
+PATTERNS = ["(a|b)*abb", "a(b|c)?c+", "(ab|a)*b?", "a*|b*"]
+
+
+def words(alphabet: str = "abc", max_len: int = 5):
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_compact_nfa_matches_state_graph(pattern):
+    nfa = compile_regex(pattern)
+    compact = from_nfa(nfa)
+    dfa = compact.to_dfa()
+    reference = nfa.to_dfa()
+    for word in words():
+        expected = reference.run(word)
+        assert compact.run(word) is expected, word
+        assert dfa.run(word) is expected, word
+    for word in ("", "abb", "acc", "abab"):
+        assert asyncio.run(nfa.run(word)) is compact.run(word)
+
+
+def test_builder_csr_layout_and_epsilon_closure():
+    builder = CompactNFABuilder()
+    s0, s1, s2 = builder.add_state(), builder.add_state(), builder.add_state(accept=True)
+    builder.add_transition(s0, "a", s1)
+    builder.add_transition(s0, "a", s2)
+    builder.add_epsilon(s1, s2)
+    builder.add_transition(s2, "b", s0)
+    compact = builder.build()
+    assert (compact.n_states, compact.n_edges) == (3, 4)
+    assert sorted(compact.edges(s0)) == [("a", s1), ("a", s2)]
+    assert compact.epsilon_closure([s1]) == {s1, s2}
+    assert compact.step({s0}, "a") == {s1, s2}
+    assert compact.run("a") and compact.run("aba") and not compact.run("ab")
+    assert compact.nbytes() > 0
@@ -0,0 +1,64 @@
+"""
+NFA_sys.NFA.to_dfa / compile: la subset construction, con e senza minimizzazione di Hopcroft,
+riconosce lo stesso linguaggio della simulazione passo-passo dell'NFA.
+"""
+import itertools
+
+import pytest
+
+from NFA_sys.No_Deterministic_Finite_Automaton_Sys import NFA, build_login_nfa
+
+
+def simulate(nfa: NFA, word: str) -> bool:
+    """Esito della simulazione dell'NFA con step() (il riferimento per il DFA compilato)."""
+    nfa.reset()
+    for idx, symbol in enumerate(word, start=1):
+        nfa.step(symbol, idx)
+    return nfa.accepts()
+
+
+def ends_with_abb() -> NFA:
+    """NFA non deterministico per le stringhe su {a, b} che terminano con 'abb'."""
+    return NFA({'q0', 'q1', 'q2', 'q3'}, {'a', 'b'},
+               {('q0', 'a'): {'q0', 'q1'}, ('q0', 'b'): {'q0'}, ('q1', 'b'): {'q2'}, ('q2', 'b'): {'q3'}},
+               'q0', {'q3'})
+
+
+def redundant_branches() -> NFA:
+    """'aa' oppure 'ba' su rami distinti: i due rami sono equivalenti e la minimizzazione li fonde."""
+    return NFA({'s', 'x1', 'x2', 'y1', 'y2'}, {'a', 'b'},
+               {('s', 'a'): {'x1'}, ('s', 'b'): {'y1'}, ('x1', 'a'): {'x2'}, ('y1', 'a'): {'y2'}},
+               's', {'x2', 'y2'})
+
+
+def words(alphabet: str, max_len: int):
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+@pytest.mark.parametrize("build,alphabet", [(ends_with_abb, "abc"), (redundant_branches, "abc"),
+                                            (build_login_nfa, "uxpyz")])
+def test_to_dfa_matches_step_simulation(build, alphabet):
+    nfa = build()
+    full, minimal = nfa.to_dfa(minimized=False), nfa.to_dfa()
+    assert minimal.n_states <= full.n_states
+    for word in words(alphabet, 6 if len(alphabet) == 3 else 4):
+        expected = simulate(nfa, word)
+        assert full.run(word) is expected, word
+        assert minimal.run(word) is expected, word
+
+
+def test_minimization_merges_equivalent_states():
+    full, minimal = redundant_branches().to_dfa(minimized=False), redundant_branches().to_dfa()
+    # subset construction: s, {x1}, {y1}, {x2}, {y2} e lo stato pozzo; minimizzato: s, un ramo, accettazione, pozzo
+    assert (full.n_states, minimal.n_states) == (6, 4)
+
+
+def test_compile_is_cached_and_integer_indexed():
+    nfa = ends_with_abb()
+    dfa = nfa.compile()
+    assert nfa.compile() is dfa
+    assert dfa.table.typecode == 'i'
+    assert len(dfa.table) == dfa.n_states * dfa.width
+    assert dfa.step(dfa.start, 'z') == dfa.dead      # simbolo fuori alfabeto: colonna 0, stato pozzo
@@ -0,0 +1,50 @@
+"""Automata_core.Credential_Store: indice mmap delle credenziali costruito da un CSV."""
+import pytest
+
+from Automata_core.Credential_Store import MmapCredentialStore, build_index
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+
+USERS = {f"user{i:04d}": f"hash{i * 7919:x}" for i in range(3000)}
+
+
+def write_csv(path, rows, header=False):
+    lines = (["username,password_hash"] if header else []) + [f"{user},{value}" for user, value in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_round_trip_matches_dict(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    write_csv(csv_path, USERS.items(), header=True)
+    with build_index(str(csv_path), str(tmp_path / "users.idx"), skip_header=True) as store:
+        assert len(store) == len(USERS)
+        assert dict(store) == USERS
+        assert "user0000" in store and "nobody" not in store and 42 not in store
+        assert store.get("nobody") is None
+        with pytest.raises(KeyError):
+            store["nobody"]
+    with MmapCredentialStore(str(tmp_path / "users.idx")) as reopened:
+        assert reopened["user2999"] == USERS["user2999"]
+
+
+def test_duplicate_usernames_keep_last_row(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    write_csv(csv_path, [("alice", "old"), ("bob", "builder"), ("alice", "wonderland")])
+    with build_index(str(csv_path), str(tmp_path / "users.idx")) as store:
+        assert dict(store) == {"alice": "wonderland", "bob": "builder"}
+        dfa = LoginDFA(store)
+        dfa.input_username("alice")
+        dfa.input_password("wonderland")
+        assert dfa.validate() is True
+
+
+def test_invalid_parameters_and_files(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    write_csv(csv_path, [("alice", "wonderland")])
+    with pytest.raises(ValueError):
+        build_index(str(csv_path), str(tmp_path / "a.idx"), load_factor=1.0)
+    with pytest.raises(ValueError):
+        build_index(str(csv_path), str(tmp_path / "b.idx"), key_width=2)
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        MmapCredentialStore(str(bogus))
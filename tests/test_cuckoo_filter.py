@@ -0,0 +1,64 @@
+"""CuckooFilter: inserimento, rimozione, salvataggio e riapertura via mmap (anche in scrittura)."""
+import pytest
+
+from Automata_core.Cuckoo_Filter import CuckooFilter, build_filter
+
+USERNAMES = [f"user{i:05d}" for i in range(2000)]
+
+
+def test_add_contains_remove():
+    cf = CuckooFilter(capacity=len(USERNAMES), fpr=0.001)
+    for name in USERNAMES:
+        cf.add(name)
+    assert len(cf) == len(USERNAMES)
+    assert all(name in cf for name in USERNAMES)       # nessun falso negativo
+    false_positives = sum(f"other{i}" in cf for i in range(10000))
+    assert false_positives <= 10000 * cf.false_positive_rate * 3 + 5
+    assert cf.remove("user00000") is True
+    assert cf.remove("user00000") is False
+    assert len(cf) == len(USERNAMES) - 1
+    assert all(name in cf for name in USERNAMES[1:])
+
+
+def test_save_and_open(tmp_path):
+    path = str(tmp_path / "users.cf")
+    cf = build_filter(USERNAMES)
+    cf.save(path)
+    with CuckooFilter.open(path) as opened:
+        assert len(opened) == len(cf)
+        assert all(name in opened for name in USERNAMES)
+        assert [f"other{i}" in opened for i in range(1000)] == [f"other{i}" in cf for i in range(1000)]
+
+
+def test_writable_open_persists_on_close(tmp_path):
+    path = str(tmp_path / "users.cf")
+    CuckooFilter(capacity=100).save(path)
+    writable = CuckooFilter.open(path, writable=True)
+    writable.add("alice")
+    writable.add("bob")
+    writable.remove("bob")
+    writable.close()                 # close() esegue flush(): header aggiornato senza chiamarlo a mano
+    with CuckooFilter.open(path) as reopened:
+        assert len(reopened) == 1
+        assert "alice" in reopened
+
+
+def test_open_rejects_truncated_file(tmp_path):
+    path = str(tmp_path / "users.cf")
+    build_filter(USERNAMES[:10]).save(path)
+    with open(path, "r+b") as fh:
+        fh.truncate(100)
+    with pytest.raises(ValueError):
+        CuckooFilter.open(path)
+
+
+@pytest.mark.parametrize("name", ["dfa-sync", "dfa-async", "nfa-sync", "nfa-async"])
+def test_filter_front_rejects_unknown_users_on_every_engine(name, tmp_path):
+    from Automata_core.Engine_Registry import get_engine
+
+    path = str(tmp_path / "users.cf")
+    build_filter(["alice"]).save(path)
+    with CuckooFilter.open(path) as user_filter:
+        engine = get_engine(name, user_filter=user_filter)
+        assert engine.validate("alice", "wonderland") is True
+        assert engine.validate("bob", "builder") is False      # presente nell'archivio, assente dal filtro
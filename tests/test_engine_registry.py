@@ -0,0 +1,82 @@
+"""Registro dei motori e punto di ingresso `python -m Automata_core`: stesse regole per i quattro motori."""
+import subprocess
+import sys
+
+import pytest
+
+from Automata_core.Attempt_Limiter import AttemptLimiter
+from Automata_core.Audit_Journal import AuditJournal, AuditReader
+from Automata_core.Engine_Registry import LoginEngine, ServerEngine, available_engines, get_engine
+from Automata_core.Metrics import run_counter
+from Automata_core.__main__ import main
+
+ENGINE_NAMES = ["dfa-async", "dfa-sync", "nfa-async", "nfa-sync"]
+
+
+def runs(engine: str) -> float:
+    return sum(run_counter.value(engine, result) for result in ("accepted", "rejected", "locked"))
+
+
+def test_registry_lists_engines_and_rejects_unknown_names():
+    assert available_engines() == ENGINE_NAMES
+    with pytest.raises(ValueError):
+        get_engine("dfa-quantum")
+    with pytest.raises(TypeError):
+        LoginEngine({})
+
+
+@pytest.mark.parametrize("name", ENGINE_NAMES)
+def test_validate_counts_one_run_per_attempt(name):
+    engine = get_engine(name)
+    before = runs(name)
+    assert engine.validate_many([("alice", "wonderland"), ("alice", "x"), ("mallory", "x")]) == [True, False, False]
+    assert runs(name) - before == 3
+
+
+@pytest.mark.parametrize("name", ENGINE_NAMES)
+def test_limiter_locks_user_on_every_engine(name, tmp_path):
+    limiter = AttemptLimiter(max_attempts=1, window=60.0, lockout=60.0)
+    with AuditJournal(str(tmp_path), sync=False) as audit:
+        engine = get_engine(name, limiter=limiter, audit=audit)
+        outcomes = [engine.validate("alice", password, client_id="10.0.0.1")
+                    for password in ("x", "x", "wonderland")]
+    assert outcomes == [False, False, False]
+    assert [r.event for r in AuditReader(str(tmp_path))][-1] == "lockout"
+
+
+@pytest.mark.parametrize("name", ENGINE_NAMES)
+def test_user_filter_rejects_without_store_lookup(name):
+    engine = get_engine(name, user_filter={"bob"})
+    assert engine.validate("alice", "wonderland") is False
+    assert engine.validate("bob", "builder") is True
+
+
+def test_serve_rejects_engines_without_server_mode():
+    with pytest.raises(ValueError):
+        get_engine("nfa-sync").serve()
+    assert isinstance(get_engine("dfa-async"), ServerEngine)
+
+
+@pytest.mark.parametrize("name", ENGINE_NAMES)
+def test_cli_batch_applies_max_failures(name, tmp_path, capsys):
+    attempts = tmp_path / "attempts.csv"
+    attempts.write_text("alice,x\nalice,x\nalice,wonderland\nbob,builder\n")
+    assert main([name, "--mode", "batch", "--input", str(attempts), "--max-failures", "1"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == ["alice\tFAIL", "alice\tFAIL", "alice\tFAIL", "bob\tOK"]
+
+
+def test_cli_list(capsys):
+    assert main(["--list"]) == 0
+    out = capsys.readouterr().out
+    assert all(name in out for name in ENGINE_NAMES)
+
+
+def test_engines_do_not_import_optional_dependencies():
+    probe = ("import sys\n"
+             "from Automata_core.Engine_Registry import available_engines, get_engine\n"
+             "for name in available_engines(): get_engine(name)\n"
+             "optional = ('Audit_Journal', 'Cuckoo_Filter', 'Credential_Store', 'Attempt_Limiter', 'process')\n"
+             "print([m for m in sys.modules if m.rsplit('.', 1)[-1] in optional])\n")
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,53 @@
+"""Automata_core.Log_Scanner: scansione a righe di buffer e file con un DFA compilato."""
+import pytest
+
+from Automata_core.Alphabet_Compression import compress
+from Automata_core.Compiled_Deterministic_Finite_Automaton import compile_table
+from Automata_core.Log_Scanner import scan_buffer, scan_file, scan_file_parallel, split_chunks
+from NFA_asys.No_Deterministic_Finite_Automaton_Asys import build_nfa_for_string
+
+LOG = b"login ok\r\nlogin failed\nlogin ok\n\nlogin ok extra\nlogout\nlogin ok"
+
+
+def starts(matches):
+    return [LOG[a:b] for a, b in matches]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1 << 20])
+def test_line_and_prefix_modes(block_size):
+    dfa = build_nfa_for_string("login ok").compile()
+    lines = list(scan_buffer(dfa, LOG, block_size=block_size))
+    prefixes = list(scan_buffer(dfa, LOG, mode="prefix", block_size=block_size))
+    assert starts(lines) == [b"login ok"] * 3                    # '\r' finale escluso, riga finale senza '\n'
+    assert [a for a, _ in lines] == [0, 23, 55]
+    assert starts(prefixes) == [b"login ok"] * 4
+
+
+def test_start_end_window_and_file_scan(tmp_path):
+    dfa = build_nfa_for_string("logout").compile()
+    offset = LOG.index(b"logout")
+    assert list(scan_buffer(dfa, LOG, offset, offset + 7)) == [(offset, offset + 6)]
+    path = tmp_path / "app.log"
+    path.write_bytes(LOG)
+    assert list(scan_file(str(path), dfa)) == [(offset, offset + 6)]
+    empty = tmp_path / "empty.log"
+    empty.write_bytes(b"")
+    assert list(scan_file(str(empty), dfa)) == []
+
+
+def test_parallel_scan_matches_sequential(tmp_path):
+    path = tmp_path / "big.log"
+    path.write_bytes(LOG * 50 + b"\n")
+    nfa = build_nfa_for_string("login ok")
+    chunks = split_chunks(str(path), 4)
+    assert chunks[0][0] == 0 and chunks[-1][1] == path.stat().st_size
+    assert scan_file_parallel(str(path), nfa, workers=4) == list(scan_file(str(path), nfa))
+
+
+def test_more_than_256_classes_fall_back_to_class_map():
+    # un successore diverso per ogni simbolo: 300 colonne distinte, quindi più di 256 classi
+    symbols = [chr(i) for i in range(300)]
+    dfa = compile_table({("s", symbol): i for i, symbol in enumerate(symbols)}, "s", set(range(300)))
+    classes = compress(dfa)
+    assert classes.n_classes > 256
+    assert list(scan_buffer(dfa, b"A\nAB\n\xff\n", classes=classes)) == [(0, 1), (5, 6)]
@@ -0,0 +1,94 @@
+"""DFA_sys.Login_Session_Store: sessioni a slot con free list, scadenza e parità con LoginDFA."""
+import pytest
+
+from Automata_core.Attempt_Limiter import AttemptLimiter
+from Automata_core.Audit_Journal import AuditJournal, AuditReader
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA, State
+from DFA_sys.Login_Session_Store import LoginSessionStore, SessionStoreFull
+
+USERS = {"alice": "wonderland", "bob": "builder"}
+ATTEMPTS = [("alice", "wonderland"), ("alice", "wrong"), ("bob", "builder"), ("carol", "wonderland"), ("", "")]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_slots_are_reused_and_stale_ids_rejected():
+    store = LoginSessionStore(USERS, initial_capacity=2, max_sessions=3)
+    first = store.open()
+    store.close(first)
+    second = store.open()
+    assert first & 0xFFFFFFFF == second & 0xFFFFFFFF and first != second
+    with pytest.raises(KeyError):
+        store.input_username(first, "alice")           # id della sessione chiusa: generazione diversa
+    store.open()
+    store.open()                                       # la capacità cresce fino a max_sessions
+    assert store.capacity == 3 and len(store) == 3
+    with pytest.raises(SessionStoreFull):
+        store.open()
+
+
+def test_idle_sessions_expire():
+    clock = Clock()
+    store = LoginSessionStore(USERS, idle_timeout=10.0, initial_capacity=4, max_sessions=4, clock=clock)
+    sessions = [store.open() for _ in range(4)]
+    clock.now = 5.0
+    store.input_username(sessions[0], "alice")         # attività: la sessione resta aperta
+    clock.now = 12.0
+    assert store.evict_idle() == 3
+    assert store.state(sessions[0]) is State.USERNAME_ENTERED
+    with pytest.raises(KeyError):
+        store.state(sessions[1])
+    clock.now = 30.0
+    store.open()                                       # nessuno slot libero oltre i 3: scade sessions[0]
+    with pytest.raises(KeyError):
+        store.state(sessions[0])
+
+
+def test_unexpected_events_raise_like_login_dfa():
+    store = LoginSessionStore(USERS)
+    sid = store.open()
+    with pytest.raises(ValueError):
+        store.input_password(sid, "wonderland")
+    with pytest.raises(ValueError):
+        store.validate(sid)
+
+
+def sync_login(username: str, password: str, **kwargs) -> bool:
+    dfa = LoginDFA(dict(USERS), **kwargs)
+    dfa.input_username(username)
+    dfa.input_password(password)
+    return dfa.validate()
+
+
+def test_session_store_matches_login_dfa_with_limiter_audit_and_filter(tmp_path):
+    user_filter = {"alice", "carol"}        # bob assente dal filtro: respinto senza consultare l'archivio
+    attempts = ATTEMPTS + [("carol", "x")] * 3 + [("alice", "wonderland")]
+    results = {}
+    for name in ("dfa", "store"):
+        limiter = AttemptLimiter(max_attempts=2, window=60.0, lockout=60.0)
+        directory = str(tmp_path / name)
+        with AuditJournal(directory, sync=False) as audit:
+            if name == "dfa":
+                outcomes = [sync_login(u, p, limiter=limiter, audit=audit, user_filter=user_filter)
+                            for u, p in attempts]
+            else:
+                store = LoginSessionStore(dict(USERS), limiter=limiter, audit=audit, user_filter=user_filter)
+                outcomes = []
+                for username, password in attempts:
+                    sid = store.open()
+                    store.input_username(sid, username)
+                    store.input_password(sid, password)
+                    outcomes.append(store.validate(sid))
+                    store.close(sid)
+        records = [(r.user, r.event, r.outcome) for r in AuditReader(directory)]
+        results[name] = (outcomes, records)
+    assert results["dfa"] == results["store"]
+    outcomes, records = results["dfa"]
+    assert outcomes == [True, False, False, False, False, False, False, False, True]
+    assert records[-2] == ("carol", "lockout", "failure")
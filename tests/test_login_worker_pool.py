@@ -0,0 +1,29 @@
+"""DFA_sys.Login_Worker_Pool: instradamento consistente per username e validazione su più processi."""
+from DFA_sys.Login_Worker_Pool import HashRing, LoginWorkerPool
+
+USERS = {f"user{i}": f"pw{i}" for i in range(200)}
+
+
+def test_hash_ring_is_stable_and_moves_few_keys():
+    before = HashRing(range(4))
+    after = HashRing(range(5))
+    keys = [f"user{i}" for i in range(5000)]
+    assert [before.node_for(k) for k in keys] == [HashRing(range(4)).node_for(k) for k in keys]
+    moved = sum(before.node_for(k) != after.node_for(k) for k in keys)
+    assert moved < len(keys) * 0.35                      # circa 1/5 degli username cambia worker
+    assert {before.node_for(k) for k in keys} == {0, 1, 2, 3}
+
+
+def test_pool_routes_by_username_and_keeps_order():
+    attempts = [(user, pwd if i % 3 else "wrong") for i, (user, pwd) in enumerate(USERS.items())]
+    # stesso username, stesso worker: il limiter locale del worker blocca anche la password corretta
+    attempts += [("user2", "x")] * 3 + [("user2", "pw2")]
+    with LoginWorkerPool(USERS, workers=2, limiter_options={"max_attempts": 3}) as pool:
+        results = pool.validate_many(attempts)
+        assert results == [bool(i % 3) for i in range(len(USERS))] + [False] * 4
+        assert pool.validate("user1", "pw1") is True
+        stats = pool.stats()
+    assert stats["requests"] == len(attempts) + 1
+    assert stats["successes"] == sum(results) + 1
+    per_worker = {w["worker"]: w["requests"] for w in stats["workers"]}
+    assert all(per_worker[w] > 0 for w in range(2))
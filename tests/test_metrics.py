@@ -0,0 +1,78 @@
+"""Automata_core.Metrics: contatori per thread, esposizione Prometheus ed endpoint /metrics."""
+import asyncio
+import threading
+
+from Automata_core.Metrics import MetricsRegistry, start_metrics_server, transition_counter
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LoginDFA
+
+
+def test_counter_sums_thread_shards():
+    counter = MetricsRegistry().counter("hits_total", "Richieste.", ("path",))
+    threads = [threading.Thread(target=lambda: [counter.inc("/a") for _ in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("/b", amount=2)
+    assert counter.value("/a") == 4000 and counter.value("/b") == 2
+
+
+def test_render_text_format():
+    metrics = MetricsRegistry()
+    metrics.counter("runs_total", "Esecuzioni.", ("engine",)).inc('dfa"x')
+    metrics.gauge("active", "Sessioni.").set(3)
+    metrics.histogram("latency_seconds", "Durata.", buckets=(0.1, 1.0)).observe(0.5)
+    text = metrics.render()
+    assert "# TYPE runs_total counter\n" in text
+    assert 'runs_total{engine="dfa\\"x"} 1\n' in text
+    assert "active 3\n" in text
+    assert 'latency_seconds_bucket{le="0.1"} 0\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 1\n' in text
+    assert "latency_seconds_sum 0.5\n" in text and "latency_seconds_count 1\n" in text
+    assert metrics.counter("runs_total", "Esecuzioni.") is metrics.counter("runs_total", "altro")
+
+
+def login() -> None:
+    dfa = LoginDFA({"alice": "wonderland"})
+    dfa.input_username("alice")
+    dfa.input_password("wonderland")
+    dfa.validate()
+
+
+def test_transition_counter_is_off_until_enabled():
+    assert not transition_counter.enabled
+    key = ("dfa-sync", "START", "input_username")
+    before = transition_counter.value(*key)
+    login()
+    assert transition_counter.value(*key) == before
+    transition_counter.enable()
+    try:
+        login()
+    finally:
+        transition_counter.disable()
+    assert transition_counter.value(*key) == before + 1
+
+
+def test_http_endpoint_serves_metrics():
+    metrics = MetricsRegistry()
+    metrics.counter("pings_total", "Ping.").inc()
+
+    async def get(port: int, path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def scenario():
+        server = await start_metrics_server(port=0, metrics=metrics)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await get(port, "/metrics"), await get(port, "/other")
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    ok, missing = asyncio.run(scenario())
+    assert ok.startswith(b"HTTP/1.1 200 OK") and ok.endswith(b"pings_total 1\n")
+    assert missing.startswith(b"HTTP/1.1 404")
@@ -0,0 +1,130 @@
+"""DFA_asys.Password_Hashing: hasher, verify_batch e VerificationPool (micro-batching e coda piena)."""
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from Automata_core.Attempt_Limiter import AttemptLimiter, user_key
+from Automata_core.Engine_Registry import get_engine
+from Automata_core.Metrics import run_counter
+from DFA_asys.Async_Login_Server import AsyncLoginServer
+from DFA_asys.Deterministic_Finite_Automaton_Asys import AsyncDFALogin
+from DFA_asys.Password_Hashing import (Pbkdf2Hasher, ScryptHasher, Sha256Hasher, VerificationPool,
+                                       VerificationQueueFull, verify_batch)
+from benchmarks.Load_Generator import run_open_loop, socket_target
+
+HASHERS = [Sha256Hasher(), Pbkdf2Hasher(iterations=1000), ScryptHasher(n=2 ** 8)]
+
+
+@pytest.mark.parametrize("hasher", HASHERS, ids=lambda h: h.name)
+def test_hash_and_verify(hasher):
+    stored = hasher.hash("wonderland")
+    assert hasher.verify("wonderland", stored)
+    assert not hasher.verify("x", stored)
+    assert not hasher.verify("wonderland", "scrypt$zz$1")   # record malformato: False, nessuna eccezione
+    assert verify_batch(hasher, [("wonderland", stored), ("x", stored)]) == [True, False]
+
+
+class CountingExecutor:
+    """Executor sincrono che conta le chiamate: una per lotto inviato dal pool."""
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append(len(args[1]))
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_pool_groups_pending_verifications_in_one_batch():
+    hasher = Sha256Hasher()
+    executor = CountingExecutor()
+    pool = VerificationPool(hasher, executor=executor, batch_size=8, batch_delay=0.01)
+    stored = hasher.hash("builder")
+
+    async def scenario():
+        return await asyncio.gather(*(pool.verify(pwd, stored) for pwd in ("builder", "x", "builder")))
+
+    assert asyncio.run(scenario()) == [True, False, True]
+    assert executor.calls == [3]
+    assert pool.pending == 0
+
+
+def test_pool_raises_when_queue_is_full():
+    hasher = Sha256Hasher()
+    pool = VerificationPool(hasher, executor=CountingExecutor(), max_queue=1, batch_size=2, batch_delay=0.01)
+    stored = hasher.hash("builder")
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.verify("builder", stored))
+        await asyncio.sleep(0)
+        with pytest.raises(VerificationQueueFull):
+            await pool.verify("builder", stored)
+        return await first
+
+    assert asyncio.run(scenario()) is True
+
+
+def full_pool() -> VerificationPool:
+    """Pool con coda di capienza zero: ogni verifica solleva VerificationQueueFull."""
+    return VerificationPool(Sha256Hasher(), executor=CountingExecutor(), max_queue=0)
+
+
+USERS_DB = {"alice": Sha256Hasher().hash("wonderland")}
+
+
+def test_run_reports_busy_without_counting_a_failure():
+    limiter = AttemptLimiter(max_attempts=1)
+    login = AsyncDFALogin(USERS_DB, verifier=full_pool(), limiter=limiter)
+
+    async def read_username():
+        return "alice"
+
+    async def read_password():
+        return "wonderland"
+
+    login.read_username, login.read_password = read_username, read_password
+    before = run_counter.value("dfa-async", "busy")
+    assert asyncio.run(login.run()) is False
+    assert login.outcome == "busy"
+    assert run_counter.value("dfa-async", "busy") - before == 1
+    assert not limiter.is_locked(user_key("alice"))
+
+
+def test_engine_rejects_busy_attempts_without_counting_a_failure():
+    limiter = AttemptLimiter(max_attempts=1)
+    engine = get_engine("dfa-async", limiter=limiter)
+    engine.login.verifier = full_pool()
+    before = run_counter.value("dfa-async", "busy")
+    assert engine.validate("alice", "wonderland") is False
+    assert run_counter.value("dfa-async", "busy") - before == 1
+    assert not engine.is_locked_out("alice")
+
+
+def test_server_replies_busy_and_load_generator_counts_it():
+    server = AsyncLoginServer(AsyncDFALogin(USERS_DB, verifier=full_pool()), max_pass_attempts=1)
+
+    async def scenario():
+        srv = await server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await reader.readuntil(b": ")
+            writer.write(b"alice\n")
+            await reader.readuntil(b": ")
+            writer.write(b"wonderland\n")
+            reply = await reader.read()
+            writer.close()
+            report = await run_open_loop(socket_target("127.0.0.1", port, None),
+                                         [("valid", "alice", "wonderland")] * 3, rps=1000)
+        finally:
+            await server.close()
+        return reply, report
+
+    before = run_counter.value("server", "busy")
+    reply, report = asyncio.run(scenario())
+    assert reply == b"ERR busy\n"
+    assert run_counter.value("server", "busy") - before == 4
+    assert report["outcomes"]["valid"] == {"ok": 0, "rejected": 0, "busy": 3, "errors": 0}
@@ -0,0 +1,42 @@
+"""NFA_asys.Product_Automaton: molte policy valutate con una sola passata sull'input."""
+import itertools
+import re
+
+import pytest
+
+from NFA_asys.Product_Automaton import ProductRunner
+from NFA_asys.Regex_Compiler import compile_regex
+
+PATTERNS = ["(a|b)*abb", "a(b|c)?c+", "[a-c]{2,3}", "(ab|a)*b?", ".*c.*", "a*|b*"]
+
+
+def words(alphabet: str = "abcd", max_len: int = 4):
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+def test_product_runner_matches_each_automaton():
+    runner = ProductRunner([compile_regex(pattern) for pattern in PATTERNS])
+    regexes = [re.compile(pattern, re.DOTALL) for pattern in PATTERNS]
+    all_words = list(words())
+    for word in all_words:
+        expected = [i for i, regex in enumerate(regexes) if regex.fullmatch(word)]
+        assert runner.accepted(word) == expected, word
+        assert runner.match(word) == sum(1 << i for i in expected)
+        assert runner.run(word) is bool(expected)
+    assert runner.match_batch(all_words[:50]) == [runner.match(word) for word in all_words[:50]]
+
+
+def test_small_cache_falls_back_without_changing_results():
+    automata = [compile_regex(pattern) for pattern in PATTERNS]
+    reference = ProductRunner(automata)
+    small = ProductRunner(automata, max_states=2, min_symbols_per_state=100)
+    for word in words(max_len=5):
+        assert small.match(word) == reference.match(word), word
+    assert small.evictions > 0 and small.fallbacks > 0
+
+
+def test_requires_at_least_one_automaton():
+    with pytest.raises(ValueError):
+        ProductRunner([])
@@ -0,0 +1,63 @@
+"""
+NFA_asys.Regex_Compiler e Lazy_Deterministic_Finite_Automaton: il compilatore Thompson, la
+subset construction e il DFA pigro riconoscono lo stesso linguaggio di re.fullmatch.
+"""
+import asyncio
+import itertools
+import re
+
+import pytest
+
+from NFA_asys.Lazy_Deterministic_Finite_Automaton import LazyDFA
+from NFA_asys.Regex_Compiler import compile_regex
+
+PATTERNS = ["(a|b)*abb", "a(b|c)?c+", "[a-c]{2,3}", "(ab|a)*b?", ".*c.*", "a*|b*"]
+
+
+def words(alphabet: str = "abcd", max_len: int = 5):
+    """Tutte le stringhe su `alphabet` fino a max_len simboli (inclusa la stringa vuota)."""
+    for n in range(max_len + 1):
+        for chars in itertools.product(alphabet, repeat=n):
+            yield "".join(chars)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_compiled_regex_matches_re(pattern):
+    nfa = compile_regex(pattern)
+    full, minimal = nfa.to_dfa(minimized=False), nfa.to_dfa()
+    assert minimal.n_states <= full.n_states
+    regex = re.compile(pattern, re.DOTALL)
+    for word in words():
+        expected = regex.fullmatch(word) is not None
+        assert full.run(word) is expected, word
+        assert minimal.run(word) is expected, word
+    # l'NFA asincrono dà lo stesso esito del DFA compilato
+    for word in ("", "abb", "cc", "abc", "bcab"):
+        assert asyncio.run(nfa.run(word)) is (regex.fullmatch(word) is not None)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_lazy_dfa_matches_minimized(pattern):
+    nfa = compile_regex(pattern)
+    minimal = nfa.to_dfa()
+    lazy = LazyDFA(nfa, max_states=4)     # cache piccola: esercita anche sfratti e ripiego sull'NFA
+    for word in words():
+        assert lazy.run(word) is minimal.run(word), word
+    assert lazy.hits + lazy.misses > 0
+    assert len(lazy.cache) <= 4
+
+
+def test_lazy_dfa_builds_only_visited_states():
+    # la determinizzazione completa avrebbe 2^13 stati: il DFA pigro crea solo quelli visitati
+    lazy = LazyDFA(compile_regex("(a|b)*a(a|b){12}"), max_states=64)
+    text = "ab" * 20
+    assert lazy.run(text) is (re.fullmatch("(a|b)*a(a|b){12}", text) is not None)
+    assert lazy.run(text + "a" * 13) is True
+    # al più una riga nuova per simbolo letto (più lo stato iniziale di ogni esecuzione)
+    assert lazy.evictions + len(lazy.cache) <= (len(text) + 1) + (len(text) + 13 + 1)
+
+
+@pytest.mark.parametrize("pattern", ["(ab", "a{3,1}", "*a", "[z-a]", "a{x}"])
+def test_invalid_patterns_raise_value_error(pattern):
+    with pytest.raises(ValueError):
+        compile_regex(pattern)
@@ -0,0 +1,46 @@
+"""Automata_core.Tracing: ring buffer, campionamento e dump dei record di transizione."""
+import io
+
+from Automata_core.Tracing import Tracer, tracer
+from DFA_sys.Deterministic_Finite_Automaton_Sys import LOGIN_AUTOMATON
+from DFA_sys.Login_Session_Store import LoginSessionStore
+
+
+def test_ring_buffer_keeps_most_recent_records():
+    local = Tracer(capacity=4, enabled=True)
+    for step in range(1, 7):
+        local.record(step, step * 10, 0)
+    assert [step for step, *_ in local.records()] == [3, 4, 5, 6]
+    local.clear()
+    assert local.records() == []
+
+
+def test_sampling_and_dump_resolve_names():
+    local = Tracer(capacity=16)
+    local.enable(sample_every=2)
+    for step in range(1, 7):
+        local.record(step, step % 2, 1)
+    assert [step for step, *_ in local.records()] == [2, 4, 6]
+    stream = io.StringIO()
+    text = local.dump(stream, states=["off", "on"], symbols=lambda symbol: f"ev{symbol}")
+    assert stream.getvalue() == text + "\n"
+    assert "step=2 stato='off' simbolo='ev1'" in text and "step=6" in text
+
+
+def test_engine_records_are_integer_ids():
+    tracer.clear()
+    tracer.enable()
+    try:
+        store = LoginSessionStore({"alice": "wonderland"})
+        sid = store.open()
+        store.input_username(sid, "alice")
+        store.input_password(sid, "wonderland")
+        store.validate(sid)
+        records = tracer.records()
+    finally:
+        tracer.disable()
+        tracer.clear()
+    assert [step for step, *_ in records] == [1, 2, 3]
+    assert all(isinstance(field, int) for record in records for field in record)
+    assert LOGIN_AUTOMATON.names[records[-1][1]] == "AUTH_SUCCESS"
+    assert LOGIN_AUTOMATON.event_names[records[-1][2]] == "auth_success"